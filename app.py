@@ -1,13 +1,27 @@
 import streamlit as st
-import openai
-import json
 import os
 import time
-import gc
-from datetime import datetime
-from contextlib import contextmanager
 from typing import Optional
-import signal
+
+import llm
+from chunk_export import session_chunks, to_jsonl
+from config_store import config_store
+from exports import generate_markdown_filename
+from extraction import FOLD_BATCH, RollingExtractor
+from hedging import hedge_policy, hedged_stream_chat
+from jobs import QueueFull, extraction_jobs, transcript_key
+from prompts import question_request, topic_request
+from speculation import opening_questions_for
+from store import session_store
+from styles import APP_CSS
+from router import router
+from scheduler import scheduler_for
+from similarity_index import similarity_index
+from singleflight import single_flight
+from subjects import SUBJECT_CATEGORIES
+from telemetry import start_metrics_server, telemetry
+from topic_pool import topic_pool_for
+from turns import Turn
 
 # Page configuration
 st.set_page_config(
@@ -15,365 +29,25 @@ st.set_page_config(
     layout="wide"
 )
 
-# Clean, simplified CSS
-st.markdown("""
-<style>
-/* Base styles */
-* {
-    font-family: 'Inter', sans-serif;
-    margin: 0;
-    padding: 0;
-    box-sizing: border-box;
-}
-
-/* Main container spacing */
-.main {
-    padding: 2rem;
-}
-
-/* Clean header styles */
-header {
-    border-bottom: none !important;
-    background: none !important;
-    margin-bottom: 2rem;
-}
-
-.stApp header {
-    background-color: transparent !important;
-    border-bottom: none !important;
-}
-
-/* Remove default Streamlit styling */
-.block-container {
-    padding-top: 2rem !important;
-    max-width: 1200px;
-}
-
-.stMarkdown {
-    background: transparent;
-    padding: 0;
-    box-shadow: none;
-}
-
-/* Button styling */
-.stButton > button {
-    border-radius: 8px;
-    padding: 0.5rem 1rem;
-    background-color: #2196f3;
-    color: white;
-    border: none;
-    font-weight: 500;
-}
-
-.stButton > button:hover {
-    background-color: #1976d2;
-}
-
-/* Chat message styling */
-.chat-message {
-    padding: 1rem;
-    border-radius: 8px;
-    margin: 0.5rem 0;
-    background: #f8f9fa;
-}
-
-/* Tab styling */
-.stTabs [data-baseweb="tab-list"] {
-    gap: 1rem;
-    border-bottom: 2px solid #f0f0f0;
-}
-
-.stTabs [data-baseweb="tab"] {
-    height: 40px;
-    padding: 0 16px;
-    color: #666;
-}
-
-.stTabs [data-baseweb="tab-highlight"] {
-    background-color: #2196f3;
-}
-
-/* Sidebar styling */
-.css-1d391kg {
-    padding: 2rem 1rem;
-}
-
-/* Input fields */
-.stTextInput > div > div {
-    border-radius: 8px;
-    border: 1px solid #e0e0e0;
-}
-
-/* Text size */
-.stTextInput, .stTextArea, .stMarkdown, .stText {
-    font-size: 16px !important;
-}
-
-div[data-testid="stChatMessage"] {
-    font-size: 16px !important;
-}
-</style>
-""", unsafe_allow_html=True)
-
-# Custom CSS to adjust avatar size and message alignment
-st.markdown("""
-<style>
-/* Increase avatar size */
-.stChatMessage img {
-    width: 120px !important;
-    height: 120px !important;
-}
-
-/* Align user messages to the right */
-[data-testid="chat-message-container"]:has([data-testid="chat-message-avatar"][src*="User"]) {
-    flex-direction: row-reverse;
-    margin-left: auto;
-    margin-right: 0;
-}
-
-/* Add some spacing between messages */
-[data-testid="chat-message-container"] {
-    margin: 1rem 0;
-    max-width: 85%;
-}
-
-/* Assistant messages to the left */
-[data-testid="chat-message-container"]:has([data-testid="chat-message-avatar"]:not([src*="User"])) {
-    margin-right: auto;
-    margin-left: 0;
-}
-</style>
-""", unsafe_allow_html=True)
-
-# Custom CSS for chat UI and avatars
-st.markdown("""
-<style>
-/* Chat container styling */
-[data-testid="stChatContainer"] {
-    background-color: #f8f9fa;
-    padding: 2rem;
-    border-radius: 10px;
-    margin: 1rem 0;
-}
-
-/* Increase font size for chat messages */
-.stChatMessage p {
-    font-size: 1.1rem !important;
-    line-height: 1.5 !important;
-    margin: 0 !important;
-}
-
-/* Increase avatar size */
-.stChatMessage img {
-    width: 120px !important;
-    height: 120px !important;
-}
-
-/* Align user messages to the right */
-[data-testid="chat-message-container"]:has([data-testid="chat-message-avatar"][src*="User"]) {
-    flex-direction: row-reverse;
-    margin-left: auto;
-    margin-right: 0;
-}
-
-/* Add some spacing between messages */
-[data-testid="chat-message-container"] {
-    margin: 1.5rem 0;
-    max-width: 85%;
-    position: relative;
-}
-
-/* Assistant messages to the left with bubble styling */
-[data-testid="chat-message-container"]:has([data-testid="chat-message-avatar"]:not([src*="User"])) {
-    margin-right: auto;
-    margin-left: 0;
-}
-
-/* Chat bubble styling */
-[data-testid="chat-message-container"] > div:nth-child(2) {
-    border-radius: 15px;
-    padding: 1.2rem 1.5rem;
-    box-shadow: 0 1px 2px rgba(0,0,0,0.1);
-}
+# Page styling
+st.markdown(APP_CSS, unsafe_allow_html=True)
 
-/* Assistant message bubble */
-[data-testid="chat-message-container"]:has([data-testid="chat-message-avatar"]:not([src*="User"])) > div:nth-child(2) {
-    background-color: #e8f5e9;  /* Light green background */
-    border-top-left-radius: 5px;
-    position: relative;
-}
-
-/* Assistant label */
-[data-testid="chat-message-container"]:has([data-testid="chat-message-avatar"]:not([src*="User"]))::before {
-    content: "Corn";
-    position: absolute;
-    top: -1.2rem;
-    left: 120px;  /* Align with end of avatar */
-    font-size: 0.85rem;
-    color: #2e7d32;  /* Darker green */
-    font-weight: 500;
-}
-
-/* User message bubble */
-[data-testid="chat-message-container"]:has([data-testid="chat-message-avatar"][src*="User"]) > div:nth-child(2) {
-    background-color: #e3f2fd;  /* Light blue background */
-    border-top-right-radius: 5px;
-    position: relative;
-}
-
-/* User label */
-[data-testid="chat-message-container"]:has([data-testid="chat-message-avatar"][src*="User"])::before {
-    content: "You";
-    position: absolute;
-    top: -1.2rem;
-    right: 120px;  /* Align with end of avatar */
-    font-size: 0.85rem;
-    color: #1565c0;  /* Darker blue */
-    font-weight: 500;
-}
-
-/* Remove default message background */
-.stChatMessage {
-    background-color: transparent !important;
-}
-
-/* Style the chat input box */
-.stChatInputContainer {
-    padding: 1rem;
-    background-color: white;
-    border-radius: 10px;
-    margin-top: 1rem;
-    box-shadow: 0 1px 3px rgba(0,0,0,0.1);
-}
-
-/* Add some margin to the tabs for better spacing */
-.stTabs {
-    margin-top: 1rem;
-}
-</style>
-""", unsafe_allow_html=True)
-
-# Update chat display logic and styling for better message alignment and alternating shading
-st.markdown("""
-<style>
-/* Chat container styling */
-[data-testid="stChatContainer"] {
-    background-color: #f8f9fa;
-    padding: 2rem;
-    border-radius: 10px;
-    margin: 1rem 0;
-}
-
-/* Increase font size for chat messages */
-.stChatMessage p {
-    font-size: 1.1rem !important;
-    line-height: 1.5 !important;
-    margin: 0 !important;
-}
-
-/* Increase avatar size and adjust positioning */
-.stChatMessage img {
-    width: 120px !important;
-    height: 120px !important;
-}
-
-/* User message container */
-[data-testid="chat-message-container"]:has([data-testid="chat-message-avatar"][src*="User"]) {
-    flex-direction: row-reverse !important;
-    margin-left: auto !important;
-    margin-right: 0 !important;
-    background-color: rgba(0, 0, 0, 0.02);
-    padding: 1rem;
-    border-radius: 10px;
-}
-
-/* Assistant message container */
-[data-testid="chat-message-container"]:has([data-testid="chat-message-avatar"]:not([src*="User"])) {
-    margin-right: auto !important;
-    margin-left: 0 !important;
-    padding: 1rem;
-    border-radius: 10px;
-}
-
-/* Alternate row shading */
-[data-testid="chat-message-container"]:nth-child(even) {
-    background-color: rgba(0, 0, 0, 0.03);
-}
-
-/* Message spacing and width */
-[data-testid="chat-message-container"] {
-    margin: 0.5rem 0;
-    max-width: 90%;
-    width: 90%;
-}
-
-/* Assistant message bubble */
-[data-testid="chat-message-container"]:has([data-testid="chat-message-avatar"]:not([src*="User"])) > div:nth-child(2) {
-    background-color: #e8f5e9;
-    border-radius: 15px;
-    border-top-left-radius: 5px;
-    padding: 1.2rem 1.5rem;
-    box-shadow: 0 1px 2px rgba(0,0,0,0.1);
-}
-
-/* User message bubble */
-[data-testid="chat-message-container"]:has([data-testid="chat-message-avatar"][src*="User"]) > div:nth-child(2) {
-    background-color: #e3f2fd;
-    border-radius: 15px;
-    border-top-right-radius: 5px;
-    padding: 1.2rem 1.5rem;
-    box-shadow: 0 1px 2px rgba(0,0,0,0.1);
-}
-
-/* Remove default message background */
-.stChatMessage {
-    background-color: transparent !important;
-}
-
-/* Style the chat input box */
-.stChatInputContainer {
-    padding: 1rem;
-    background-color: white;
-    border-radius: 10px;
-    margin-top: 1rem;
-    box-shadow: 0 1px 3px rgba(0,0,0,0.1);
-}
-
-/* Add some margin to the tabs for better spacing */
-.stTabs {
-    margin-top: 1rem;
-}
-
-/* Force user messages to the right */
-[data-testid="chat-message-container"]:has([data-testid="chat-message-avatar"][src*="User"]) > div:nth-child(2) {
-    margin-left: auto !important;
-}
-
-/* Add labels above messages */
-[data-testid="chat-message-container"]::before {
-    position: absolute;
-    top: -0.5rem;
-    font-size: 0.85rem;
-    font-weight: 500;
-}
-
-[data-testid="chat-message-container"]:has([data-testid="chat-message-avatar"]:not([src*="User"]))::before {
-    content: "Corn";
-    left: 140px;
-    color: #2e7d32;
-}
-
-[data-testid="chat-message-container"]:has([data-testid="chat-message-avatar"][src*="User"])::before {
-    content: "You";
-    right: 140px;
-    color: #1565c0;
-}
-</style>
-""", unsafe_allow_html=True)
+MESSAGE_WINDOW = 50  # messages held in session state
+NEW_PROFILE = "➕ New profile"
+ADMIN_PANEL = os.environ.get("CORN_ADMIN_PANEL", "").lower() in ("1", "true", "yes")
+RENDER_WINDOW = 20  # messages shown before "Show earlier messages"
 
 # Initialize session state
 if 'messages' not in st.session_state:
-    st.session_state.messages = []
+    st.session_state.messages = []  # Turns: the most recent MESSAGE_WINDOW; the store has them all
+if 'session_id' not in st.session_state:
+    st.session_state.session_id = None
+if 'turn_count' not in st.session_state:
+    st.session_state.turn_count = 0  # turns in the stored session, including those outside the window
+if 'render_window' not in st.session_state:
+    st.session_state.render_window = RENDER_WINDOW
+if 'history_mark' not in st.session_state:
+    st.session_state.history_mark = 0
 if 'interview_started' not in st.session_state:
     st.session_state.interview_started = False
 if 'interview_complete' not in st.session_state:
@@ -386,150 +60,188 @@ if 'use_stored_key' not in st.session_state:
     st.session_state.use_stored_key = True
 if 'interview_mode' not in st.session_state:
     st.session_state.interview_mode = "AMA (Ask Me Anything)"
+if 'pending_question' not in st.session_state:
+    st.session_state.pending_question = None  # "question" or "topic" to stream on the next run
+if 'extractor' not in st.session_state:
+    st.session_state.extractor = RollingExtractor()
+if 'extraction_job' not in st.session_state:
+    st.session_state.extraction_job = None  # ID of the background extraction job, if any
+if 'extraction_error' not in st.session_state:
+    st.session_state.extraction_error = None
+if 'question_ttft' not in st.session_state:
+    st.session_state.question_ttft = []
+
+CORN_AVATAR = "https://res.cloudinary.com/drrvnflqy/image/upload/v1740345962/corn-stickers_1_cqpgji.png"
+AVATARS = {"assistant": CORN_AVATAR, "user": "🧑‍💻"}
+
+def render_stream(placeholder, deltas):
+    """Paint streamed text deltas into a placeholder.
+
+    Returns the full text and the time to first token in seconds.
+    """
+    started = time.perf_counter()
+    first_token_at = None
+    last_paint = 0.0
+    parts = []
+    for delta in deltas:
+        now = time.perf_counter()
+        if first_token_at is None:
+            first_token_at = now
+        parts.append(delta)
+        # Repainting on every token floods the websocket; ~20 fps is plenty
+        if now - last_paint >= 0.05:
+            placeholder.markdown("".join(parts) + "▌")
+            last_paint = now
+    text = "".join(parts).strip()
+    placeholder.markdown(text)
+    return text, (first_token_at or time.perf_counter()) - started
+
+def record_first_token_latency(seconds):
+    """Keep a short history of question time-to-first-token for the sidebar."""
+    history = st.session_state.question_ttft
+    history.append(seconds)
+    del history[:-50]
+
+def get_random_topic(api_key, placeholder=None):
+    """Generate a completely random, potentially quirky topic for discussion.
+
+    When a placeholder is given the topic is streamed into it as it is generated.
+    """
+    client = llm.get_client(api_key)
+    request = topic_request()
 
-def get_config_dir():
-    """Get the configuration directory for storing API key."""
-    if os.name == 'nt':  # Windows
-        config_dir = os.path.join(os.environ['APPDATA'], 'AgenticContext')
-    else:  # Unix/Linux/Mac
-        config_dir = os.path.join(os.path.expanduser('~'), '.config', 'agentic_context')
-    os.makedirs(config_dir, exist_ok=True)
-    return config_dir
-
-def save_api_key(api_key):
-    """Save API key to configuration file."""
-    config_path = os.path.join(get_config_dir(), 'config.json')
-    with open(config_path, 'w') as f:
-        json.dump({'api_key': api_key}, f)
-
-def load_api_key():
-    """Load API key from configuration file."""
-    config_path = os.path.join(get_config_dir(), 'config.json')
     try:
-        with open(config_path, 'r') as f:
-            return json.load(f).get('api_key')
-    except (FileNotFoundError, json.JSONDecodeError):
+        if placeholder is not None:
+            topic, ttft = render_stream(placeholder, single_flight.stream(
+                st.session_state.session_id, request,
+                lambda: llm.stream_chat(client, api_key, timeout=30, call_site="topic", **request),
+                call_site="topic"
+            ))
+            record_first_token_latency(ttft)
+            return topic
+        return single_flight.call(
+            st.session_state.session_id, request,
+            lambda: llm.chat(client, api_key, timeout=30, call_site="topic", **request),
+            call_site="topic"
+        )
+    except llm.StreamInterrupted as e:
+        placeholder.markdown(e.partial_text)
+        st.warning("Corn lost the connection partway through the topic. Please try again.")
         return None
-
-class TimeoutError(Exception):
-    pass
-
-@contextmanager
-def timeout(seconds: int):
-    def signal_handler(signum, frame):
-        raise TimeoutError("API request timed out")
-    
-    # Register a function to raise a TimeoutError on the signal
-    signal.signal(signal.SIGALRM, signal_handler)
-    signal.alarm(seconds)
-    
-    try:
-        yield
-    finally:
-        # Disable the alarm
-        signal.alarm(0)
-
-def clear_old_messages():
-    """Clear messages older than the last 50"""
-    if 'messages' in st.session_state and len(st.session_state.messages) > 50:
-        st.session_state.messages = st.session_state.messages[-50:]
-    gc.collect()
-
-def get_random_topic(api_key):
-    """Generate a completely random, potentially quirky topic for discussion."""
-    client = openai.OpenAI(api_key=api_key)
-    
-    system_prompt = """You are Corn, a quirky sloth interviewer with an inexplicable fascination with anteaters.
-    Generate ONE completely random, unexpected, and interesting topic or question to ask about.
-    It can be about ANYTHING - the more surprising and unique, the better.
-    Be creative and don't limit yourself to conventional categories.
-    The topic should be engaging and thought-provoking, even if unconventional.
-    Return ONLY the topic/question, nothing else."""
-
-    try:
-        with timeout(30):  # 30 second timeout
-            response = client.chat.completions.create(
-                model="gpt-4",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": "Generate a random, unexpected topic or question."}
-                ],
-                temperature=1.0,  # High temperature for more randomness
-                max_tokens=50
-            )
-            return response.choices[0].message.content.strip()
-    except TimeoutError:
+    except llm.RequestTimeout:
         st.error("API request timed out. Please try again.")
         return None
+    except llm.CircuitOpenError as e:
+        st.error(f"{e}. Please try again shortly.")
+        return None
     except Exception as e:
         st.error(f"Error generating random topic: {str(e)}")
         return None
 
-def get_random_question(client, api_key, previous_messages=None):
+def get_random_question(client, api_key, previous_messages=None, placeholder=None, focus=None):
+    """Generate the next interview question.
+
+    When a placeholder is given the question is streamed into it as it is generated.
+    """
+    covered = similarity_index.covered_topics(focus, previous_messages)
+    request = question_request(previous_messages, focus, covered, st.session_state.session_id)
+
     try:
-        with timeout(30):  # 30 second timeout
-            response = client.chat.completions.create(
-                model="gpt-4",
-                messages=[
-                    {"role": "system", "content": """You are Corn, a friendly and engaging interviewer who helps people build rich context profiles. 
-                    Your responses should:
-                    1. Feel natural and conversational
-                    2. Follow up on interesting points from previous answers
-                    3. Avoid repetitive greetings like 'Of course!' or 'I'd be delighted'
-                    4. Keep questions focused but open-ended
-                    5. Show genuine interest in the user's responses
-                    
-                    If this is the first question, ask something engaging about their background or philosophy.
-                    If this is a follow-up, reference their previous answer and dig deeper into an interesting aspect."""},
-                    {"role": "user", "content": f"Previous messages: {previous_messages[-3:] if previous_messages else 'None'}. Generate a follow-up question."}
-                ],
-                temperature=0.7,
-                max_tokens=150
+        if placeholder is not None:
+            question, ttft = render_stream(placeholder, single_flight.stream(
+                st.session_state.session_id, request,
+                lambda: hedged_stream_chat(client, api_key, timeout=30, call_site="question", **request),
+                call_site="question"
+            ))
+            record_first_token_latency(ttft)
+        else:
+            question = single_flight.call(
+                st.session_state.session_id, request,
+                lambda: llm.chat(client, api_key, timeout=30, call_site="question", **request),
+                call_site="question"
             )
-            clear_old_messages()  # Clean up old messages
-            return "Q: " + response.choices[0].message.content.strip()
-    except TimeoutError:
+        return question
+    except llm.StreamInterrupted as e:
+        placeholder.markdown(e.partial_text)
+        st.warning("Corn lost the connection partway through the question. Use \"Ask again\" to retry.")
+        return None
+    except llm.RequestTimeout:
         st.error("API request timed out. Please try again.")
         return None
+    except llm.CircuitOpenError as e:
+        st.error(f"{e}. Please try again shortly.")
+        return None
     except Exception as e:
         st.error(f"Error generating question: {str(e)}")
         return None
 
-def extract_context(api_key, conversation):
+def extract_context(api_key, extractor, messages):
+    """Queue the end-of-interview extraction as a background job; return its ID."""
     try:
-        with timeout(45):  # 45 second timeout
-            client = openai.OpenAI(api_key=api_key)
-            response = client.chat.completions.create(
-                model="gpt-4",
-                messages=[
-                    {"role": "system", "content": """You are Corn, a diligent sloth assistant who excels at extracting and organizing meaningful context from conversations.
-                    While you occasionally daydream about anteaters, you stay focused on your primary mission: creating clear, well-structured context summaries.
-                    
-                    Analyze the conversation and create a detailed but concise summary that:
-                    1. Captures key information, insights, and patterns
-                    2. Organizes the information in a clear, logical structure
-                    3. Maintains the user's voice and perspective
-                    4. Focuses on substantive content rather than casual conversation
-                    5. Uses markdown formatting for better readability"""},
-                    {"role": "user", "content": f"Please extract and organize the context from this conversation:\n\n{conversation}"}
-                ],
-                temperature=0.5,
-                max_tokens=1000
-            )
-            gc.collect()  # Force garbage collection
-            return response.choices[0].message.content.strip()
-    except TimeoutError:
-        st.error("Context extraction timed out. Please try again.")
-        return None
-    except Exception as e:
-        st.error(f"Error extracting context: {str(e)}")
+        job = extraction_jobs.submit(
+            transcript_key(messages, st.session_state.session_id), extractor.finalize, llm.get_client(api_key), api_key,
+            timeout=45, batch_size=FOLD_BATCH
+        )
+        return job.id
+    except QueueFull as e:
+        st.error(str(e))
         return None
 
-def generate_markdown_filename(context_focus):
-    """Generate a filename for the markdown export."""
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    subject = context_focus if context_focus else "general"
-    return f"context_{subject}_{timestamp}.md"
+def describe_extraction_error(error):
+    """User-facing message for a failed extraction job."""
+    if isinstance(error, llm.RequestTimeout):
+        return "Context extraction timed out. Please try again."
+    if isinstance(error, llm.CircuitOpenError):
+        return f"{error}. Please try again shortly."
+    return f"Error extracting context: {str(error)}"
+
+def start_session(focus):
+    """Open a new stored interview session and make it the current one."""
+    if st.session_state.session_id and st.session_state.turn_count == 0:
+        session = session_store.get_session(st.session_state.session_id)
+        if session is not None and session["focus"] == focus:
+            return  # nothing has been said yet (e.g. a double-click): keep the session and its in-flight question
+    if st.session_state.session_id:
+        single_flight.forget(st.session_state.session_id)
+    st.session_state.session_id = session_store.create_session(focus)
+    st.session_state.turn_count = 0
+    st.session_state.render_window = RENDER_WINDOW
+    st.query_params["session"] = st.session_state.session_id
+
+def record_message(turn):
+    """Append a turn to the stored transcript and to the in-memory window."""
+    if st.session_state.session_id is None:
+        start_session(st.session_state.context_focus)
+    session_store.append_turn(st.session_state.session_id, turn)
+    st.session_state.messages.append(turn)
+    st.session_state.turn_count += 1
+    del st.session_state.messages[:-MESSAGE_WINDOW]
+
+def resume_session(session_id):
+    """Reload a stored interview, e.g. after a browser reload or a server restart."""
+    session = session_store.get_session(session_id)
+    if session is None:
+        return False
+    st.session_state.session_id = session_id
+    st.session_state.context_focus = session["focus"]
+    st.session_state.context_data = session["context_data"]
+    st.session_state.interview_started = True
+    st.session_state.interview_complete = session["complete"]
+    st.session_state.messages = session_store.load_window(session_id, MESSAGE_WINDOW)
+    st.session_state.turn_count = session_store.count_turns(session_id)
+    # Queue every answered turn so "End Interview" still covers the whole transcript
+    extractor = RollingExtractor()
+    if not session["complete"]:
+        extractor.observe_turns(session_store.load_turns(session_id))
+    st.session_state.extractor = extractor
+    return True
+
+def full_transcript():
+    """Every turn of the current interview: the in-memory window, or the stored transcript once it has been trimmed."""
+    messages = st.session_state.messages
+    if st.session_state.session_id and st.session_state.turn_count > len(messages):
+        return session_store.load_turns(st.session_state.session_id)
+    return messages
 
 def display_chat_message(message, is_user=False):
     """Display a chat message using Streamlit's chat components."""
@@ -537,9 +249,17 @@ def display_chat_message(message, is_user=False):
         with st.chat_message("user", avatar="https://ui-avatars.com/api/?name=User&background=random"):
             st.write(message)
     else:
-        with st.chat_message("assistant", avatar="https://res.cloudinary.com/drrvnflqy/image/upload/v1740345962/corn-stickers_1_cqpgji.png"):
+        with st.chat_message("assistant", avatar=CORN_AVATAR):
             st.write(message)
 
+# Prometheus /metrics endpoint, when CORN_METRICS_PORT is set (once per process)
+start_metrics_server()
+
+# Resume a stored interview after a reload or restart
+if st.session_state.session_id is None and "session" in st.query_params:
+    if not resume_session(st.query_params["session"]):
+        del st.query_params["session"]
+
 # Sidebar for API settings
 with st.sidebar:
     st.write("## API Settings")
@@ -547,21 +267,108 @@ with st.sidebar:
     use_stored_key = st.checkbox("Use stored API key", value=st.session_state.use_stored_key)
     st.session_state.use_stored_key = use_stored_key
 
+    api_key = None
+    profile = None
+    creating = False
     if use_stored_key:
-        api_key = load_api_key()
+        profiles = config_store.profiles()
+        profile = st.selectbox("Key profile", profiles + [NEW_PROFILE], index=profiles.index(config_store.active_profile()))
+        if profile == NEW_PROFILE:
+            creating = True
+            profile = st.text_input("Profile name").strip() or None
+            if profile in profiles:
+                st.error(f"A profile named \"{profile}\" already exists. Pick it from the list to change its key.")
+                profile = None
+        api_key = config_store.api_key(profile) if profile and not creating else None
         if not api_key:
             st.warning("No stored API key found. Please enter one below.")
     
-    api_key_input = st.text_input("OpenAI API Key:", type="password", value=api_key if use_stored_key and api_key else "")
+    # One input per profile, so switching profiles never carries the previous key across
+    api_key_input = st.text_input("OpenAI API Key:", type="password", value=api_key or "", key=f"api_key:{profile or ''}")
     
     if api_key_input:
-        if use_stored_key:
-            save_api_key(api_key_input)
+        if profile and creating:
+            # Never replaces a stored key, even one another process saved under this name meanwhile
+            if config_store.add_profile(profile, api_key_input):
+                config_store.set_active_profile(profile)
+                st.rerun()  # list the new profile in the selector
+            st.error(f"A profile named \"{profile}\" already exists. Pick it from the list to change its key.")
+            st.stop()
+        elif profile:
+            # Both only touch the file when the value changed
+            config_store.save_api_key(api_key_input, profile)
+            config_store.set_active_profile(profile)
         api_key = api_key_input
     else:
         st.error("Please enter an API key to continue")
         st.stop()
 
+    if st.session_state.question_ttft:
+        ttft = sorted(st.session_state.question_ttft)
+        st.caption(
+            f"⏱️ Last question started in {st.session_state.question_ttft[-1]:.2f}s "
+            f"(median {ttft[len(ttft) // 2]:.2f}s over {len(ttft)})"
+        )
+    if ADMIN_PANEL:
+        # Process-wide figures, covering every user's traffic: operators only
+        with st.expander("📈 API telemetry"):
+            pool = llm.client_pool.stats()
+            if pool["hits"] or pool["misses"]:
+                st.caption(f"🔌 Client pool: {pool['hits']} hits / {pool['misses']} misses ({pool['hit_rate']:.0%} reused)")
+            speculation = opening_questions_for(api_key).stats()
+            if speculation["hits"] or speculation["misses"]:
+                st.caption(
+                    f"🔮 Opening questions: {speculation['hit_rate']:.0%} served instantly, "
+                    f"{speculation['tokens_last_hour']} speculative tokens in the last hour"
+                )
+            cache = llm.response_cache.stats()
+            if cache["hits"] or cache["misses"]:
+                st.caption(
+                    f"🗄️ Response cache ({cache['mode']}): {cache['hits']} hits / {cache['misses']} misses, "
+                    f"{cache['saved_seconds']:.1f}s saved"
+                )
+            calls = telemetry.summary()
+            if not calls:
+                st.caption("No API calls yet")
+            for call_site, stats in sorted(calls.items()):
+                wall, ttft = stats["wall"], stats["ttft"]
+                st.markdown(f"**{call_site}**: {stats['calls']} calls, {stats['tokens']} tokens, ${stats['cost']:.4f}")
+                st.caption(
+                    f"wall p50/p95/p99 {wall['p50']:.2f}/{wall['p95']:.2f}/{wall['p99']:.2f}s"
+                    + (f", TTFT p50/p95 {ttft['p50']:.2f}/{ttft['p95']:.2f}s" if ttft["p50"] is not None else "")
+                    + f", queue wait p95 {stats['queue_wait']['p95']:.2f}s"
+                    + f", {stats['retries']} retries, {stats['timeouts']} timeouts"
+                )
+            limiter = scheduler_for(llm.key_fingerprint(api_key)).stats()
+            st.caption(
+                "🚦 Queued now: " + ", ".join(f"{n} {c}" for n, c in limiter["queued"].items())
+                + " · mean wait: " + ", ".join(f"{n} {w:.2f}s" for n, w in limiter["mean_wait"].items())
+            )
+            flights = single_flight.stats(st.session_state.session_id)
+            st.caption(f"🛬 Single-flight: {flights['in_flight']} in flight, {flights['coalesced']} calls coalesced this session")
+            hedges = hedge_policy.stats()
+            if hedges["fired"] or hedges["capped"]:
+                st.caption(
+                    f"🪃 Hedges: {hedges['fired']} fired, {hedges['wins']} won ({hedges['win_rate']:.0%}), "
+                    f"{hedges['capped']} capped, {hedges['tokens_last_hour']} tokens in the last hour"
+                )
+            routing = router.stats()
+            if routing["decisions"]:
+                st.caption(
+                    "🧭 Routing: " + ", ".join(f"{d} ×{n}" for d, n in routing["decisions"].items())
+                    + (f" · failed over: {', '.join(routing['failed_over'])}" if routing["failed_over"] else "")
+                    + f" · saved ${routing['cost_saved']:.4f}, {routing['tokens_rerouted']} tokens on cheaper models"
+                    + f", {routing['latency_saved']:.1f}s"
+                )
+            st.caption(f"🗂️ Similarity index: {len(similarity_index)} chunks from earlier contexts")
+
+# Keep a few random topics and opening questions ready so buttons do not wait on the API, but only
+# spend on it for a key that has already worked, while an interview is under way
+if (st.session_state.session_id and st.session_state.interview_started and not st.session_state.interview_complete
+        and llm.key_verified(api_key)):
+    topic_pool_for(api_key).refill(llm.get_client(api_key), api_key)
+    opening_questions_for(api_key).warm(llm.get_client(api_key), api_key)
+
 # Main content
 st.write("# Agentic Context Development Interview")
 
@@ -583,15 +390,20 @@ with left_col:
     
     with random_col:
         if st.button("🎲 Random!", help="Let Corn surprise you with a completely random topic!", type="primary"):
-            random_topic = get_random_topic(api_key)
-            if random_topic:
-                st.session_state.messages = []
-                st.session_state.context_data = ""
-                st.session_state.interview_started = True
-                st.session_state.interview_complete = False
-                st.session_state.context_focus = None
-                st.session_state.messages.append(f"Q: {random_topic}")
-                st.rerun()
+            st.session_state.messages = []
+            st.session_state.context_data = ""
+            st.session_state.extractor = RollingExtractor()
+            st.session_state.extraction_job = None
+            st.session_state.interview_started = True
+            st.session_state.interview_complete = False
+            st.session_state.context_focus = None
+            start_session(None)
+            topic = topic_pool_for(api_key).pop(llm.get_client(api_key), api_key)
+            if topic:
+                record_message(Turn.question(topic, latency=0.0))
+            else:
+                st.session_state.pending_question = "topic"  # pool is cold; stream one instead
+            st.rerun()
 
 with right_col:
     if st.session_state.interview_mode == "Subject Restricted":
@@ -599,247 +411,7 @@ with right_col:
         
         col1, col2 = st.columns(2)
         with col1:
-            subject_categories = {
-                "Biography & Background": [
-                    "General Biography",
-                    "Personal History",
-                    "Family Background",
-                    "Childhood & Upbringing",
-                    "Life Milestones",
-                    "Cultural Heritage",
-                    "Geographic History",
-                    "Family Traditions",
-                    "Formative Experiences",
-                    "Personal Timeline",
-                    "Family Structure",
-                    "Life Stories"
-                ],
-                "Health & Wellness": [
-                    "General Health",
-                    "Physical Health",
-                    "Exercise Routine",
-                    "Medical History",
-                    "Diet & Nutrition",
-                    "Sleep Habits",
-                    "Health Goals",
-                    "Wellness Practices",
-                    "Preventive Care",
-                    "Energy Levels",
-                    "Recovery & Rest",
-                    "Health Challenges"
-                ],
-                "Mental Health & Wellbeing": [
-                    "General Mental Health",
-                    "Emotional Awareness",
-                    "Stress Management",
-                    "Anxiety & Concerns",
-                    "Coping Strategies",
-                    "Mental Resilience",
-                    "Therapy Experience",
-                    "Self-Care Practices",
-                    "Emotional Growth",
-                    "Support Systems",
-                    "Mental Health Goals",
-                    "Personal Boundaries"
-                ],
-                "Children & Family Life": [
-                    "General Parenting",
-                    "Parenting Style",
-                    "Child Development",
-                    "Family Activities",
-                    "Education Choices",
-                    "Family Values",
-                    "Work-Family Balance",
-                    "Family Goals",
-                    "Childcare Approach",
-                    "Family Challenges",
-                    "Family Traditions",
-                    "Future Planning"
-                ],
-                "Inspirations & Influences": [
-                    "General Influences",
-                    "Role Models",
-                    "Mentors & Teachers",
-                    "Inspiring Books",
-                    "Life-Changing Events",
-                    "Creative Influences",
-                    "Cultural Inspirations",
-                    "Career Influences",
-                    "Personal Heroes",
-                    "Motivational Sources",
-                    "Artistic Influences",
-                    "Philosophical Influences"
-                ],
-                "Humor & Entertainment": [
-                    "General Entertainment",
-                    "Sense of Humor",
-                    "Comedy Preferences",
-                    "Entertainment Choices",
-                    "Movie Tastes",
-                    "TV Shows",
-                    "Music Preferences",
-                    "Gaming Interests",
-                    "Reading Preferences",
-                    "Social Media",
-                    "Live Entertainment",
-                    "Content Creation"
-                ],
-                "Personality & Character": [
-                    "General Personality",
-                    "Core Traits",
-                    "Communication Style",
-                    "Decision Making",
-                    "Social Tendencies",
-                    "Emotional Style",
-                    "Leadership Style",
-                    "Conflict Approach",
-                    "Risk Tolerance",
-                    "Adaptability",
-                    "Personal Strengths",
-                    "Growth Areas"
-                ],
-                "Food & Drink": [
-                    "General Preferences",
-                    "Favorite Cuisines",
-                    "Cooking Skills",
-                    "Dietary Choices",
-                    "Restaurant Preferences",
-                    "Beverage Choices",
-                    "Food Adventures",
-                    "Recipe Collection",
-                    "Food Traditions",
-                    "Dining Habits",
-                    "Food Philosophy",
-                    "Culinary Goals"
-                ],
-                "Career & Professional": [
-                    "General Career",
-                    "Professional Background",
-                    "Technical Skills",
-                    "Leadership Experience",
-                    "Project Management",
-                    "Industry Knowledge",
-                    "Career Goals",
-                    "Work Experience",
-                    "Remote Work",
-                    "Workplace Culture",
-                    "Professional Development",
-                    "Career Challenges"
-                ],
-                "Education & Skills": [
-                    "General Education",
-                    "Education History",
-                    "Research Experience",
-                    "Communication Skills",
-                    "Problem-Solving",
-                    "Languages",
-                    "Certifications",
-                    "Technical Training",
-                    "Self-Learning",
-                    "Academic Achievements",
-                    "Study Methods",
-                    "Learning Goals"
-                ],
-                "Personal Development": [
-                    "General Growth",
-                    "Work-Life Balance",
-                    "Personal Growth",
-                    "Life Goals",
-                    "Values & Beliefs",
-                    "Motivation & Drive",
-                    "Time Management",
-                    "Stress Management",
-                    "Decision Making",
-                    "Self-Awareness",
-                    "Personal Challenges",
-                    "Future Aspirations"
-                ],
-                "Interests & Lifestyle": [
-                    "General Interests",
-                    "Hobbies",
-                    "Travel Experiences",
-                    "Cultural Interests",
-                    "Sports & Fitness",
-                    "Creative Pursuits",
-                    "Reading Habits",
-                    "Entertainment",
-                    "Food & Cuisine",
-                    "Music & Arts",
-                    "Technology Usage",
-                    "Lifestyle Choices"
-                ],
-                "Social & Relationships": [
-                    "General Social",
-                    "Team Collaboration",
-                    "Cultural Background",
-                    "Community Involvement",
-                    "Mentorship",
-                    "Social Activities",
-                    "Networking",
-                    "Family Dynamics",
-                    "Friendship",
-                    "Social Impact",
-                    "Communication Style",
-                    "Cultural Exchange"
-                ],
-                "Innovation & Creativity": [
-                    "General Innovation",
-                    "Creative Process",
-                    "Problem Innovation",
-                    "Design Thinking",
-                    "Ideation Methods",
-                    "Creative Projects",
-                    "Innovation Mindset",
-                    "Creative Challenges",
-                    "Artistic Expression",
-                    "Technical Innovation",
-                    "Creative Collaboration",
-                    "Future Vision"
-                ],
-                "Beliefs & Values": [
-                    "General Beliefs",
-                    "Religious Views",
-                    "Political Views",
-                    "Moral Framework",
-                    "Ethical Principles",
-                    "Spiritual Practices",
-                    "Cultural Values",
-                    "Social Justice",
-                    "Human Rights",
-                    "Economic Views",
-                    "Tradition & Heritage",
-                    "Personal Philosophy"
-                ],
-                "Entertainment": [
-                    "General Entertainment",
-                    "Favorite Movies",
-                    "Favorite TV Shows",
-                    "Favorite Music",
-                    "Favorite Books",
-                    "Favorite Games",
-                    "Favorite Sports",
-                    "Favorite Hobbies",
-                    "Favorite Travel Destinations",
-                    "Favorite Food",
-                    "Favorite Drink",
-                    "Favorite Activities"
-                ],
-                "Worldview & Society": [
-                    "General Perspective",
-                    "Global Issues",
-                    "Social Change",
-                    "Environmental Views",
-                    "Technology Impact",
-                    "Future of Society",
-                    "Cultural Perspectives",
-                    "Education Systems",
-                    "Healthcare Views",
-                    "Economic Systems",
-                    "Social Structures",
-                    "World Challenges"
-                ]
-            }
-            categories = sorted(list(subject_categories.keys()))
+            categories = sorted(list(SUBJECT_CATEGORIES.keys()))
             selected_category = st.selectbox(
                 "1️⃣ Select Category",
                 ["General"] + categories,
@@ -850,7 +422,7 @@ with right_col:
             if selected_category == "General":
                 selected_subject = "General"
             else:
-                sorted_subjects = sorted(subject_categories[selected_category])
+                sorted_subjects = sorted(SUBJECT_CATEGORIES[selected_category])
                 selected_subject = st.selectbox(
                     "2️⃣ Select Specific Focus",
                     sorted_subjects,
@@ -870,16 +442,118 @@ with right_col:
             st.session_state.context_focus = new_subject
             st.session_state.messages = []
             st.session_state.context_data = ""
+            st.session_state.extractor = RollingExtractor()
+            st.session_state.extraction_job = None
             st.session_state.interview_started = True
             st.session_state.interview_complete = False
-            client = openai.OpenAI(api_key=api_key)
-            question = get_random_question(client, api_key, st.session_state.messages)
-            if question:
-                st.session_state.messages.append(question)
-                st.rerun()
+            start_session(st.session_state.context_focus)
+            st.session_state.pending_question = "question"
+            st.rerun()
     else:
         st.session_state.context_focus = None
 
+def stream_next_question(kind="question"):
+    """Stream Corn's next question into a new chat bubble and commit it once complete."""
+    client = llm.get_client(api_key)
+    with st.chat_message("assistant", avatar=CORN_AVATAR):
+        placeholder = st.empty()
+    started = time.perf_counter()
+    question = None
+    if kind == "question" and not st.session_state.messages:
+        # Opening questions are usually speculated ahead of time
+        question = opening_questions_for(api_key).take(st.session_state.context_focus, client, api_key)
+        if question:
+            placeholder.markdown(question)
+    if question is None and kind == "topic":
+        question = get_random_topic(api_key, placeholder=placeholder)
+    elif question is None:
+        question = get_random_question(
+            client, api_key, full_transcript(),
+            placeholder=placeholder, focus=st.session_state.context_focus
+        )
+    if question:
+        record_message(Turn.question(question, latency=time.perf_counter() - started))
+
+def render_message(turn):
+    """Draw one turn as a chat bubble."""
+    with st.chat_message(turn.role, avatar=AVATARS[turn.role]):
+        st.markdown(turn.text)
+
+def render_history():
+    """Draw the visible window of earlier messages, once per full run.
+
+    Only the last RENDER_WINDOW messages are shown until the user asks for
+    more; anything older than the in-memory window is read from the store.
+    """
+    st.write("")  # Add some spacing
+    turn_count = st.session_state.turn_count
+    window = min(st.session_state.render_window, turn_count)
+    if turn_count > window and st.button(f"⬆️ Show earlier messages ({turn_count - window} hidden)"):
+        st.session_state.render_window += RENDER_WINDOW
+        window = min(st.session_state.render_window, turn_count)
+
+    messages = st.session_state.messages
+    if window <= len(messages):
+        visible = messages[len(messages) - window:]
+    else:
+        older = session_store.load_window(
+            st.session_state.session_id, window - len(messages), before=turn_count - len(messages)
+        )
+        visible = older + messages
+    for message in visible:
+        render_message(message)
+    # The chat fragment draws everything recorded after this point
+    st.session_state.history_mark = turn_count
+
+@st.fragment
+def interview_chat():
+    """Newest messages and the input area.
+
+    Submitting an answer reruns only this fragment: the history drawn by
+    render_history stays on screen untouched, so a turn only sends the
+    messages added since the last full run. New bubbles are drawn into a
+    container above the input, so no extra rerun is needed once the next
+    question has been committed. Once more has been said since the last full
+    run than the in-memory window holds, the whole page is redrawn instead.
+    """
+    recent = st.container()
+    unseen = st.session_state.turn_count - st.session_state.history_mark
+    with recent:
+        if unseen:
+            for message in st.session_state.messages[max(0, len(st.session_state.messages) - unseen):]:
+                render_message(message)
+
+    if not (api_key and st.session_state.interview_started and not st.session_state.interview_complete):
+        return
+
+    user_input = st.chat_input("Type your response here...")
+
+    with recent:
+        if st.session_state.pending_question:
+            kind = st.session_state.pending_question
+            st.session_state.pending_question = None
+            stream_next_question(kind)
+
+        if user_input:
+            last = st.session_state.messages[-1] if st.session_state.messages else None
+            st.session_state.extractor.observe(last.text if last and last.is_question else None, user_input)
+            st.session_state.extractor.schedule(llm.get_client(api_key), api_key)
+            answer = Turn.answer(user_input)
+            record_message(answer)
+            render_message(answer)
+            stream_next_question()
+
+        if not st.session_state.messages or not st.session_state.messages[-1].is_question:
+            # The last question was lost (an error or a cut-off stream), so offer a retry
+            if st.button("🔄 Ask again"):
+                st.session_state.pending_question = "question"
+                st.rerun(scope="fragment")
+
+    if st.session_state.turn_count - st.session_state.history_mark > len(st.session_state.messages):
+        # The in-memory window no longer reaches back to where the history stops, so the
+        # next fragment run would leave a gap; redraw the page, which moves the mark up
+        st.rerun()
+
 # Initialize tabs
 tab1, tab2, tab3, tab4 = st.tabs(["Interview", "Context Review", "How it Works", "About The Interviewer"])
 
@@ -890,22 +564,24 @@ with tab1:
         if st.button("Start New Interview", use_container_width=True):
             st.session_state.messages = []
             st.session_state.context_data = ""
+            st.session_state.extractor = RollingExtractor()
+            st.session_state.extraction_job = None
             st.session_state.interview_started = True
             st.session_state.interview_complete = False
-            client = openai.OpenAI(api_key=api_key)
-            question = get_random_question(client, api_key, st.session_state.messages)
-            if question:
-                st.session_state.messages.append(question)
-                st.rerun()
-            else:
-                st.error("Failed to generate question. Please check your API key.")
+            start_session(st.session_state.context_focus)
+            st.session_state.pending_question = "question"
+            st.rerun()
 
     with col2:
         if st.button("End Interview", use_container_width=True):
             if st.session_state.messages:
-                st.session_state.interview_complete = True
-                st.session_state.context_data = extract_context(api_key, st.session_state.messages)
-                st.rerun()
+                job_id = extract_context(api_key, st.session_state.extractor, st.session_state.messages)
+                if job_id:
+                    single_flight.forget(st.session_state.session_id)
+                    st.session_state.extraction_job = job_id
+                    st.session_state.extraction_error = None
+                    st.session_state.interview_complete = True
+                    st.rerun()
 
     with col3:
         if st.button("Export Conversation", use_container_width=True):
@@ -919,32 +595,49 @@ with tab1:
                     use_container_width=True
                 )
 
-    # Display chat messages
-    tab1.write("")  # Add some spacing
-    for message in st.session_state.messages:
-        if message.startswith("Q: "):
-            with tab1.chat_message("assistant", avatar="https://res.cloudinary.com/drrvnflqy/image/upload/v1740345962/corn-stickers_1_cqpgji.png"):
-                st.write(message[3:])
-        else:
-            with tab1.chat_message("user", avatar="🧑‍💻"):
-                st.write(message)
-
-    # Input area
-    if api_key and st.session_state.interview_started and not st.session_state.interview_complete:
-        client = openai.OpenAI(api_key=api_key)
-        user_input = st.chat_input("Type your response here...")
-        
-        if user_input:
-            st.session_state.messages.append(user_input)
-            question = get_random_question(client, api_key, st.session_state.messages)
-            if question:
-                st.session_state.messages.append(question)
-                st.rerun()
-            else:
-                st.error("Failed to generate question. Please check your API key.")
+    # History is drawn once per full run; new turns and the input rerun on their own
+    render_history()
+    interview_chat()
+
+@st.fragment(run_every=2)
+def poll_extraction():
+    """Poll the background extraction job and publish its result when done."""
+    job = extraction_jobs.get(st.session_state.extraction_job)
+    if job is None or job.state == "cancelled":
+        st.session_state.extraction_job = None
+        st.session_state.interview_complete = False
+        st.rerun()
+    if job.state == "done" and not (job.result or "").strip():
+        # Nothing worth keeping was extracted: leave the interview open rather than complete and empty
+        st.session_state.extraction_job = None
+        st.session_state.interview_complete = False
+        st.session_state.extraction_error = "Corn could not find any context to extract yet. Answer a few more questions, then end the interview again."
+        st.rerun()
+    if job.state == "done":
+        st.session_state.context_data = job.result
+        if st.session_state.session_id:
+            session_store.update_session(st.session_state.session_id, complete=True, context_data=job.result)
+        st.session_state.extraction_job = None
+        st.rerun()
+    if job.state == "failed":
+        st.session_state.extraction_job = None
+        st.session_state.interview_complete = False
+        st.session_state.extraction_error = describe_extraction_error(job.error)
+        st.rerun()
+
+    queue = extraction_jobs.stats()
+    status = "Waiting for a free worker" if job.state == "queued" else "Corn is organising your context"
+    st.info(f"⏳ {status}… ({job.elapsed:.0f}s, {queue['queued']} queued, {queue['running']} running)")
+    if st.button("Cancel extraction"):
+        extraction_jobs.cancel(job.id)
+        st.session_state.extraction_job = None
+        st.session_state.interview_complete = False
+        st.rerun()
 
 with tab2:
-    if st.session_state.interview_complete and st.session_state.context_data:
+    if st.session_state.extraction_job:
+        poll_extraction()
+    elif st.session_state.interview_complete and st.session_state.context_data:
         st.header("Generated Context")
         st.markdown(st.session_state.context_data)
         
@@ -957,7 +650,21 @@ with tab2:
                 file_name=filename,
                 mime="text/markdown"
             )
+
+        # Section-aware chunks with stable IDs, for loading into a vector database
+        if st.button("Export chunks for a vector database"):
+            session = session_store.get_session(st.session_state.session_id) if st.session_state.session_id else None
+            session = session or {"id": "unsaved", "focus": st.session_state.context_focus, "created_at": time.time()}
+            session["context_data"] = st.session_state.context_data
+            st.download_button(
+                label="Download chunks (JSONL)",
+                data=to_jsonl(session_chunks(session)),
+                file_name=os.path.splitext(generate_markdown_filename(st.session_state.context_focus))[0] + ".jsonl",
+                mime="application/jsonl"
+            )
     else:
+        if st.session_state.extraction_error:
+            st.error(st.session_state.extraction_error)
         st.info("Complete the interview to generate your context summary.")
 
 with tab3:
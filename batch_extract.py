@@ -0,0 +1,287 @@
+"""Headless context extraction over archives of interview transcripts.
+
+Reads transcripts from a directory or a JSONL file, runs the same rolling
+extraction the app uses with bounded asyncio concurrency, and writes one
+``context_*.md`` file per transcript. Every finished transcript is appended
+to a manifest in the output directory, so an interrupted run picks up where
+it stopped.
+
+    python batch_extract.py transcripts/ -o contexts/ --concurrency 8 --rpm 500
+
+Transcript formats:
+- JSON (a ``.json`` file or one JSONL line): ``{"id", "focus", "created_at",
+  "turns": [{"role": "assistant" | "user", "content": ...}]}``; ``messages``
+  is accepted for ``turns`` and every field but the turns is optional
+- Plain text (``.txt`` / ``.md``): a line starting "Q: " or "Corn: " is a
+  question; the lines after it, up to the next question, are the answer (a
+  "User: " prefix on its first line is optional)
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Iterator, NamedTuple, Optional
+
+import llm
+from config_store import config_store
+from exports import generate_markdown_filename
+from extraction import FOLD_BATCH, RollingExtractor
+from scheduler import scheduler_for
+from turns import ASSISTANT, USER, Turn
+
+MANIFEST_NAME = "manifest.jsonl"
+REPORT_EVERY = 10  # transcripts between progress lines
+
+_QUESTION_PREFIXES = ("Q: ", "Corn: ")
+_ANSWER_PREFIX = "User: "
+
+
+class Transcript(NamedTuple):
+    id: str
+    focus: Optional[str]
+    created_at: Optional[datetime]
+    turns: list
+
+
+def _turns_from_json(items) -> list:
+    return [
+        Turn(ASSISTANT if item.get("role") == ASSISTANT else USER, item.get("content") or "")
+        for item in items if (item.get("content") or "").strip()
+    ]
+
+
+def _turns_from_text(text) -> list:
+    turns = []
+    answer = []
+
+    def flush_answer():
+        if "".join(answer).strip():
+            turns.append(Turn(USER, "\n".join(answer).strip()))
+        answer.clear()
+
+    for line in text.splitlines():
+        prefix = next((p for p in _QUESTION_PREFIXES if line.startswith(p)), None)
+        if prefix:
+            flush_answer()
+            turns.append(Turn(ASSISTANT, line[len(prefix):].strip()))
+        elif not answer and line.startswith(_ANSWER_PREFIX):
+            answer.append(line[len(_ANSWER_PREFIX):])
+        else:
+            answer.append(line)
+    flush_answer()
+    return turns
+
+
+def _parse_created_at(value) -> Optional[datetime]:
+    if isinstance(value, (int, float)):
+        return datetime.fromtimestamp(value)
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value)
+        except ValueError:
+            return None
+    return None
+
+
+def _from_record(record, default_id) -> Transcript:
+    return Transcript(
+        id=str(record.get("id") or default_id),
+        focus=record.get("focus"),
+        created_at=_parse_created_at(record.get("created_at")),
+        turns=_turns_from_json(record.get("turns") or record.get("messages") or []),
+    )
+
+
+def iter_transcripts(source: str) -> Iterator[Transcript]:
+    """Stream transcripts from a directory (recursively) or a JSONL file, one at a time."""
+    if os.path.isdir(source):
+        for root, dirs, files in os.walk(source):
+            dirs.sort()
+            for name in sorted(files):
+                path = os.path.join(root, name)
+                relative = os.path.relpath(path, source)
+                extension = os.path.splitext(name)[1].lower()
+                if extension == ".jsonl":
+                    yield from _iter_jsonl(path, prefix=f"{relative}:")
+                elif extension == ".json":
+                    with open(path, "r", encoding="utf-8") as f:
+                        yield _from_record(json.load(f), relative)
+                elif extension in (".txt", ".md"):
+                    with open(path, "r", encoding="utf-8") as f:
+                        turns = _turns_from_text(f.read())
+                    yield Transcript(relative, None, datetime.fromtimestamp(os.path.getmtime(path)), turns)
+    else:
+        yield from _iter_jsonl(source)
+
+
+def _iter_jsonl(path, prefix=""):
+    with open(path, "r", encoding="utf-8") as f:
+        for number, line in enumerate(f, start=1):
+            if line.strip():
+                yield _from_record(json.loads(line), f"{prefix}line-{number}")
+
+
+class Manifest:
+    """Append-only JSONL record of finished items; the last entry per ID wins."""
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # a line cut short by a crash
+                    self.entries[entry["id"]] = entry
+        self._file = open(path, "a", encoding="utf-8")
+
+    def done(self, transcript_id) -> bool:
+        return self.entries.get(transcript_id, {}).get("status") == "done"
+
+    def outputs(self) -> set:
+        return {e["output"] for e in self.entries.values() if e.get("output")}
+
+    def record(self, entry):
+        self.entries[entry["id"]] = entry
+        self._file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self):
+        self._file.close()
+
+
+def extract_transcript(client, api_key, transcript: Transcript, timeout: float) -> str:
+    """Run the rolling extraction over a whole transcript and return the context markdown."""
+    extractor = RollingExtractor()
+    extractor.observe_turns(transcript.turns)
+    return extractor.finalize(client, api_key, timeout=timeout, batch_size=FOLD_BATCH)
+
+
+class BatchRun:
+    """One CLI invocation: inputs, outputs, concurrency and progress counters."""
+
+    def __init__(self, args, api_key):
+        self.args = args
+        self.api_key = api_key
+        self.client = llm.get_client(api_key)
+        os.makedirs(args.output, exist_ok=True)
+        self.manifest = Manifest(os.path.join(args.output, MANIFEST_NAME))
+        self.taken_names = self.manifest.outputs()
+        self.done = self.failed = self.skipped = 0
+        self.started = time.monotonic()
+
+    def output_name(self, transcript: Transcript) -> str:
+        """generate_markdown_filename, made unique within the output directory."""
+        name = generate_markdown_filename(transcript.focus, transcript.created_at)
+        stem, extension = os.path.splitext(name)
+        counter = 2
+        while name in self.taken_names or os.path.exists(os.path.join(self.args.output, name)):
+            name = f"{stem}_{counter}{extension}"
+            counter += 1
+        self.taken_names.add(name)
+        return name
+
+    def rate(self) -> float:
+        minutes = (time.monotonic() - self.started) / 60
+        return self.done / minutes if minutes > 0 else 0.0
+
+    def report(self, final=False):
+        line = (f"{self.done} done, {self.failed} failed, {self.skipped} skipped "
+                f"- {self.rate():.1f} transcripts/min")
+        print(("Finished: " if final else "") + line, file=sys.stderr, flush=True)
+
+    async def process(self, transcript: Transcript):
+        try:
+            markdown = await asyncio.get_running_loop().run_in_executor(
+                None, extract_transcript, self.client, self.api_key, transcript, self.args.timeout
+            )
+        except Exception as e:
+            self.failed += 1
+            self.manifest.record({"id": transcript.id, "status": "failed", "error": f"{type(e).__name__}: {e}",
+                                  "finished_at": time.time()})
+            print(f"{transcript.id}: {type(e).__name__}: {e}", file=sys.stderr, flush=True)
+        else:
+            name = self.output_name(transcript)
+            path = os.path.join(self.args.output, name)
+            with open(path + ".tmp", "w", encoding="utf-8") as f:
+                f.write(markdown)
+            os.replace(path + ".tmp", path)
+            self.done += 1
+            self.manifest.record({"id": transcript.id, "status": "done", "output": name,
+                                  "turns": len(transcript.turns), "finished_at": time.time()})
+        if (self.done + self.failed) % REPORT_EVERY == 0:
+            self.report()
+
+    async def run(self):
+        asyncio.get_running_loop().set_default_executor(
+            ThreadPoolExecutor(max_workers=self.args.concurrency, thread_name_prefix="batch-extract")
+        )
+        slots = asyncio.Semaphore(self.args.concurrency)
+        tasks = set()
+        for count, transcript in enumerate(iter_transcripts(self.args.source)):
+            if self.args.limit is not None and count >= self.args.limit:
+                break
+            if self.manifest.done(transcript.id) or (not self.args.retry_failed and transcript.id in self.manifest.entries):
+                self.skipped += 1
+                continue
+            if not any(not turn.is_question for turn in transcript.turns):
+                self.skipped += 1  # nothing was answered, so there is nothing to extract
+                continue
+            await slots.acquire()  # keeps at most `concurrency` transcripts in memory
+            task = asyncio.create_task(self.process(transcript))
+            tasks.add(task)
+
+            def finished(task):
+                tasks.discard(task)
+                slots.release()
+            task.add_done_callback(finished)
+        if tasks:
+            await asyncio.gather(*tasks)
+        self.manifest.close()
+        self.report(final=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Extract context files from archived interview transcripts.")
+    parser.add_argument("source", help="directory of transcripts, or a JSONL file with one transcript per line")
+    parser.add_argument("-o", "--output", default="contexts", help="directory for context_*.md files and the manifest")
+    parser.add_argument("--concurrency", type=int, default=4, help="transcripts extracted at once")
+    parser.add_argument("--rpm", type=float, default=None, help="requests per minute (default: CORN_RPM_LIMIT)")
+    parser.add_argument("--tpm", type=float, default=None, help="tokens per minute (default: CORN_TPM_LIMIT)")
+    parser.add_argument("--timeout", type=float, default=120, help="seconds per extraction call")
+    parser.add_argument("--limit", type=int, default=None, help="stop after this many transcripts")
+    parser.add_argument("--retry-failed", action="store_true", help="retry transcripts the manifest marks failed")
+    parser.add_argument("--api-key", default=os.environ.get("OPENAI_API_KEY"),
+                        help="defaults to OPENAI_API_KEY, then the app's stored key")
+    parser.add_argument("--profile", default=None, help="stored key profile to use (default: the active one)")
+    args = parser.parse_args(argv)
+    if args.profile or not args.api_key:
+        args.api_key = config_store.api_key(args.profile)
+    if not args.api_key:
+        parser.error("an API key is required (--api-key, OPENAI_API_KEY or a key stored by the app)")
+
+    if args.rpm is not None or args.tpm is not None:
+        scheduler = scheduler_for(llm.key_fingerprint(args.api_key))
+        scheduler.set_limits(
+            args.rpm if args.rpm is not None else scheduler.requests.per_minute,
+            args.tpm if args.tpm is not None else scheduler.tokens.per_minute,
+        )
+    run = BatchRun(args, args.api_key)
+    try:
+        asyncio.run(run.run())
+    except KeyboardInterrupt:
+        run.report(final=True)
+        print("Interrupted; rerun the same command to resume.", file=sys.stderr)
+        return 130
+    return 1 if run.failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+"""Rerun cost of the Interview tab at different transcript lengths.
+
+Seeds a stored session with 10, 100 and 1000 messages, resumes it through
+Streamlit's AppTest harness with a stubbed OpenAI client and reports the
+median full-rerun time, the time to submit one answer and the number of
+elements emitted.
+
+    python benchmarks/bench_render.py [--runs 5]
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def isolate_environment():
+    """Point config, the session store and background workers at throwaway state."""
+    home = tempfile.mkdtemp(prefix="corn-bench-")
+    os.environ["HOME"] = home
+    os.environ["CORN_DB_PATH"] = os.path.join(home, "sessions.db")
+    os.environ["CORN_TOPIC_POOL_SIZE"] = "0"
+    os.environ["CORN_SPECULATION_TOKENS_PER_HOUR"] = "0"
+    config_dir = os.path.join(home, ".config", "agentic_context")
+    os.makedirs(config_dir)
+    with open(os.path.join(config_dir, "config.json"), "w") as f:
+        json.dump({"api_key": "sk-bench"}, f)
+    return home
+
+
+def count_elements(at):
+    return sum(1 for _ in at._tree)
+
+
+def seed_session(store, messages):
+    from turns import Turn
+
+    session_id = store.create_session(None)
+    for i in range(messages):
+        if i % 2 == 0:
+            store.append_turn(session_id, Turn.question(f"Question {i}: tell me about part {i} of your story?"))
+        else:
+            store.append_turn(session_id, Turn.answer(f"Answer {i}. " + "Some detail about my life. " * 8))
+    return session_id
+
+
+def bench(length, runs):
+    from streamlit.testing.v1 import AppTest
+    from store import session_store
+
+    session_id = seed_session(session_store, length)
+    at = AppTest.from_file(os.path.join(ROOT, "app.py"), default_timeout=60)
+    at.query_params["session"] = session_id
+    at.run()  # warm-up: resume the session and fill per-process caches
+
+    rerun_times = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        at.run()
+        rerun_times.append(time.perf_counter() - started)
+    elements = count_elements(at)
+
+    started = time.perf_counter()
+    at.chat_input[0].set_value("One more answer for the benchmark.").run()
+    submit_time = time.perf_counter() - started
+    return {
+        "messages": length,
+        "rerun_ms": statistics.median(rerun_times) * 1000,
+        "submit_ms": submit_time * 1000,
+        "elements": elements,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="reruns timed per transcript length")
+    parser.add_argument("--lengths", type=int, nargs="+", default=[10, 100, 1000])
+    args = parser.parse_args()
+
+    isolate_environment()
+    from benchmarks import stub_openai
+    stub_openai.install()
+
+    print(f"{'messages':>8}  {'rerun ms':>9}  {'submit ms':>9}  {'elements':>8}")
+    for length in args.lengths:
+        result = bench(length, args.runs)
+        print(f"{result['messages']:>8}  {result['rerun_ms']:>9.1f}  {result['submit_ms']:>9.1f}  {result['elements']:>8}")
+
+
+if __name__ == "__main__":
+    main()
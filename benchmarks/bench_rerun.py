@@ -0,0 +1,166 @@
+"""Cost of one full rerun of app.py in each UI state.
+
+Runs the script headlessly through Streamlit's AppTest harness with a
+stubbed OpenAI client and measures, per state, the rerun wall time,
+Python allocations (peak and retained bytes, traced in a separate run so
+tracing does not skew the timings) and the number of elements emitted.
+
+States: ``idle`` (API key set, no interview), ``interview-N`` (a stored
+interview of N messages, resumed) and ``extracted`` (a finished interview
+with its context shown).
+
+Each run is saved to benchmarks/results/ and compared with the previous
+one, flagging metrics that regressed by more than --threshold percent.
+
+    python benchmarks/bench_rerun.py [--runs 10] [--lengths 10 100 1000] [--no-save]
+"""
+import argparse
+import glob
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.bench_render import count_elements, isolate_environment, seed_session  # noqa: E402
+
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+METRICS = ("rerun_ms", "rerun_p95_ms", "alloc_peak_kib", "retained_kib", "elements")
+CONTEXT_SECTIONS = ("Background", "Work", "Interests", "Values", "Goals", "Preferences")
+
+
+def prepare(state, store):
+    """An AppTest positioned in ``state``, after one warm-up run."""
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(os.path.join(ROOT, "app.py"), default_timeout=60)
+    if state.startswith("interview-"):
+        at.query_params["session"] = seed_session(store, int(state.split("-", 1)[1]))
+    elif state == "extracted":
+        session_id = seed_session(store, 40)
+        context = "\n\n".join(f"## {name}\n" + "- A remembered detail about the user.\n" * 8
+                              for name in CONTEXT_SECTIONS)
+        store.update_session(session_id, complete=True, context_data=context)
+        at.query_params["session"] = session_id
+    at.run()
+    if at.exception:
+        raise RuntimeError(f"{state}: {at.exception[0].value}")
+    return at
+
+
+def measure(at, runs):
+    times = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        at.run()
+        times.append(time.perf_counter() - started)
+    times.sort()
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    at.run()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "rerun_ms": statistics.median(times) * 1000,
+        "rerun_p95_ms": times[min(len(times) - 1, int(0.95 * len(times)))] * 1000,
+        "alloc_peak_kib": (peak - before) / 1024,
+        "retained_kib": (retained - before) / 1024,
+        "elements": count_elements(at),
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def previous_results():
+    paths = sorted(glob.glob(os.path.join(RESULTS_DIR, "rerun-*.json")))
+    if not paths:
+        return None, None
+    with open(paths[-1], "r", encoding="utf-8") as f:
+        return paths[-1], json.load(f)
+
+
+def save(results) -> str:
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(results["created_at"]))
+    path = os.path.join(RESULTS_DIR, f"rerun-{stamp}-{results['commit'] or 'nogit'}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+        f.write("\n")
+    return path
+
+
+def compare(current, previous, threshold):
+    """Print the change against a previous run; returns the metrics that regressed."""
+    regressions = []
+    print(f"\nChange since {previous.get('commit') or 'previous run'} "
+          f"({time.strftime('%Y-%m-%d %H:%M', time.localtime(previous['created_at']))}):")
+    for state, metrics in current["states"].items():
+        before = previous["states"].get(state)
+        if before is None:
+            continue
+        changes = []
+        for metric in METRICS:
+            old, new = before.get(metric), metrics[metric]
+            if not old:
+                continue
+            change = (new - old) / abs(old) * 100
+            flag = ""
+            if change > threshold:
+                flag = " !"
+                regressions.append((state, metric, change))
+            changes.append(f"{metric} {change:+.0f}%{flag}")
+        print(f"  {state:<18} " + ", ".join(changes))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10, help="timed reruns per state")
+    parser.add_argument("--lengths", type=int, nargs="+", default=[10, 100, 1000], help="interview lengths (messages)")
+    parser.add_argument("--threshold", type=float, default=10, help="percent increase reported as a regression")
+    parser.add_argument("--no-save", action="store_true", help="compare with the last saved run without saving this one")
+    parser.add_argument("--fail-on-regression", action="store_true", help="exit 1 if any metric regressed")
+    args = parser.parse_args()
+
+    isolate_environment()
+    from benchmarks import stub_openai
+    stub_openai.install()
+    from store import session_store
+
+    states = ["idle"] + [f"interview-{n}" for n in args.lengths] + ["extracted"]
+    results = {
+        "created_at": time.time(),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "runs": args.runs,
+        "states": {},
+    }
+    print(f"{'state':<18} {'rerun ms':>9} {'p95 ms':>9} {'peak KiB':>9} {'kept KiB':>9} {'elements':>8}")
+    for state in states:
+        metrics = results["states"][state] = measure(prepare(state, session_store), args.runs)
+        print(f"{state:<18} {metrics['rerun_ms']:>9.1f} {metrics['rerun_p95_ms']:>9.1f} "
+              f"{metrics['alloc_peak_kib']:>9.0f} {metrics['retained_kib']:>9.0f} {metrics['elements']:>8}")
+
+    _, previous = previous_results()
+    regressions = compare(results, previous, args.threshold) if previous else []
+    if not args.no_save:
+        print(f"\nSaved {os.path.relpath(save(results), ROOT)}")
+    return 1 if regressions and args.fail_on_regression else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
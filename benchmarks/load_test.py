@@ -0,0 +1,153 @@
+"""Concurrent-session load test of the app against the local mock API.
+
+Drives N simulated users through Streamlit's AppTest harness, each in its
+own session: start an interview, answer a number of questions, end the
+interview, wait for the extracted context and export it. Every call goes
+over HTTP to ``mock_openai`` (in-process unless --base-url is given), so
+the client pool, scheduler, retries and streaming all take part.
+
+AppTest patches process-wide Streamlit state on every run, so sessions
+cannot share a process; each concurrent user gets a worker process, and
+process-wide pools and caches are per worker rather than shared.
+
+Reports rerun latency percentiles per step, traced Python memory per
+session and throughput, for comparing scaling changes to app.py.
+
+    python benchmarks/load_test.py --sessions 20 --concurrency 5 --turns 6 --ttft lognormal:0.3,0.4
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks import mock_openai  # noqa: E402
+from benchmarks.bench_render import isolate_environment  # noqa: E402
+
+STEPS = ("load", "start", "answer", "end", "poll", "export")
+EXTRACTION_POLL = 0.5  # seconds between reruns while waiting for the context
+
+
+def button(at, label):
+    return next((b for b in at.button if b.label == label), None)
+
+
+def warm_up(timeout):
+    """Pay for imports and per-process caches once per worker, outside the measurements."""
+    from streamlit.testing.v1 import AppTest
+
+    AppTest.from_file(os.path.join(ROOT, "app.py"), default_timeout=timeout).run()
+
+
+def simulate_session(number, turns, timeout, trace_memory):
+    """One user's full flow in this worker; returns timings per step and the memory the session holds."""
+    from streamlit.testing.v1 import AppTest
+
+    timings = defaultdict(list)
+
+    def timed(step, action):
+        started = time.perf_counter()
+        at = action()
+        timings[step].append(time.perf_counter() - started)
+        if at.exception:
+            raise RuntimeError(f"{step}: {at.exception[0].value}")
+        return at
+
+    if trace_memory:
+        tracemalloc.start()
+    try:
+        at = AppTest.from_file(os.path.join(ROOT, "app.py"), default_timeout=timeout)
+        timed("load", at.run)
+        timed("start", button(at, "Start New Interview").click().run)
+        for turn in range(turns):
+            answer = f"Session {number}, answer {turn}: " + "some detail about my work and life. " * 6
+            timed("answer", at.chat_input[0].set_value(answer).run)
+        timed("end", button(at, "End Interview").click().run)
+        deadline = time.monotonic() + timeout
+        while button(at, "Download as Markdown") is None:  # shown once a full run sees the context
+            if not at.session_state.extraction_job and not at.session_state.context_data:
+                raise RuntimeError(f"no context extracted: {at.session_state.extraction_error}")
+            if time.monotonic() > deadline:
+                raise TimeoutError("extraction did not finish")
+            time.sleep(EXTRACTION_POLL)
+            timed("poll", at.run)
+        timed("export", button(at, "Download as Markdown").click().run)
+        memory = tracemalloc.get_traced_memory() if trace_memory else None  # while `at` is still alive
+        return {"timings": dict(timings), "memory": memory, "error": None}
+    except Exception as e:
+        return {"timings": dict(timings), "memory": None, "error": f"session {number}: {type(e).__name__}: {e}"}
+    finally:
+        if trace_memory:
+            tracemalloc.stop()
+
+
+def report(args, wall, results, mock_counts):
+    from telemetry import percentiles
+
+    completed = [r for r in results if r["error"] is None]
+    print(f"\n{len(completed)}/{args.sessions} sessions completed in {wall:.1f}s "
+          f"({len(completed) / wall * 60:.1f} sessions/min, concurrency {args.concurrency})")
+    timings = defaultdict(list)
+    for result in results:
+        for step, times in result["timings"].items():
+            timings[step].extend(times)
+    reruns = sum(len(t) for t in timings.values())
+    print(f"{reruns} reruns ({reruns / wall:.1f}/s)")
+    print(f"\n{'step':<8} {'runs':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for step in STEPS:
+        if timings.get(step):
+            p = percentiles(timings[step])
+            print(f"{step:<8} {len(timings[step]):>6} {p['p50'] * 1000:>9.1f} {p['p95'] * 1000:>9.1f} "
+                  f"{p['p99'] * 1000:>9.1f}")
+    memory = [r["memory"] for r in completed if r["memory"]]
+    if memory:
+        held = percentiles(m[0] for m in memory)
+        peak = percentiles(m[1] for m in memory)
+        print(f"\nTraced memory per session: {held['p50'] / 2**10:.0f} KiB held (p95 {held['p95'] / 2**10:.0f}), "
+              f"{peak['p50'] / 2**10:.0f} KiB peak (p95 {peak['p95'] / 2**10:.0f})")
+    if mock_counts is not None:
+        print(f"Mock API: {dict(mock_counts)}")
+    for result in results:
+        if result["error"]:
+            print(f"error: {result['error']}", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=10, help="simulated users in total")
+    parser.add_argument("--concurrency", type=int, default=5, help="users active at once (one worker process each)")
+    parser.add_argument("--turns", type=int, default=4, help="answers per interview")
+    parser.add_argument("--timeout", type=float, default=120, help="seconds allowed per rerun and per extraction")
+    parser.add_argument("--base-url", help="use an already running mock (or other compatible server)")
+    parser.add_argument("--no-tracemalloc", action="store_true", help="skip memory tracing, which slows reruns")
+    mock_openai.add_arguments(parser)
+    args = parser.parse_args()
+
+    isolate_environment()  # workers inherit the environment
+    settings = None
+    if args.base_url:
+        os.environ["OPENAI_BASE_URL"] = args.base_url
+    else:
+        settings = mock_openai.settings_from(args)
+        _, os.environ["OPENAI_BASE_URL"] = mock_openai.start(settings)
+
+    # Hand the workers functions by module name: AppTest replaces __main__ with app.py in each worker
+    from benchmarks import load_test
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(args.concurrency, initializer=load_test.warm_up, initargs=(args.timeout,)) as pool:
+        pool.apply(time.sleep, (0,))  # let the workers start before the clock does
+        jobs = [(n, args.turns, args.timeout, not args.no_tracemalloc) for n in range(args.sessions)]
+        started = time.perf_counter()
+        results = pool.starmap(load_test.simulate_session, jobs, chunksize=1)
+        wall = time.perf_counter() - started
+    report(args, wall, results, settings.counts if settings else None)
+    return 1 if any(r["error"] for r in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
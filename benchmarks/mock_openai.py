@@ -0,0 +1,195 @@
+"""Local stand-in for the OpenAI chat completions endpoint, over real HTTP.
+
+Unlike ``stub_openai`` this exercises the whole client path (connection
+pool, timeouts, retries, SSE parsing) without network access or API spend.
+Latency follows a configurable distribution, and a share of requests can
+fail with 429 or 5xx to exercise backoff, the circuit breaker and failover.
+
+    python benchmarks/mock_openai.py --port 8089 --ttft lognormal:0.4,0.5 --rate-429 0.05
+    OPENAI_BASE_URL=http://127.0.0.1:8089/v1 streamlit run app.py
+
+Latency specs: ``fixed:S``, ``uniform:LOW,HIGH``, ``normal:MEAN,SD`` or
+``lognormal:MEDIAN,SIGMA``, all in seconds (``0`` means no delay).
+"""
+import argparse
+import json
+import math
+import random
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+_WORDS = ("tell me more about how that shaped the way you work today and what you would do "
+          "differently if you were starting again").split()
+
+
+def parse_latency(spec: str):
+    """Turn a latency spec into a function returning a delay in seconds."""
+    kind, _, args = spec.partition(":")
+    values = [float(v) for v in args.split(",")] if args else []
+    if kind in ("0", "none") or (kind == "fixed" and not values[0]):
+        return lambda: 0.0
+    if kind == "fixed":
+        return lambda: values[0]
+    if kind == "uniform":
+        return lambda: random.uniform(values[0], values[1])
+    if kind == "normal":
+        return lambda: max(0.0, random.gauss(values[0], values[1]))
+    if kind == "lognormal":
+        return lambda: random.lognormvariate(math.log(values[0]), values[1])
+    raise ValueError(f"Unknown latency spec: {spec!r}")
+
+
+class MockSettings:
+    """How the mock behaves; shared by every request thread."""
+
+    def __init__(self, ttft="0", token_delay="0", completion_tokens=40, rate_429=0.0, rate_5xx=0.0):
+        self.ttft = parse_latency(ttft)
+        self.token_delay = parse_latency(token_delay)
+        self.completion_tokens = completion_tokens
+        self.rate_429 = rate_429
+        self.rate_5xx = rate_5xx
+        self.lock = threading.Lock()
+        self.counts = Counter()  # requests, streamed, 429, 5xx, tokens
+
+    def count(self, **amounts):
+        with self.lock:
+            self.counts.update(amounts)
+
+
+def _prompt_tokens(request) -> int:
+    text = " ".join(str(m.get("content") or "") for m in request.get("messages", []))
+    return max(1, len(text) // 4)
+
+
+def _completion_words(n):
+    return [_WORDS[i % len(_WORDS)] for i in range(n)]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, as the real API does
+    settings = None  # set per server by start()
+
+    def do_POST(self):
+        if self.path.rstrip("/").split("?")[0] not in ("/v1/chat/completions", "/chat/completions"):
+            self._json(404, {"error": {"message": "Not found", "type": "invalid_request_error"}})
+            return
+        request = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)) or b"{}")
+        settings = self.settings
+        settings.count(requests=1)
+
+        roll = random.random()
+        if roll < settings.rate_429:
+            settings.count(**{"429": 1})
+            self._json(429, {"error": {"message": "Rate limit reached (mock)", "type": "requests",
+                                       "code": "rate_limit_exceeded"}}, {"Retry-After": "1"})
+            return
+        if roll < settings.rate_429 + settings.rate_5xx:
+            settings.count(**{"5xx": 1})
+            self._json(random.choice((500, 502, 503)), {"error": {"message": "Server error (mock)",
+                                                                  "type": "server_error"}})
+            return
+
+        time.sleep(settings.ttft())
+        words = _completion_words(request.get("max_tokens") and min(request["max_tokens"], settings.completion_tokens)
+                                  or settings.completion_tokens)
+        usage = {"prompt_tokens": _prompt_tokens(request), "completion_tokens": len(words)}
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+        settings.count(tokens=usage["total_tokens"])
+        base = {"id": f"chatcmpl-mock-{random.getrandbits(48):x}", "created": int(time.time()),
+                "model": request.get("model") or "mock"}
+        if request.get("stream"):
+            settings.count(streamed=1)
+            self._stream(base, words, usage, (request.get("stream_options") or {}).get("include_usage"))
+        else:
+            time.sleep(sum(settings.token_delay() for _ in words))
+            message = {"role": "assistant", "content": " ".join(words)}
+            self._json(200, dict(base, object="chat.completion", usage=usage,
+                                 choices=[{"index": 0, "message": message, "finish_reason": "stop"}]))
+
+    def _stream(self, base, words, usage, include_usage):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        def chunk(delta, finish_reason=None, **extra):
+            choices = [{"index": 0, "delta": delta, "finish_reason": finish_reason}] if delta is not None else []
+            self._send_chunk(dict(base, object="chat.completion.chunk", choices=choices, **extra))
+
+        try:
+            chunk({"role": "assistant", "content": ""})
+            for i, word in enumerate(words):
+                if i:
+                    time.sleep(self.settings.token_delay())
+                chunk({"content": word if i == 0 else " " + word})
+            chunk({}, "stop")
+            if include_usage:
+                chunk(None, usage=usage)
+            self._write_chunk(b"data: [DONE]\n\n")
+            self._write_chunk(b"")
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # the client closed the stream early, e.g. a lost hedge race
+
+    def _send_chunk(self, payload):
+        self._write_chunk(f"data: {json.dumps(payload)}\n\n".encode("utf-8"))
+
+    def _write_chunk(self, data: bytes):
+        self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+    def _json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start(settings: MockSettings = None, host="127.0.0.1", port=0):
+    """Serve the mock from a daemon thread; returns ``(server, base_url)``."""
+    handler = type("MockHandler", (_Handler,), {"settings": settings or MockSettings()})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="mock-openai", daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}/v1"
+
+
+def add_arguments(parser):
+    parser.add_argument("--ttft", default="0", help="latency before the first token (default: none)")
+    parser.add_argument("--token-delay", default="0", help="latency between streamed tokens (default: none)")
+    parser.add_argument("--completion-tokens", type=int, default=40, help="tokens per completion")
+    parser.add_argument("--rate-429", type=float, default=0.0, help="share of requests answered with 429")
+    parser.add_argument("--rate-5xx", type=float, default=0.0, help="share of requests answered with 5xx")
+
+
+def settings_from(args) -> MockSettings:
+    return MockSettings(args.ttft, args.token_delay, args.completion_tokens, args.rate_429, args.rate_5xx)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    add_arguments(parser)
+    args = parser.parse_args()
+    settings = settings_from(args)
+    server, base_url = start(settings, args.host, args.port)
+    print(f"Mock OpenAI API at {base_url} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(10)
+            print(dict(settings.counts), flush=True)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
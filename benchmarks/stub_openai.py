@@ -0,0 +1,42 @@
+"""In-process stand-in for the OpenAI client, for benchmarks that must not hit the network.
+
+``install()`` replaces ``openai.OpenAI`` so every client the app builds
+returns canned completions (streamed or not) immediately.
+"""
+import itertools
+import types
+
+import openai
+
+_counter = itertools.count()
+
+
+def _chunk(text, finish_reason=None):
+    choice = types.SimpleNamespace(delta=types.SimpleNamespace(content=text), finish_reason=finish_reason, index=0)
+    return types.SimpleNamespace(choices=[choice], usage=None)
+
+
+class _Completions:
+    def create(self, stream=False, **request):
+        text = f"Stub question {next(_counter)}: what else can you tell me about that?"
+        if stream:
+            words = text.split(" ")
+            return iter([_chunk(w + " ") for w in words[:-1]] + [_chunk(words[-1]), _chunk(None, "stop")])
+        message = types.SimpleNamespace(role="assistant", content=text)
+        usage = types.SimpleNamespace(prompt_tokens=100, completion_tokens=15, total_tokens=115)
+        return types.SimpleNamespace(choices=[types.SimpleNamespace(message=message, finish_reason="stop")], usage=usage)
+
+
+class StubOpenAI:
+    def __init__(self, *args, **kwargs):
+        self.chat = types.SimpleNamespace(completions=_Completions())
+
+    def with_options(self, **kwargs):
+        return self
+
+    def close(self):
+        pass
+
+
+def install():
+    openai.OpenAI = StubOpenAI
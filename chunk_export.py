@@ -0,0 +1,222 @@
+"""Chunked, vector-database-ready export of extracted contexts.
+
+Each completed session's context markdown is split into its sections, and
+each section into chunks of at most ``--max-tokens`` tokens on paragraph,
+line and sentence boundaries. A chunk's ID is a hash of its session, section
+and text, so the same content always gets the same ID and an edited chunk
+gets a new one. Records stream out as JSONL, ready to upsert into Pinecone,
+Chroma or a LlamaIndex ingestion pipeline:
+
+    {"op": "upsert", "id": ..., "text": ..., "metadata": {"session_id", "subject", "section", ...}}
+    {"op": "delete", "id": ..., "metadata": {"session_id": ...}}
+
+A manifest next to the output remembers what was exported for each session,
+so a re-export only emits new and changed chunks, plus deletes for chunks
+that no longer exist, and skips sessions that have not changed at all.
+
+    python chunk_export.py -o exports/ [--max-tokens 300] [--full]
+"""
+import argparse
+import hashlib
+import itertools
+import json
+import os
+import re
+import sys
+import time
+from datetime import datetime
+from typing import Iterator, List, Tuple
+
+from memory import count_tokens
+from store import session_store
+
+DEFAULT_MAX_TOKENS = 300
+MANIFEST_NAME = "chunk_manifest.jsonl"
+DEFAULT_SUBJECT = "General"
+
+_HEADING = re.compile(r"^(#{1,6})\s+(.*?)\s*#*\s*$")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+def split_sections(markdown: str) -> List[Tuple[str, str]]:
+    """``(section path, body)`` pairs, e.g. ``("User Summary > Highlights", "- ...")``; empty bodies are dropped."""
+    sections = []
+    path = []
+    body = []
+
+    def flush():
+        text = "\n".join(body).strip()
+        if text:
+            sections.append((" > ".join(title for _, title in path), text))
+        body.clear()
+
+    for line in markdown.splitlines():
+        match = _HEADING.match(line)
+        if match:
+            flush()
+            level = len(match.group(1))
+            while path and path[-1][0] >= level:
+                path.pop()
+            path.append((level, match.group(2)))
+        else:
+            body.append(line)
+    flush()
+    return sections
+
+
+def _pieces(body: str, max_tokens: int) -> Iterator[str]:
+    """Paragraphs and list items, with any that are too long split on sentences, then words."""
+    for block in re.split(r"\n\s*\n", body):
+        for line in filter(str.strip, block.splitlines()):
+            if count_tokens(line) <= max_tokens:
+                yield line
+                continue
+            for sentence in _SENTENCE_END.split(line):
+                if count_tokens(sentence) <= max_tokens:
+                    yield sentence
+                    continue
+                words = []
+                for word in sentence.split():
+                    if words and count_tokens(" ".join(words + [word])) > max_tokens:
+                        yield " ".join(words)
+                        words = []
+                    words.append(word)
+                if words:
+                    yield " ".join(words)
+
+
+def chunk_section(section: str, body: str, max_tokens: int = DEFAULT_MAX_TOKENS) -> List[str]:
+    """The section's body packed into chunks of at most ``max_tokens``, each headed by the section path."""
+    heading = f"{section}\n\n" if section else ""
+    budget = max(1, max_tokens - count_tokens(heading))
+    chunks = []
+    current = []
+    for piece in _pieces(body, budget):
+        if current and count_tokens("\n".join(current + [piece])) > budget:
+            chunks.append(heading + "\n".join(current))
+            current = []
+        current.append(piece)
+    if current:
+        chunks.append(heading + "\n".join(current))
+    return chunks
+
+
+def chunk_id(session_id: str, section: str, text: str) -> str:
+    return hashlib.sha256(f"{session_id}\x1f{section}\x1f{text}".encode("utf-8")).hexdigest()[:32]
+
+
+def _iso(timestamp):
+    return datetime.fromtimestamp(timestamp).isoformat(timespec="seconds") if timestamp else None
+
+
+def session_chunks(session: dict, max_tokens: int = DEFAULT_MAX_TOKENS) -> List[dict]:
+    """Upsert records for every chunk of one session's context."""
+    records = []
+    for section, body in split_sections(session.get("context_data") or ""):
+        for index, text in enumerate(chunk_section(section, body, max_tokens)):
+            records.append({
+                "op": "upsert",
+                "id": chunk_id(session["id"], section, text),
+                "text": text,
+                "metadata": {
+                    "session_id": session["id"],
+                    "subject": session.get("focus") or DEFAULT_SUBJECT,
+                    "section": section,
+                    "chunk_index": index,
+                    "tokens": count_tokens(text),
+                    "created_at": _iso(session.get("created_at")),
+                    "updated_at": _iso(session.get("updated_at")),
+                },
+            })
+    return records
+
+
+def to_jsonl(records) -> str:
+    return "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records)
+
+
+def _fingerprint(session, max_tokens) -> str:
+    return hashlib.sha256(f"{max_tokens}\x1f{session.get('focus')}\x1f{session['context_data']}".encode("utf-8")).hexdigest()
+
+
+def export_changes(sessions, manifest, out, max_tokens=DEFAULT_MAX_TOKENS, full=False):
+    """Write new and changed chunks (and deletes for vanished ones) to ``out``.
+
+    Returns the counts and the manifest entries to record, which the caller
+    records only once ``out`` is safely on disk.
+    """
+    counts = {"sessions": 0, "unchanged": 0, "upserts": 0, "deletes": 0}
+    entries = []
+    for session in sessions:
+        previous = {} if full else manifest.entries.get(session["id"], {})
+        fingerprint = _fingerprint(session, max_tokens)
+        if previous.get("fingerprint") == fingerprint:
+            counts["unchanged"] += 1
+            continue
+        records = session_chunks(session, max_tokens)
+        ids = [r["id"] for r in records]
+        known = set(previous.get("chunks", ()))
+        fresh = [r for r in records if r["id"] not in known]
+        gone = known - set(ids)
+        out.write(to_jsonl(fresh))
+        out.write(to_jsonl({"op": "delete", "id": i, "metadata": {"session_id": session["id"]}} for i in sorted(gone)))
+        entries.append({"id": session["id"], "fingerprint": fingerprint, "chunks": ids,
+                        "updated_at": session["updated_at"], "exported_at": time.time()})
+        counts["sessions"] += 1
+        counts["upserts"] += len(fresh)
+        counts["deletes"] += len(gone)
+    return counts, entries
+
+
+def create_output(directory):
+    """Open a new chunk file; an export never reuses (and so never truncates) an earlier one."""
+    stem = os.path.join(directory, f"chunks-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}")
+    for attempt in itertools.count():
+        path = f"{stem}-{attempt}.jsonl" if attempt else f"{stem}.jsonl"
+        try:
+            return path, open(path, "x", encoding="utf-8")
+        except FileExistsError:
+            continue
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export completed interview contexts as JSONL chunks.")
+    parser.add_argument("-o", "--output", default="exports", help="directory for chunk files and the manifest")
+    parser.add_argument("--max-tokens", type=int, default=DEFAULT_MAX_TOKENS, help="upper bound per chunk")
+    parser.add_argument("--full", action="store_true", help="emit every chunk, ignoring what was exported before")
+    parser.add_argument("--stdout", action="store_true", help="stream chunks to stdout instead of a file")
+    args = parser.parse_args(argv)
+    from batch_extract import Manifest  # CLI only; the app imports this module too
+
+    os.makedirs(args.output, exist_ok=True)
+    manifest = Manifest(os.path.join(args.output, MANIFEST_NAME))
+    # Sessions untouched since the last export cannot have changed, so the scan starts there
+    since = 0.0 if args.full else max((e.get("updated_at", 0.0) for e in manifest.entries.values()), default=0.0)
+    path = None
+    if args.stdout:
+        out = sys.stdout
+    else:
+        path, out = create_output(args.output)
+    try:
+        counts, entries = export_changes(session_store.iter_completed(updated_after=since), manifest, out,
+                                         args.max_tokens, args.full)
+        out.flush()
+        if path:
+            os.fsync(out.fileno())
+        # Only chunks that reached the disk count as exported
+        for entry in entries:
+            manifest.record(entry)
+    finally:
+        manifest.close()
+        if path:
+            out.close()
+    if path and not (counts["upserts"] or counts["deletes"]):
+        os.remove(path)
+        path = None
+    print(f"{counts['sessions']} sessions exported ({counts['upserts']} upserts, {counts['deletes']} deletes), "
+          f"{counts['unchanged']} unchanged" + (f" -> {path}" if path else ""), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,297 @@
+"""Incremental compaction of many context files into one merged profile.
+
+Every interview leaves its own ``context_*.md``; this keeps a single profile
+document that merges them section by section. Each source (a context file,
+or a completed session with ``--sessions``) is split into sections and every
+section is hashed. Sections from different sources that share a heading feed
+the same profile section, and the state file remembers these edges: which
+source section hashes each profile section was merged from.
+
+A run re-reads only sources whose mtime/size (or updated_at) changed, and
+re-summarises only profile sections whose inputs changed. New inputs are
+folded into the existing merged text, so the model sees the new material
+rather than the whole history; a section is rebuilt from its inputs only
+when one of them was edited or removed. A section with a single input is
+copied as is, with no model call.
+
+    python compaction.py contexts/ example-output/ --sessions -o profile.md [--dry-run]
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, NamedTuple
+
+import llm
+from config_store import config_store
+from extraction import parse_sections
+from store import session_store
+
+STATE_VERSION = 1
+MERGE_BATCH = 6  # new inputs folded per call, keeping prompts bounded
+MERGE_MAX_TOKENS = 800
+PROFILE_HEADING = "## User Profile"
+
+COMPACTION_SYSTEM_PROMPT = """You are Corn, a diligent sloth assistant who keeps one merged context profile of a user.
+You will be given one section of that profile and new material for it taken from other interviews.
+Merge the new material into the section:
+1. Keep every distinct fact, preference and insight, and drop exact repeats
+2. Where the new material contradicts the section, prefer the new material
+3. Maintain the user's voice and perspective
+4. Use markdown bullet points, as in the inputs
+Return ONLY the merged body of the section, without its heading."""
+
+
+class Work(NamedTuple):
+    key: str
+    rebuild: bool  # an input was edited or removed, so the section is merged again from all of its inputs
+    sources: List[str]  # inputs to merge: all of them when rebuilding, otherwise only the new ones
+
+
+def section_key(heading: str) -> str:
+    """Headings that differ only in case or spacing feed the same profile section."""
+    return " ".join(heading.lower().split())
+
+
+def section_hash(body: str) -> str:
+    return hashlib.sha256(body.strip().encode("utf-8")).hexdigest()[:16]
+
+
+def read_sections(markdown: str) -> dict:
+    """``key -> {"heading", "hash", "body"}`` for each non-empty section of a context file."""
+    sections = {}
+    for heading, body in parse_sections(markdown or "").items():
+        key = section_key(heading)
+        if key in sections:
+            body = sections[key]["body"] + "\n" + body
+        sections[key] = {"heading": heading, "hash": section_hash(body), "body": body}
+    return sections
+
+
+def empty_state() -> dict:
+    return {"version": STATE_VERSION, "sources": {}, "sections": {}}
+
+
+def load_state(path) -> dict:
+    """The cached merge graph, or an empty one if there is none (or it is from another version)."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return empty_state()
+    return state if state.get("version") == STATE_VERSION else empty_state()
+
+
+def save_state(state, path):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(state, f, ensure_ascii=False, indent=1)
+    os.replace(path + ".tmp", path)
+
+
+def _file_sources(paths, exclude):
+    for path in paths:
+        if os.path.isdir(path):
+            for name in sorted(os.listdir(path)):
+                full = os.path.abspath(os.path.join(path, name))
+                if name.endswith(".md") and full not in exclude:
+                    yield full
+        elif os.path.abspath(path) not in exclude:
+            yield os.path.abspath(path)
+
+
+def scan(state, paths, include_sessions, exclude=()) -> dict:
+    """Re-read new and changed sources into ``state``, dropping vanished ones; returns counts."""
+    known = state["sources"]
+    present = set()
+    counts = {"read": 0, "removed": 0}
+    for path in _file_sources(paths, set(exclude)):
+        source = f"file:{path}"
+        present.add(source)
+        st = os.stat(path)
+        stamp = [st.st_mtime_ns, st.st_size]
+        if known.get(source, {}).get("stamp") != stamp:
+            with open(path, "r", encoding="utf-8") as f:
+                known[source] = {"stamp": stamp, "sections": read_sections(f.read())}
+            counts["read"] += 1
+    if include_sessions:
+        present.update(s for s in known if s.startswith("session:"))
+        # Sessions untouched since the newest one already read cannot have changed
+        since = max((e["stamp"] for s, e in known.items() if s.startswith("session:")), default=0.0)
+        for session in session_store.iter_completed(updated_after=since):
+            source = f"session:{session['id']}"
+            present.add(source)
+            if known.get(source, {}).get("stamp") != session["updated_at"]:
+                known[source] = {"stamp": session["updated_at"], "sections": read_sections(session["context_data"])}
+                counts["read"] += 1
+    for source in [s for s in known if s not in present]:
+        del known[source]
+        counts["removed"] += 1
+    return counts
+
+
+def plan(state) -> List[Work]:
+    """Profile sections whose merged inputs differ from what their sources now hold."""
+    targets = {}  # section key -> {source: hash} it should be merged from
+    for source, entry in state["sources"].items():
+        for key, section in entry["sections"].items():
+            targets.setdefault(key, {})[source] = section["hash"]
+    work = []
+    for key in list(state["sections"]) + [k for k in targets if k not in state["sections"]]:
+        target = targets.get(key, {})
+        merged = state["sections"].get(key, {}).get("inputs", {})
+        if target == merged:
+            continue
+        rebuild = any(target.get(source) != h for source, h in merged.items())
+        work.append(Work(key, rebuild, [s for s in target if rebuild or s not in merged]))
+    return work
+
+
+def merge_section(client, api_key, heading, current, bodies, timeout):
+    """Fold ``bodies`` into the merged ``current`` text, MERGE_BATCH at a time; returns ``(text, model calls)``."""
+    calls = 0
+    for start in range(0, len(bodies), MERGE_BATCH):
+        batch = bodies[start:start + MERGE_BATCH]
+        if not current and len(batch) == 1:
+            current = batch[0]
+            continue
+        material = "\n\n---\n\n".join(batch)
+        current = llm.chat(
+            client,
+            api_key,
+            timeout=timeout,
+            call_site="compaction",
+            messages=[
+                {"role": "system", "content": COMPACTION_SYSTEM_PROMPT},
+                {"role": "user", "content": f"Section: {heading}\n\nCurrent section:\n\n{current or '(empty)'}\n\nNew material:\n\n{material}"}
+            ],
+            temperature=0.3,
+            max_tokens=MERGE_MAX_TOKENS
+        ).strip()
+        calls += 1
+    return current, calls
+
+
+def needs_model(state, item: Work) -> bool:
+    """Whether merging ``item`` takes a model call rather than a copy or a drop."""
+    section = state["sections"].get(item.key, {})
+    current = "" if item.rebuild else section.get("body", "")
+    known = set() if item.rebuild else set(section.get("inputs", {}).values())
+    hashes = {state["sources"][s]["sections"][item.key]["hash"] for s in item.sources} - known
+    return len(hashes) > (0 if current else 1)
+
+
+class Compactor:
+    """One compaction run over a loaded state: applies planned merges and saves after each."""
+
+    def __init__(self, state, state_path, client=None, api_key=None, timeout=120):
+        self.state = state
+        self.state_path = state_path
+        self.client = client
+        self.api_key = api_key
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self.calls = 0
+
+    def apply(self, item: Work):
+        sources = self.state["sources"]
+        with self._lock:
+            section = self.state["sections"].get(item.key, {})
+            inputs = {} if item.rebuild else dict(section.get("inputs", {}))
+            current = "" if item.rebuild else section.get("body", "")
+            seen = set(inputs.values())
+        bodies = []
+        for source in item.sources:
+            entry = sources[source]["sections"][item.key]
+            if entry["hash"] not in seen:  # the same text from several sources is merged once
+                seen.add(entry["hash"])
+                bodies.append(entry["body"])
+            inputs[source] = entry["hash"]
+        if not inputs:
+            with self._lock:
+                self.state["sections"].pop(item.key, None)
+                save_state(self.state, self.state_path)
+            return
+        heading = section.get("heading") or sources[item.sources[0]]["sections"][item.key]["heading"]
+        body, calls = merge_section(self.client, self.api_key, heading, current, bodies, self.timeout)
+        with self._lock:
+            self.calls += calls
+            self.state["sections"][item.key] = {"heading": heading, "inputs": inputs, "body": body}
+            save_state(self.state, self.state_path)
+
+    def run(self, work: List[Work], concurrency=4):
+        order = list(self.state["sections"]) + [w.key for w in work if w.key not in self.state["sections"]]
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="compaction") as pool:
+            for future in [pool.submit(self.apply, item) for item in work]:
+                future.result()
+        # Sections finish in any order; keep the profile's order stable across runs
+        sections = self.state["sections"]
+        self.state["sections"] = {key: sections[key] for key in order if key in sections}
+        save_state(self.state, self.state_path)
+
+    def render(self) -> str:
+        sections = self.state["sections"].values()
+        return "\n\n".join([PROFILE_HEADING] + [f"### {s['heading']}\n{s['body']}" for s in sections]) + "\n"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Merge context files into one profile, re-summarising only what changed.")
+    parser.add_argument("sources", nargs="*", help="context_*.md files, or directories of them")
+    parser.add_argument("--sessions", action="store_true", help="also merge the app's completed sessions")
+    parser.add_argument("-o", "--output", default="profile.md", help="merged profile to write")
+    parser.add_argument("--state", help="merge graph cache (default: next to the output)")
+    parser.add_argument("--concurrency", type=int, default=4, help="sections merged at once")
+    parser.add_argument("--timeout", type=float, default=120, help="seconds per merge call")
+    parser.add_argument("--full", action="store_true", help="ignore the cache and merge everything again")
+    parser.add_argument("--dry-run", action="store_true", help="show what would be merged without calling the model")
+    parser.add_argument("--api-key", default=os.environ.get("OPENAI_API_KEY"),
+                        help="defaults to OPENAI_API_KEY, then the app's stored key")
+    parser.add_argument("--profile", default=None, help="stored key profile to use (default: the active one)")
+    args = parser.parse_args(argv)
+    if not args.sources and not args.sessions:
+        parser.error("give at least one source, or --sessions")
+    state_path = args.state or os.path.splitext(args.output)[0] + ".compaction.json"
+
+    state = empty_state() if args.full else load_state(state_path)
+    counts = scan(state, args.sources, args.sessions, exclude=[os.path.abspath(args.output)])
+    work = plan(state)
+    merges = sum(needs_model(state, item) for item in work)
+    print(f"{counts['read']} sources read, {counts['removed']} removed; {len(work)} of "
+          f"{len(set(state['sections']) | {w.key for w in work})} sections to update, {merges} needing the model",
+          file=sys.stderr)
+    if args.dry_run:
+        for item in work:
+            action = "rebuild" if item.rebuild else "merge" if item.key in state["sections"] else "add"
+            print(f"  {action:<8} {item.key} ({len(item.sources)} inputs)", file=sys.stderr)
+        return 0
+
+    client = None
+    if merges:
+        if args.profile or not args.api_key:
+            args.api_key = config_store.api_key(args.profile)
+        if not args.api_key:
+            parser.error("an API key is required (--api-key, OPENAI_API_KEY or a key stored by the app)")
+        client = llm.get_client(args.api_key)
+    save_state(state, state_path)  # the scanned sources; merges below are recorded as they finish
+    compactor = Compactor(state, state_path, client, args.api_key, args.timeout)
+    try:
+        compactor.run(work, args.concurrency)
+    except KeyboardInterrupt:
+        print("Interrupted; rerun the same command to resume.", file=sys.stderr)
+        return 130
+    except Exception as e:
+        print(f"{type(e).__name__}: {e}; finished sections are cached, rerun to resume.", file=sys.stderr)
+        return 1
+    if work or not os.path.exists(args.output):
+        with open(args.output + ".tmp", "w", encoding="utf-8") as f:
+            f.write(compactor.render())
+        os.replace(args.output + ".tmp", args.output)
+    print(f"{len(work)} sections updated with {compactor.calls} model merges -> {args.output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,169 @@
+"""Stored API keys, cached in memory and shared safely between processes.
+
+The app reads the stored key on every rerun, so the parsed config is cached
+per process and only re-read when the file's mtime, size or inode changes; a
+rerun costs one ``stat``. Writes happen only when a value actually changes,
+under an exclusive lock on a sidecar lock file (fcntl on POSIX, msvcrt on
+Windows), and land atomically via a temp file and rename, so several
+Streamlit worker processes can share one config file.
+
+Keys are kept in named profiles. The file keeps the original top-level
+``{"api_key": ...}`` field, mirroring the active profile, so a config
+written by an older version is read as its default profile and older
+versions can still read a newer config.
+"""
+import json
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import Callable, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+DEFAULT_PROFILE = "default"
+
+
+def default_config_dir():
+    """Platform configuration directory for the stored API keys."""
+    if os.name == 'nt':  # Windows
+        return os.path.join(os.environ.get('APPDATA', os.path.expanduser('~')), 'AgenticContext')
+    return os.path.join(os.path.expanduser('~'), '.config', 'agentic_context')
+
+
+@contextmanager
+def _locked(lock_path):
+    """Hold an exclusive, cross-process lock on ``lock_path``."""
+    with open(lock_path, "a+") as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _normalise(raw) -> dict:
+    """The profiles view of a config file, whichever version wrote it."""
+    if not isinstance(raw, dict):
+        raw = {}
+    profiles = {name: dict(p) for name, p in (raw.get("profiles") or {}).items() if isinstance(p, dict)}
+    active = raw.get("active_profile") or DEFAULT_PROFILE
+    if not profiles and raw.get("api_key"):
+        profiles[active] = {"api_key": raw["api_key"]}  # a pre-profiles config
+    return {"active_profile": active, "profiles": profiles}
+
+
+class ConfigStore:
+    """Process-wide, mtime-cached view of the config file."""
+
+    def __init__(self, path=None):
+        self.path = path or os.environ.get("CORN_CONFIG_PATH") or os.path.join(default_config_dir(), "config.json")
+        self._lock = threading.Lock()
+        self._data = None
+        self._stamp = None  # (inode, mtime_ns, size) of the file self._data was parsed from
+
+    def _file_stamp(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return st.st_ino, st.st_mtime_ns, st.st_size  # a replaced file has a new inode
+
+    def _load(self) -> dict:
+        """The parsed config, re-read only when the file changed since the last read."""
+        stamp = self._file_stamp()
+        with self._lock:
+            if self._data is None or stamp != self._stamp:
+                try:
+                    with open(self.path, "r", encoding="utf-8") as f:
+                        raw = json.load(f)
+                except (FileNotFoundError, json.JSONDecodeError):
+                    raw = {}
+                self._data, self._stamp = _normalise(raw), stamp
+            return self._data
+
+    def api_key(self, profile: Optional[str] = None) -> Optional[str]:
+        data = self._load()
+        return data["profiles"].get(profile or data["active_profile"], {}).get("api_key")
+
+    def active_profile(self) -> str:
+        return self._load()["active_profile"]
+
+    def profiles(self) -> List[str]:
+        """Stored profile names, the active one included even before it has a key."""
+        data = self._load()
+        return sorted(set(data["profiles"]) | {data["active_profile"]})
+
+    def save_api_key(self, api_key: str, profile: Optional[str] = None) -> bool:
+        """Store ``api_key`` under ``profile`` (default: the active one); False if it was already stored."""
+        if self.api_key(profile) == api_key:
+            return False
+
+        def change(data):
+            data["profiles"].setdefault(profile or data["active_profile"], {})["api_key"] = api_key
+        return self._update(change)
+
+    def add_profile(self, profile: str, api_key: str) -> bool:
+        """Create ``profile`` with ``api_key``; False, changing nothing, if a profile by that name has a key."""
+        def change(data):
+            if not data["profiles"].get(profile, {}).get("api_key"):
+                data["profiles"][profile] = {"api_key": api_key}
+        return self._update(change)
+
+    def set_active_profile(self, profile: str) -> bool:
+        if self.active_profile() == profile:
+            return False
+
+        def change(data):
+            data["active_profile"] = profile
+        return self._update(change)
+
+    def delete_profile(self, profile: str) -> bool:
+        if profile not in self._load()["profiles"]:
+            return False
+
+        def change(data):
+            data["profiles"].pop(profile, None)
+        return self._update(change)
+
+    def _update(self, change: Callable[[dict], None]) -> bool:
+        """Apply ``change`` to the on-disk config under the file lock; writes only if it changed anything."""
+        directory = os.path.dirname(self.path) or "."
+        os.makedirs(directory, exist_ok=True)
+        with _locked(self.path + ".lock"):
+            self._stamp = None  # another process may have written since our last read
+            current = self._load()
+            data = json.loads(json.dumps(current))
+            change(data)
+            if data == current:
+                return False
+            active = data["profiles"].get(data["active_profile"], {})
+            payload = {"api_key": active.get("api_key"), **data}
+            fd, tmp_path = tempfile.mkstemp(prefix=".config-", suffix=".tmp", dir=directory)  # created 0600
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(payload, f, indent=2)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, self.path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+            with self._lock:
+                self._data, self._stamp = data, self._file_stamp()
+        return True
+
+
+config_store = ConfigStore()
@@ -0,0 +1,10 @@
+"""Naming for exported context files, shared by the app and the batch CLI."""
+from datetime import datetime
+from typing import Optional
+
+
+def generate_markdown_filename(context_focus, when: Optional[datetime] = None):
+    """Generate a filename for the markdown export."""
+    timestamp = (when or datetime.now()).strftime("%Y%m%d_%H%M%S")
+    subject = context_focus if context_focus else "general"
+    return f"context_{subject}_{timestamp}.md"
@@ -0,0 +1,181 @@
+"""Incremental context extraction.
+
+Instead of sending the whole transcript to the model when the interview ends,
+a RollingExtractor folds each answered turn into a running, sectioned summary
+in the background. Ending the interview then only has to fold whatever turns
+are still pending, so its cost stays flat as interviews grow. Each fold only
+returns the sections it changed, so the finished summary is not capped by a
+single completion's token budget.
+"""
+import os
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+import llm
+
+EXTRACTION_WORKERS = int(os.environ.get("CORN_EXTRACTION_WORKERS", "4"))
+FOLD_TIMEOUT = 45  # seconds per background fold
+FOLD_MAX_TOKENS = 800
+FOLD_BATCH = 10  # answered turns per fold, keeping prompts bounded for long or resumed transcripts
+
+EXTRACTION_SYSTEM_PROMPT = """You are Corn, a diligent sloth assistant who excels at extracting and organizing meaningful context from conversations.
+While you occasionally daydream about anteaters, you stay focused on your primary mission: creating clear, well-structured context summaries.
+
+You maintain a running context profile of the user that:
+1. Captures key information, insights, and patterns
+2. Organizes the information in a clear, logical structure
+3. Maintains the user's voice and perspective
+4. Focuses on substantive content rather than casual conversation
+5. Uses markdown formatting for better readability
+
+You will be given the current profile sections and some new interview turns.
+Return ONLY the sections that are new or need to change. Start each one with a
+'### ' heading followed by the complete, updated content of that section.
+Reuse an existing heading exactly when updating it. If nothing needs to change,
+reply with NO_CHANGES."""
+
+_HEADING = re.compile(r"^#{1,6}\s+(.+?)\s*$")
+
+_executor = ThreadPoolExecutor(max_workers=EXTRACTION_WORKERS, thread_name_prefix="extraction")
+
+
+def format_turns(turns):
+    """Render (question, answer) pairs as a plain transcript."""
+    lines = []
+    for question, answer in turns:
+        if question:
+            lines.append(f"Corn: {question}")
+        lines.append(f"User: {answer}")
+    return "\n".join(lines)
+
+
+def parse_sections(markdown):
+    """Split markdown into an ordered mapping of heading -> body.
+
+    Headings with no body, such as a "## User Summary" title echoed above the
+    sections, are left out.
+    """
+    sections = OrderedDict()
+    heading = None
+    body = []
+
+    def close():
+        text = "\n".join(body).strip()
+        if heading is not None and text:
+            sections[heading] = text
+
+    for line in markdown.splitlines():
+        match = _HEADING.match(line)
+        if match:
+            close()
+            heading = match.group(1).rstrip(":")
+            body = []
+        elif heading is not None:
+            body.append(line)
+        elif line.strip():
+            heading = "Highlights"
+            body = [line]
+    close()
+    return sections
+
+
+class RollingExtractor:
+    """Running structured summary of one interview, updated turn by turn."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sections = OrderedDict()
+        self._pending = []  # (seq, question, answer) for answered turns not yet folded into the summary
+        self._next_seq = 0
+        self._future = None
+        self.folded_turns = 0
+        self.error = None
+
+    def observe(self, question, answer):
+        """Queue an answered turn for extraction."""
+        with self._lock:
+            self._pending.append((self._next_seq, question, answer))
+            self._next_seq += 1
+
+    def observe_turns(self, turns):
+        """Queue every answered turn of a transcript, pairing answers with the question before them."""
+        question = None
+        for turn in turns:
+            if turn.is_question:
+                question = turn.text
+            else:
+                self.observe(question, turn.text)
+                question = None
+
+    def schedule(self, client, api_key):
+        """Fold pending turns on the background pool unless a fold is already running."""
+        with self._lock:
+            if not self._pending or (self._future is not None and not self._future.done()):
+                return
+            batch = self._pending[:FOLD_BATCH]
+            self._future = _executor.submit(self._fold, client, api_key, batch, FOLD_TIMEOUT)
+
+    def finalize(self, client, api_key, timeout=FOLD_TIMEOUT, batch_size=FOLD_BATCH):
+        """Wait for the in-flight fold, fold what is left and return the summary markdown.
+
+        ``batch_size`` folds the remaining turns a few at a time, which keeps
+        each prompt bounded when a whole transcript is pending.
+        """
+        with self._lock:
+            future = self._future
+        if future is not None:
+            try:
+                future.result(timeout=timeout)
+            except FutureTimeout:
+                raise llm.RequestTimeout("Background extraction is still running; please try again")
+            except Exception:
+                pass  # the turns stay pending and are folded below
+        step = batch_size or FOLD_BATCH
+        while True:
+            with self._lock:
+                batch = self._pending[:step]
+            if not batch:
+                break
+            self._fold(client, api_key, batch, timeout, raise_errors=True)
+        return self.render()
+
+    def render(self):
+        with self._lock:
+            if not self._sections:
+                return ""
+            parts = ["## User Summary"]
+            parts.extend(f"### {heading}\n{body}" for heading, body in self._sections.items())
+        return "\n\n".join(parts)
+
+    def _fold(self, client, api_key, batch, timeout, raise_errors=False):
+        with self._lock:
+            current = "\n\n".join(f"### {h}\n{b}" for h, b in self._sections.items()) or "(empty)"
+        try:
+            reply = llm.chat(
+                client,
+                api_key,
+                timeout=timeout,
+                call_site="extraction",
+                messages=[
+                    {"role": "system", "content": EXTRACTION_SYSTEM_PROMPT},
+                    {"role": "user", "content": f"Current profile:\n\n{current}\n\nNew interview turns:\n\n{format_turns((q, a) for _, q, a in batch)}"}
+                ],
+                temperature=0.5,
+                max_tokens=FOLD_MAX_TOKENS
+            )
+        except Exception as e:
+            self.error = e
+            if raise_errors:
+                raise
+            return
+        updates = {} if reply.strip() == "NO_CHANGES" else parse_sections(reply)
+        folded = {seq for seq, _, _ in batch}
+        with self._lock:
+            self._sections.update(updates)
+            # By sequence number: another fold may have changed the queue since this batch was taken
+            remaining = [turn for turn in self._pending if turn[0] not in folded]
+            self.folded_turns += len(self._pending) - len(remaining)
+            self._pending = remaining
+            self.error = None
@@ -0,0 +1,164 @@
+"""Hedged streaming for interactive question generation.
+
+A question stream that has produced no token by an adaptive threshold,
+derived from the recent p95 time to first token, gets a second, identical
+request. Whichever stream produces a token first is read to the end; the
+other is cut off at once through its StreamHandle, even if it is still
+waiting for its first token. Hedges have a spend cap, both as a share of hedgeable
+calls and as an hourly token budget, and how often they fire and win is
+counted in telemetry.
+"""
+import os
+import queue
+import threading
+import time
+from collections import deque
+
+import llm
+from router import router
+from telemetry import telemetry
+
+HEDGING = os.environ.get("CORN_HEDGE", "off").lower() in ("1", "on", "true", "yes")
+HEDGE_MAX_SHARE = float(os.environ.get("CORN_HEDGE_MAX_SHARE", "0.1"))  # of recent hedgeable calls
+HEDGE_TOKEN_BUDGET = int(os.environ.get("CORN_HEDGE_TOKENS_PER_HOUR", "20000"))
+HEDGE_DEFAULT_DELAY = 2.0  # seconds, until enough TTFTs have been seen
+HEDGE_MIN_DELAY = 0.3  # seconds
+HEDGE_MIN_SAMPLES = 20  # TTFTs needed before the threshold adapts
+HEDGE_HISTORY = 100  # hedgeable calls remembered for the share cap
+
+_DELTA, _DONE, _ERROR = "delta", "done", "error"
+
+
+class HedgePolicy:
+    """When to hedge, and whether the spend cap still allows it."""
+
+    def __init__(self, max_share=HEDGE_MAX_SHARE, token_budget=HEDGE_TOKEN_BUDGET):
+        self.max_share = max_share
+        self.token_budget = token_budget
+        self._lock = threading.Lock()
+        self._recent = deque(maxlen=HEDGE_HISTORY)  # True where the call was hedged
+        self._spent = deque()  # (timestamp, tokens) within the last hour
+        self.fired = 0
+        self.wins = 0
+        self.capped = 0
+
+    def threshold(self, call_site: str, timeout: float) -> float:
+        """Seconds to wait for a first token before hedging."""
+        p95 = telemetry.ttft_percentile(call_site, 0.95, min_samples=HEDGE_MIN_SAMPLES)
+        delay = HEDGE_DEFAULT_DELAY if p95 is None else p95
+        return min(max(delay, HEDGE_MIN_DELAY), timeout / 2)
+
+    def admit(self, call_site: str, tokens: int) -> bool:
+        """Claim budget for one hedge; False if the spend cap says no."""
+        now = time.monotonic()
+        with self._lock:
+            while self._spent and now - self._spent[0][0] > 3600:
+                self._spent.popleft()
+            over_share = sum(self._recent) + 1 > self.max_share * HEDGE_HISTORY
+            if over_share or sum(t for _, t in self._spent) + tokens > self.token_budget:
+                self.capped += 1
+                self._recent.append(False)
+                telemetry.count("hedges_capped", call_site)
+                return False
+            self._spent.append((now, tokens))
+            self._recent.append(True)
+            self.fired += 1
+        telemetry.count("hedges_fired", call_site)
+        return True
+
+    def not_needed(self):
+        with self._lock:
+            self._recent.append(False)
+
+    def won(self, call_site: str):
+        with self._lock:
+            self.wins += 1
+        telemetry.count("hedge_wins", call_site)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "fired": self.fired,
+                "wins": self.wins,
+                "capped": self.capped,
+                "win_rate": self.wins / self.fired if self.fired else 0.0,
+                "tokens_last_hour": sum(t for _, t in self._spent),
+            }
+
+
+hedge_policy = HedgePolicy()
+
+
+def _race(tag, events, handle, client, api_key, timeout, call_site, cache, request):
+    """Read one stream on a worker thread, forwarding deltas until it ends or loses."""
+    stream = llm.stream_chat(client, api_key, timeout=timeout, call_site=call_site, cache=cache, handle=handle,
+                             **request)
+    try:
+        for delta in stream:
+            if handle.cancelled:
+                return
+            events.put((tag, _DELTA, delta))
+    except llm.StreamCancelled:
+        return
+    except Exception as e:
+        events.put((tag, _ERROR, e))
+        return
+    finally:
+        stream.close()
+    events.put((tag, _DONE, None))
+
+
+def hedged_stream_chat(client, api_key, *, timeout: float, call_site: str = "question", cache=None, **request):
+    """Drop-in for llm.stream_chat that hedges a slow first token (when CORN_HEDGE is on)."""
+    if not HEDGING:
+        yield from llm.stream_chat(client, api_key, timeout=timeout, call_site=call_site, cache=cache, **request)
+        return
+    if not request.get("model"):
+        request["model"] = router.route(call_site)  # both racers must send the identical request
+    events = queue.SimpleQueue()
+    handles = {0: llm.StreamHandle(), 1: llm.StreamHandle()}
+
+    def start(tag, site):
+        threading.Thread(
+            target=_race, name=f"hedge-{tag}", daemon=True,
+            args=(tag, events, handles[tag], client, api_key, timeout, site, cache, dict(request))
+        ).start()
+
+    started = time.monotonic()
+    hedge_at = started + hedge_policy.threshold(call_site, timeout)
+    start(0, call_site)
+    live = {0}
+    hedge_decided = False
+    try:
+        while True:
+            wait = hedge_at - time.monotonic() if not hedge_decided else None
+            try:
+                tag, kind, payload = events.get(timeout=max(0.0, wait) if wait is not None else None)
+            except queue.Empty:
+                hedge_decided = True
+                if hedge_policy.admit(call_site, llm.reserve_tokens(request)):
+                    start(1, f"{call_site}_hedge")
+                    live.add(1)
+                continue
+            if kind == _ERROR:
+                live.discard(tag)
+                if not live:
+                    raise payload
+                continue
+            winner = tag  # first token (or an empty, finished stream)
+            break
+        if not hedge_decided:
+            hedge_policy.not_needed()
+        handles[1 - winner].cancel()
+        if winner == 1:
+            hedge_policy.won(call_site)
+        while kind != _DONE:
+            if kind == _ERROR:
+                raise payload
+            yield payload
+            tag, kind, payload = events.get()
+            while tag != winner:
+                tag, kind, payload = events.get()
+    finally:
+        for handle in handles.values():
+            handle.cancel()  # a no-op for a stream that already ended
@@ -0,0 +1,138 @@
+"""Bounded background job queue for long-running work such as context extraction.
+
+Jobs run on a process-wide worker pool and are looked up by ID, so a job keeps
+running and its result stays available across Streamlit reruns. Submitting
+work whose key matches a live job returns that job instead of starting a
+duplicate, which makes double-clicks and rerun races harmless.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+JOB_WORKERS = int(os.environ.get("CORN_JOB_WORKERS", "2"))
+JOB_QUEUE_DEPTH = int(os.environ.get("CORN_JOB_QUEUE_DEPTH", "32"))  # queued + running jobs
+JOB_RETENTION = 3600  # seconds a finished job's result is kept
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = "queued", "running", "done", "failed", "cancelled"
+
+
+class QueueFull(Exception):
+    """Raised when the job queue is at its configured depth."""
+
+
+def transcript_key(turns, session_id=None) -> str:
+    """Hash of a session's transcript, used to deduplicate extraction jobs."""
+    material = json.dumps([session_id, [(turn.role, turn.text) for turn in turns]], ensure_ascii=False)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class Job:
+    """One unit of background work and its outcome."""
+
+    def __init__(self, key):
+        self.id = uuid.uuid4().hex[:12]
+        self.key = key
+        self.state = QUEUED
+        self.result = None
+        self.error = None
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.cancel_requested = threading.Event()
+        self.future = None
+
+    @property
+    def active(self) -> bool:
+        return self.state in (QUEUED, RUNNING)
+
+    @property
+    def elapsed(self) -> float:
+        return (self.finished_at or time.time()) - self.submitted_at
+
+
+class JobQueue:
+    """Worker pool with a bounded queue, job IDs, deduplication and cancellation."""
+
+    def __init__(self, workers=JOB_WORKERS, max_depth=JOB_QUEUE_DEPTH, name="jobs"):
+        self.workers = workers
+        self.max_depth = max_depth
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=name)
+        self._lock = threading.Lock()
+        self._jobs = {}  # id -> Job
+        self._by_key = {}  # key -> id of the latest job for that key
+
+    def submit(self, key, fn, *args, **kwargs) -> Job:
+        """Queue ``fn(*args, **kwargs)``, or return the live or finished job with the same key."""
+        with self._lock:
+            self._prune()
+            existing = self._jobs.get(self._by_key.get(key))
+            if existing is not None and existing.state not in (FAILED, CANCELLED):
+                return existing
+            if sum(job.active for job in self._jobs.values()) >= self.max_depth:
+                raise QueueFull("Too many jobs are queued; please try again shortly")
+            job = Job(key)
+            self._jobs[job.id] = job
+            self._by_key[key] = job.id
+            job.future = self._executor.submit(self._run, job, fn, args, kwargs)
+            return job
+
+    def get(self, job_id) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id) -> bool:
+        """Cancel a job. Queued jobs never start; a running job's result is discarded."""
+        job = self.get(job_id)
+        if job is None or not job.active:
+            return False
+        job.cancel_requested.set()
+        if job.future.cancel():
+            self._finish(job, CANCELLED)
+        return True
+
+    def _run(self, job, fn, args, kwargs):
+        if job.cancel_requested.is_set():
+            self._finish(job, CANCELLED)
+            return
+        job.state = RUNNING
+        job.started_at = time.time()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            job.error = e
+            self._finish(job, CANCELLED if job.cancel_requested.is_set() else FAILED)
+            return
+        if job.cancel_requested.is_set():
+            self._finish(job, CANCELLED)
+            return
+        job.result = result
+        self._finish(job, DONE)
+
+    def _finish(self, job, state):
+        with self._lock:
+            job.state = state
+            job.finished_at = time.time()
+
+    def _prune(self):
+        cutoff = time.time() - JOB_RETENTION
+        for job_id in [i for i, job in self._jobs.items() if not job.active and job.finished_at < cutoff]:
+            job = self._jobs.pop(job_id)
+            if self._by_key.get(job.key) == job_id:
+                del self._by_key[job.key]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "queued": sum(job.state == QUEUED for job in self._jobs.values()),
+                "running": sum(job.state == RUNNING for job in self._jobs.values()),
+                "max_depth": self.max_depth,
+            }
+
+
+extraction_jobs = JobQueue(name="extraction-job")
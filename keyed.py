@@ -0,0 +1,46 @@
+"""Process-wide state kept per API key, bounded so stray keys cannot grow it forever.
+
+Every Streamlit session runs in one process, so schedulers, circuit breakers,
+topic pools and opening-question caches are shared per key. Each registry
+keeps the KEY_STATE_LIMIT most recently used keys; a key pushed out starts
+afresh the next time it is used, while anything still holding its old object
+keeps working with it.
+"""
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Generic, Optional, TypeVar
+
+KEY_STATE_LIMIT = int(os.environ.get("CORN_KEY_STATE_LIMIT", "64"))
+
+T = TypeVar("T")
+
+
+class KeyedRegistry(Generic[T]):
+    """LRU map of key fingerprint -> state object, created on first use."""
+
+    def __init__(self, factory: Callable[[], T], limit: int = KEY_STATE_LIMIT):
+        self.factory = factory
+        self.limit = limit
+        self._lock = threading.Lock()
+        self._items = OrderedDict()
+
+    def get(self, fingerprint: str) -> T:
+        with self._lock:
+            item = self._items.get(fingerprint)
+            if item is not None:
+                self._items.move_to_end(fingerprint)
+                return item
+            item = self._items[fingerprint] = self.factory()
+            while len(self._items) > self.limit:
+                self._items.popitem(last=False)
+            return item
+
+    def peek(self, fingerprint: str) -> Optional[T]:
+        """The state for ``fingerprint`` if there is any, without creating or refreshing it."""
+        with self._lock:
+            return self._items.get(fingerprint)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._items)
@@ -0,0 +1,541 @@
+"""OpenAI call plumbing shared by every request the interviewer makes.
+
+Streamlit reruns app.py from the top on every interaction, so anything that
+has to outlive a single run (the client pool, circuit breakers) lives in this
+module, which is imported once per process. Every call is measured through
+telemetry.py under a ``call_site`` label, and a request without a model gets
+one from router.py based on that call site.
+"""
+import hashlib
+import os
+import random
+import socket
+import threading
+import time
+from collections import OrderedDict
+from contextlib import closing
+from typing import Iterator, Optional
+
+import openai
+
+from keyed import KeyedRegistry
+from memory import count_tokens
+from response_cache import request_key, response_cache
+from router import router
+from scheduler import CALL_SITE_PRIORITY, DEFAULT_COMPLETION_TOKENS, INTERACTIVE, QueueTimeout, scheduler_for
+from telemetry import (ABANDONED, CACHED, CIRCUIT_OPEN, ERROR, INTERRUPTED, OK, TIMEOUT,
+                       telemetry)
+
+# Client pool: one OpenAI client (and so one keep-alive connection pool) per
+# API key and base URL, shared by every session in the process
+CLIENT_POOL_SIZE = int(os.environ.get("CORN_CLIENT_POOL_SIZE", "16"))
+CLIENT_IDLE_TTL = float(os.environ.get("CORN_CLIENT_IDLE_TTL", "900"))  # seconds
+
+# Retry policy for 429s, 5xx responses and dropped connections
+MAX_ATTEMPTS = 4
+BACKOFF_BASE = 0.5  # seconds
+BACKOFF_CAP = 8.0  # seconds
+
+# Circuit breaker policy, applied per API key
+BREAKER_FAILURE_THRESHOLD = 5
+BREAKER_RESET_AFTER = 30.0  # seconds before a half-open probe is allowed
+
+
+class RequestTimeout(Exception):
+    """Raised when a request runs past its deadline."""
+
+
+class CircuitOpenError(Exception):
+    """Raised when the circuit breaker for an API key is open."""
+
+
+class StreamInterrupted(Exception):
+    """Raised when a streamed completion stops before the model finished."""
+
+    def __init__(self, partial_text):
+        super().__init__("Response stream was cut off")
+        self.partial_text = partial_text
+
+
+class StreamCancelled(Exception):
+    """Raised in a stream that another thread cut off through its StreamHandle."""
+
+
+class StreamHandle:
+    """Lets another thread cut off a ``stream_chat`` call, even while it waits for a token.
+
+    The reading thread may be blocked in a socket read, which closing the
+    response from elsewhere would not wake; shutting the socket down does, and
+    drops the request so the server stops generating. A stream that opens
+    after ``cancel`` (its headers were still pending) is shut down on arrival.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stream = None
+        self.cancelled = False
+
+    def attach(self, stream):
+        with self._lock:
+            self._stream = stream
+            if not self.cancelled:
+                return
+        _shut_down(stream)
+
+    def detach(self):
+        with self._lock:
+            self._stream = None
+
+    def cancel(self):
+        with self._lock:
+            self.cancelled = True
+            stream = self._stream
+        if stream is not None:
+            _shut_down(stream)
+
+
+def _shut_down(stream):
+    """Shut down the socket under an open openai Stream, waking its reader with an error."""
+    response = getattr(stream, "response", None)
+    if response is None or response.is_closed:
+        return  # finished, and its connection may already be serving another request
+    network_stream = response.extensions.get("network_stream")
+    sock = network_stream.get_extra_info("socket") if network_stream is not None else None
+    if sock is None:
+        return  # not a plain HTTP/1.1 connection; the reader stops at its next chunk
+    try:
+        sock.shutdown(socket.SHUT_RDWR)
+    except OSError:
+        pass  # already closed
+
+
+class Deadline:
+    """A per-request time budget that can be checked from any thread."""
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def check(self):
+        if self.remaining() <= 0:
+            raise RequestTimeout(f"API request timed out after {self.seconds:g}s")
+
+
+class CircuitBreaker:
+    """Classic closed / open / half-open breaker.
+
+    After ``failure_threshold`` consecutive upstream failures the breaker opens
+    and calls fail fast. Once ``reset_after`` seconds have passed a single probe
+    is let through; its outcome closes or re-opens the breaker.
+    """
+
+    def __init__(self, failure_threshold=BREAKER_FAILURE_THRESHOLD, reset_after=BREAKER_RESET_AFTER):
+        self.failure_threshold = failure_threshold
+        self.reset_after = reset_after
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._probing = False
+        self._probes = 0  # probes granted so far; numbers the current one
+        self.verified = False  # a call has succeeded at least once
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if time.monotonic() - self._opened_at >= self.reset_after:
+                return "half-open"
+            return "open"
+
+    def admit(self) -> Optional[int]:
+        """Let a call through if the breaker allows it.
+
+        Returns None if it does not, 0 for an ordinary call, or a probe number
+        for the half-open probe; a probe ends in ``record_success``,
+        ``record_failure`` or, if the call never reached upstream, ``release``.
+        """
+        with self._lock:
+            if self._opened_at is None:
+                return 0
+            if time.monotonic() - self._opened_at < self.reset_after or self._probing:
+                return None
+            self._probing = True
+            self._probes += 1
+            return self._probes
+
+    def release(self, probe: int):
+        """Give up ``probe`` without an outcome, so the next call may probe instead."""
+        with self._lock:
+            if probe and probe == self._probes:
+                self._probing = False
+
+    def record_success(self):
+        with self._lock:
+            self.verified = True
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._probing or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+            self._probing = False
+
+
+def key_fingerprint(api_key: str) -> str:
+    """Short, non-reversible identifier for an API key."""
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16]
+
+
+class ClientPool:
+    """LRU registry of OpenAI clients keyed by API key and base URL.
+
+    Each client owns an HTTP connection pool, so reusing it keeps TLS sessions
+    alive across questions instead of handshaking on every rerun. Entries idle
+    for longer than ``idle_ttl`` or pushed out by newer keys are dropped but not
+    closed: background work (topic refills, queued extractions, speculative
+    openers) may still hold the client, and its transport is closed by garbage
+    collection once the last holder lets go.
+    """
+
+    def __init__(self, max_size=CLIENT_POOL_SIZE, idle_ttl=CLIENT_IDLE_TTL):
+        self.max_size = max_size
+        self.idle_ttl = idle_ttl
+        self._lock = threading.Lock()
+        self._clients = OrderedDict()  # key -> (client, last_used)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.setup_seconds = 0.0
+
+    def get(self, api_key: str, base_url: Optional[str] = None):
+        base_url = base_url or os.environ.get("OPENAI_BASE_URL") or None
+        key = (key_fingerprint(api_key), base_url)
+        now = time.monotonic()
+        with self._lock:
+            self._evict_idle(now)
+            entry = self._clients.get(key)
+            if entry is not None:
+                self.hits += 1
+                self._clients[key] = (entry[0], now)
+                self._clients.move_to_end(key)
+                return entry[0]
+            self.misses += 1
+            started = time.perf_counter()
+            client = openai.OpenAI(api_key=api_key, base_url=base_url)
+            self.setup_seconds += time.perf_counter() - started
+            self._clients[key] = (client, now)
+            while len(self._clients) > self.max_size:
+                self._clients.popitem(last=False)
+                self.evictions += 1
+            return client
+
+    def _evict_idle(self, now):
+        for key in [k for k, (_, used) in self._clients.items() if now - used > self.idle_ttl]:
+            del self._clients[key]
+            self.evictions += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._clients),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "setup_seconds": self.setup_seconds,
+            }
+
+
+client_pool = ClientPool()
+
+
+def get_client(api_key: str, base_url: Optional[str] = None):
+    """Return the shared, pooled OpenAI client for an API key."""
+    return client_pool.get(api_key, base_url)
+
+
+_breakers = KeyedRegistry(CircuitBreaker)
+
+
+def breaker_for(api_key: str) -> CircuitBreaker:
+    """Return the process-wide circuit breaker for an API key."""
+    return _breakers.get(key_fingerprint(api_key))
+
+
+def key_verified(api_key: str) -> bool:
+    """True once a call with this key has succeeded, so it is known to work."""
+    breaker = _breakers.peek(key_fingerprint(api_key))
+    return breaker is not None and breaker.verified
+
+
+def is_retryable(error: Exception) -> bool:
+    """True for errors worth retrying: rate limits, 5xx, timeouts and dropped connections."""
+    if isinstance(error, (openai.RateLimitError, openai.APIConnectionError)):
+        return True
+    if isinstance(error, openai.APIStatusError):
+        return error.status_code >= 500
+    return False
+
+
+def backoff_delay(attempt: int, error: Optional[Exception] = None) -> float:
+    """Full-jitter exponential backoff, honouring Retry-After when the server sends one."""
+    delay = random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+    response = getattr(error, "response", None)
+    if response is not None:
+        try:
+            delay = max(delay, float(response.headers.get("retry-after", 0)))
+        except (TypeError, ValueError):
+            pass
+    return delay
+
+
+def reserve_tokens(request: dict) -> int:
+    """Tokens a request may use: its prompt plus its completion allowance."""
+    prompt = sum(count_tokens(m.get("content") or "") for m in request.get("messages", ()))
+    return prompt + (request.get("max_tokens") or DEFAULT_COMPLETION_TOKENS)
+
+
+def _attempts(api_key, deadline, max_attempts, call, request):
+    """Yield attempt numbers, enforcing the breaker, the rate limits and the deadline before each one."""
+    breaker = breaker_for(api_key)
+    scheduler = scheduler_for(key_fingerprint(api_key))
+    priority = CALL_SITE_PRIORITY.get(call.call_site, INTERACTIVE)
+    if not scheduler.unlimited:
+        call.reserved = reserve_tokens(request)
+    for attempt in range(max_attempts):
+        deadline.check()
+        probe = breaker.admit()
+        if probe is None:
+            raise CircuitOpenError("OpenAI is failing repeatedly; pausing requests for a moment")
+        admitted = False
+        try:
+            try:
+                call.queue_wait += scheduler.acquire(priority, call.reserved, timeout=deadline.remaining())
+            except QueueTimeout as e:
+                raise RequestTimeout(f"API request timed out after {deadline.seconds:g}s waiting for rate limits") from e
+            admitted = True
+            call.attempts = attempt + 1
+            yield attempt, breaker
+        finally:
+            # A 4xx, a queue timeout or an abandoned stream says nothing about upstream health;
+            # a no-op if the attempt already recorded its outcome
+            breaker.release(probe)
+            if admitted and call.reserved:
+                # However the attempt ended, swap its reservation for what it used: the real or
+                # estimated usage the consumer recorded, or nothing if it produced no output
+                scheduler.settle(call.reserved, call.prompt_tokens + call.completion_tokens)
+
+
+def _wait_before_retry(attempt, error, deadline, max_attempts):
+    """Sleep before the next attempt, or re-raise if there is no time or attempt left."""
+    delay = backoff_delay(attempt, error)
+    if attempt + 1 >= max_attempts or delay >= deadline.remaining():
+        raise error
+    time.sleep(delay)
+
+
+def outcome_of(error: BaseException) -> str:
+    """Telemetry outcome label for a call that raised ``error``."""
+    if isinstance(error, RequestTimeout):
+        return TIMEOUT
+    if isinstance(error, CircuitOpenError):
+        return CIRCUIT_OPEN
+    if isinstance(error, StreamInterrupted):
+        return INTERRUPTED
+    if isinstance(error, Exception) and not isinstance(error, StreamCancelled):
+        return ERROR
+    return ABANDONED  # GeneratorExit, a StreamHandle cancel, or Streamlit stopping the script mid-call
+
+
+def _estimate_usage(call, request, text):
+    """Fill in token counts locally when the response carried no usage, e.g. a stream cut short."""
+    if not call.prompt_tokens and not call.cached:
+        call.prompt_tokens = sum(count_tokens(m.get("content") or "") for m in request.get("messages", ()))
+        call.completion_tokens = count_tokens(text)
+
+
+def _start(call_site, request):
+    """Route the request to a model if it names none, and open its telemetry Call."""
+    if not request.get("model"):
+        request["model"] = router.route(call_site)
+    return telemetry.start_call(call_site, request["model"])
+
+
+def _finish(call, outcome, error=None):
+    wall = call.finish(outcome, error)
+    router.observe(call, wall, outcome)
+
+
+def chat(client, api_key, *, timeout: float, max_attempts=MAX_ATTEMPTS, cache: Optional[bool] = None,
+         call_site: str = "other", **request) -> str:
+    """Run a chat completion under a deadline with retries; return the message text.
+
+    ``cache`` follows ResponseCache.enabled_for: False bypasses the response
+    cache, True opts the call in and None applies the configured mode.
+    ``call_site`` labels the call in telemetry and picks its model tier.
+    """
+    call = _start(call_site, request)
+    try:
+        text = _chat_cached(client, api_key, timeout, max_attempts, cache, request, call)
+    except BaseException as e:
+        _finish(call, outcome_of(e), e)
+        raise
+    _finish(call, CACHED if call.cached else OK)
+    return text
+
+
+def _chat_cached(client, api_key, timeout, max_attempts, cache, request, call):
+    if not response_cache.enabled_for(request, cache):
+        return _chat_with_retries(client, api_key, timeout, max_attempts, request, call)
+    key = request_key(request)
+    cached = response_cache.get(key)
+    if cached is not None:
+        call.cached = True
+        return cached
+    started = time.perf_counter()
+    text = _chat_with_retries(client, api_key, timeout, max_attempts, request, call)
+    response_cache.put(key, text, time.perf_counter() - started, request.get("model"))
+    return text
+
+
+def _chat_with_retries(client, api_key, timeout, max_attempts, request, call):
+    deadline = Deadline(timeout)
+    # Closed on the way out, so the last attempt ends here rather than whenever it is collected
+    with closing(_attempts(api_key, deadline, max_attempts, call, request)) as attempts:
+        for attempt, breaker in attempts:
+            try:
+                response = client.with_options(max_retries=0, timeout=deadline.remaining()).chat.completions.create(**request)
+            except openai.APITimeoutError as e:
+                call.timeouts += 1
+                breaker.record_failure()
+                if deadline.remaining() <= 0:
+                    raise RequestTimeout(f"API request timed out after {timeout:g}s") from e
+                _wait_before_retry(attempt, e, deadline, max_attempts)
+                continue
+            except Exception as e:
+                if not is_retryable(e):
+                    raise
+                breaker.record_failure()
+                _wait_before_retry(attempt, e, deadline, max_attempts)
+                continue
+            breaker.record_success()
+            call.usage(getattr(response, "usage", None))
+            text = response.choices[0].message.content.strip()
+            _estimate_usage(call, request, text)
+            return text
+
+
+def stream_chat(client, api_key, *, timeout: float, max_attempts=MAX_ATTEMPTS, cache: Optional[bool] = None,
+                call_site: str = "other", handle: Optional[StreamHandle] = None, **request) -> Iterator[str]:
+    """Stream a chat completion under a deadline, yielding text deltas.
+
+    Opening the stream is retried like ``chat``. Once text has been yielded a
+    failure cannot be retried transparently, so it surfaces as StreamInterrupted
+    carrying the partial text, as does a stream that ends without a finish reason.
+    A cached response is yielded as a single delta. ``handle`` lets another
+    thread cut the stream off, which then raises StreamCancelled.
+    """
+    call = _start(call_site, request)
+    parts = []
+    try:
+        for delta in _stream_cached(client, api_key, timeout, max_attempts, cache, request, call, handle):
+            if not call.cached:  # a replayed response says nothing about upstream latency, and would drag the hedge threshold down
+                call.first_token()
+            parts.append(delta)
+            yield delta
+    except BaseException as e:
+        _finish(call, outcome_of(e), e)
+        raise
+    _finish(call, CACHED if call.cached else OK)
+
+
+def _stream_cached(client, api_key, timeout, max_attempts, cache, request, call, handle):
+    if not response_cache.enabled_for(request, cache):
+        yield from _stream_with_retries(client, api_key, timeout, max_attempts, request, call, handle)
+        return
+    key = request_key(request)
+    cached = response_cache.get(key)
+    if cached is not None:
+        call.cached = True
+        yield cached
+        return
+    started = time.perf_counter()
+    parts = []
+    for delta in _stream_with_retries(client, api_key, timeout, max_attempts, request, call, handle):
+        parts.append(delta)
+        yield delta
+    response_cache.put(key, "".join(parts).strip(), time.perf_counter() - started, request.get("model"))
+
+
+def _stream_with_retries(client, api_key, timeout, max_attempts, request, call, handle):
+    deadline = Deadline(timeout)
+    # Closed on the way out, so the last attempt ends here rather than whenever it is collected
+    with closing(_attempts(api_key, deadline, max_attempts, call, request)) as attempts:
+        for attempt, breaker in attempts:
+            parts = []
+            finish_reason = None
+            if handle is not None and handle.cancelled:
+                raise StreamCancelled("Stream was cancelled")
+            try:
+                stream = client.with_options(max_retries=0, timeout=deadline.remaining()).chat.completions.create(
+                    stream=True, stream_options={"include_usage": True}, **request
+                )
+                if handle is not None:
+                    handle.attach(stream)
+                for chunk in stream:
+                    deadline.check()
+                    call.usage(getattr(chunk, "usage", None))
+                    if not chunk.choices:
+                        continue
+                    choice = chunk.choices[0]
+                    if choice.delta and choice.delta.content:
+                        parts.append(choice.delta.content)
+                        yield choice.delta.content
+                    if choice.finish_reason:
+                        finish_reason = choice.finish_reason
+            except GeneratorExit:
+                # The consumer stopped reading (a rerun, or a losing hedge); free the connection now
+                close = getattr(stream, "close", None)
+                if close is not None:
+                    close()
+                raise
+            except Exception as e:
+                if handle is not None and handle.cancelled:
+                    raise StreamCancelled("Stream was cancelled") from e  # not an upstream failure
+                if parts:
+                    breaker.record_failure()
+                    raise StreamInterrupted("".join(parts)) from e
+                if isinstance(e, RequestTimeout):
+                    call.timeouts += 1
+                    breaker.record_failure()
+                    raise
+                if isinstance(e, openai.APITimeoutError):
+                    call.timeouts += 1
+                    breaker.record_failure()
+                    if deadline.remaining() <= 0:
+                        raise RequestTimeout(f"API request timed out after {timeout:g}s") from e
+                    _wait_before_retry(attempt, e, deadline, max_attempts)
+                    continue
+                if not is_retryable(e):
+                    raise
+                breaker.record_failure()
+                _wait_before_retry(attempt, e, deadline, max_attempts)
+                continue
+            finally:
+                if handle is not None:
+                    handle.detach()
+                if parts:  # tokens were spent even if the stream broke off or was abandoned
+                    _estimate_usage(call, request, "".join(parts))
+            if finish_reason is None:
+                breaker.record_failure()
+                raise StreamInterrupted("".join(parts))
+            breaker.record_success()
+            return
@@ -0,0 +1,146 @@
+"""Token-budgeted conversation memory for question generation.
+
+The interviewer sees the most recent turns verbatim and a compact digest of
+everything older, all sized to a token budget. It is given the whole
+transcript, not just the window held in session state, so the digest reaches
+back to the first answer. Older turns are digested in fixed blocks aligned
+to their sequence numbers in the session; a finished block never changes,
+so its digest is memoised under (session, first sequence number) and a
+question only has to digest the newest partial block.
+"""
+import os
+import re
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+
+try:
+    import tiktoken
+except ImportError:  # optional: fall back to an approximate local count
+    tiktoken = None
+
+MEMORY_TOKEN_BUDGET = int(os.environ.get("CORN_MEMORY_TOKENS", "1500"))
+DIGEST_SHARE = 0.3  # fraction of the budget reserved for the digest of older turns
+DIGEST_BLOCK = 6  # turns per memoised digest block
+DIGEST_LINE_TOKENS = 40  # cap on each answer's line in the digest
+DIGEST_CACHE_SIZE = 4096  # memoised digest blocks, across all sessions
+MESSAGE_OVERHEAD = 4  # tokens the chat format adds per message
+
+_WORDS = re.compile(r"\w+|[^\w\s]")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s")
+
+
+@lru_cache(maxsize=1)
+def _encoding():
+    return tiktoken.get_encoding("cl100k_base") if tiktoken else None
+
+
+@lru_cache(maxsize=8192)
+def count_tokens(text: str) -> int:
+    """Count tokens locally, with tiktoken when available."""
+    encoding = _encoding()
+    if encoding is not None:
+        return len(encoding.encode(text))
+    # Roughly 3 tokens for every 4 words and punctuation marks in English text
+    return (len(_WORDS.findall(text)) * 4 + 2) // 3
+
+
+def _truncate(text: str, max_tokens: int) -> str:
+    words = text.split()
+    while words and count_tokens(" ".join(words)) > max_tokens:
+        words = words[:max(1, len(words) * 3 // 4)] if len(words) > 1 else []
+    shortened = " ".join(words)
+    return shortened if shortened == text.strip() else shortened + "…"
+
+
+_digest_cache = OrderedDict()  # (session_id, first seq, turns) -> digest lines, least recently used first
+_digest_lock = threading.Lock()
+digest_stats = {"hits": 0, "misses": 0}
+
+
+def _digest_block(block) -> tuple:
+    """Digest one block of turns into short lines, one per answered question."""
+    lines = []
+    question = None
+    for turn in block:
+        if turn.is_question:
+            question = turn.text
+            continue
+        answer = _SENTENCE_END.split(turn.text.strip(), maxsplit=1)[0]
+        line = f"- {_truncate(answer, DIGEST_LINE_TOKENS)}"
+        if question:
+            line = f"- Asked \"{_truncate(question, DIGEST_LINE_TOKENS // 2)}\": {line[2:]}"
+        lines.append(line)
+        question = None
+    return tuple(lines)
+
+
+def _memoised_block(session_id, start: int, block: tuple) -> tuple:
+    # Without a session the turns themselves are the key
+    key = (session_id, start, len(block)) if session_id else block
+    with _digest_lock:
+        lines = _digest_cache.get(key)
+        if lines is not None:
+            _digest_cache.move_to_end(key)
+            digest_stats["hits"] += 1
+            return lines
+        digest_stats["misses"] += 1
+    lines = _digest_block(block)
+    with _digest_lock:
+        _digest_cache[key] = lines
+        while len(_digest_cache) > DIGEST_CACHE_SIZE:
+            _digest_cache.popitem(last=False)
+    return lines
+
+
+def digest(turns, end: int, session_id=None) -> list:
+    """Digest lines for turns[:end], built from memoised blocks of DIGEST_BLOCK sequence numbers.
+
+    ``turns`` must start at the session's first turn, so a block's position
+    in the list is its position in the session.
+    """
+    lines = []
+    for start in range(0, end, DIGEST_BLOCK):
+        lines.extend(_memoised_block(session_id, start, tuple(turns[start:min(start + DIGEST_BLOCK, end)])))
+    return lines
+
+
+def build_memory(turns, budget: int = MEMORY_TOKEN_BUDGET, session_id=None) -> list:
+    """Fit the conversation into ``budget`` tokens of chat messages.
+
+    ``turns`` is the whole transcript, first turn first. Recent turns are
+    kept verbatim, newest first, until the verbatim share of the budget is
+    spent; everything older is summarised into a digest message.
+    """
+    if not turns:
+        return []
+    verbatim_budget = budget - int(budget * DIGEST_SHARE)
+    used = 0
+    start = len(turns)
+    while start > 0:
+        cost = turns[start - 1].tokens + MESSAGE_OVERHEAD
+        if used + cost > verbatim_budget and start < len(turns):
+            break
+        used += cost
+        start -= 1
+
+    recent = [turn.chat_message() for turn in turns[start:]]
+    if used > verbatim_budget:
+        # A single oversized answer; keep its opening rather than blow the budget
+        recent[-1]["content"] = _truncate(recent[-1]["content"], verbatim_budget - MESSAGE_OVERHEAD)
+        used = count_tokens(recent[-1]["content"]) + MESSAGE_OVERHEAD
+
+    memory = []
+    if start > 0:
+        header = "Earlier in this interview:"
+        remaining = budget - used - count_tokens(header) - MESSAGE_OVERHEAD
+        kept = []
+        for line in reversed(digest(turns, start, session_id)):
+            cost = count_tokens(line) + 1
+            if cost > remaining:
+                break
+            kept.append(line)
+            remaining -= cost
+        if kept:
+            memory.append({"role": "system", "content": "\n".join([header] + kept[::-1])})
+    return memory + recent
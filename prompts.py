@@ -0,0 +1,60 @@
+"""Interviewer prompts shared by the app and its background workers.
+
+Requests carry no model; router.py picks one for each call site.
+"""
+from memory import build_memory
+
+TOPIC_SYSTEM_PROMPT = """You are Corn, a quirky sloth interviewer with an inexplicable fascination with anteaters.
+Generate ONE completely random, unexpected, and interesting topic or question to ask about.
+It can be about ANYTHING - the more surprising and unique, the better.
+Be creative and don't limit yourself to conventional categories.
+The topic should be engaging and thought-provoking, even if unconventional.
+Return ONLY the topic/question, nothing else."""
+
+QUESTION_SYSTEM_PROMPT = """You are Corn, a friendly and engaging interviewer who helps people build rich context profiles. 
+Your responses should:
+1. Feel natural and conversational
+2. Follow up on interesting points from previous answers
+3. Avoid repetitive greetings like 'Of course!' or 'I'd be delighted'
+4. Keep questions focused but open-ended
+5. Show genuine interest in the user's responses
+
+If this is the first question, ask something engaging about their background or philosophy.
+If this is a follow-up, reference their previous answer and dig deeper into an interesting aspect."""
+
+
+def topic_request():
+    """Chat completion parameters for one random topic."""
+    return dict(
+        messages=[
+            {"role": "system", "content": TOPIC_SYSTEM_PROMPT},
+            {"role": "user", "content": "Generate a random, unexpected topic or question."}
+        ],
+        temperature=1.0,  # High temperature for more randomness
+        max_tokens=50
+    )
+
+
+def question_request(previous_messages=None, focus=None, covered=None, session_id=None):
+    """Chat completion parameters for the next interview question.
+
+    ``previous_messages`` is the whole transcript so far; ``session_id``
+    lets memory.py reuse the digest of its older turns. ``covered`` names
+    subjects earlier interviews already captured (see similarity_index.py);
+    the interviewer steers away from them.
+    """
+    system_prompt = QUESTION_SYSTEM_PROMPT
+    if focus:
+        system_prompt += f"\n\nKeep the interview focused on this subject: {focus}."
+    if covered:
+        system_prompt += ("\n\nEarlier interviews already captured these subjects: " + "; ".join(covered)
+                          + ". Prefer new ground, and return to them only to add genuinely new detail.")
+    return dict(
+        messages=[
+            {"role": "system", "content": system_prompt},
+            *build_memory(previous_messages or [], session_id=session_id),
+            {"role": "user", "content": "Generate a follow-up question." if previous_messages else "This is the first question. Generate an opening question."}
+        ],
+        temperature=0.7,
+        max_tokens=150
+    )
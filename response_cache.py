@@ -0,0 +1,155 @@
+"""Content-addressed on-disk cache for chat completion responses.
+
+Responses are keyed by a hash of the model, messages and sampling parameters
+and stored one file per key. Reads refresh a file's mtime so eviction, which
+drops expired entries and then the least recently used until the cache fits
+its size limit, behaves as an LRU.
+
+The cache is opt-in via CORN_RESPONSE_CACHE:
+- ``off`` (default): never cache
+- ``deterministic``: cache temperature-0 calls, plus any call that asks for it
+- ``all``: cache everything, for replaying demo and QA flows
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Optional
+
+CACHE_MODE = os.environ.get("CORN_RESPONSE_CACHE", "off").lower()
+CACHE_MAX_BYTES = int(os.environ.get("CORN_RESPONSE_CACHE_MAX_BYTES", str(50 * 1024 * 1024)))
+CACHE_MAX_AGE = float(os.environ.get("CORN_RESPONSE_CACHE_MAX_AGE", str(7 * 24 * 3600)))  # seconds
+EVICT_EVERY = 50  # writes between eviction sweeps
+
+# Request fields that do not change the response
+_IGNORED_FIELDS = {"stream", "stream_options", "timeout", "user"}
+
+
+def default_cache_dir():
+    """Platform cache directory for stored responses."""
+    if os.name == 'nt':  # Windows
+        base = os.environ.get('LOCALAPPDATA', os.path.expanduser('~'))
+        return os.path.join(base, 'AgenticContext', 'responses')
+    base = os.environ.get('XDG_CACHE_HOME', os.path.join(os.path.expanduser('~'), '.cache'))
+    return os.path.join(base, 'agentic_context', 'responses')
+
+
+def request_key(request: dict) -> str:
+    """Stable hash of everything in a request that affects the response."""
+    material = {k: v for k, v in request.items() if k not in _IGNORED_FIELDS}
+    canonical = json.dumps(material, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """On-disk response store with size- and age-based LRU eviction."""
+
+    def __init__(self, directory=None, max_bytes=CACHE_MAX_BYTES, max_age=CACHE_MAX_AGE, mode=CACHE_MODE):
+        self.directory = directory or os.environ.get("CORN_RESPONSE_CACHE_DIR") or default_cache_dir()
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.mode = mode
+        self._lock = threading.Lock()
+        self._writes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.saved_seconds = 0.0
+
+    def enabled_for(self, request: dict, cache: Optional[bool] = None) -> bool:
+        """Decide whether a request goes through the cache.
+
+        ``cache=False`` bypasses the cache, ``cache=True`` opts a call in and
+        ``None`` applies the configured mode.
+        """
+        if cache is False or self.mode == "off":
+            return False
+        if cache is True or self.mode == "all":
+            return True
+        return request.get("temperature", 1.0) == 0
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def get(self, key: str) -> Optional[str]:
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+            if time.time() - entry["created"] > self.max_age:
+                os.remove(path)
+                raise FileNotFoundError(path)
+            os.utime(path)  # mark as recently used
+        except (OSError, ValueError, KeyError):
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+            self.saved_seconds += entry.get("latency", 0.0)
+        return entry["text"]
+
+    def put(self, key: str, text: str, latency: float = 0.0, model: Optional[str] = None):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        entry = {"text": text, "model": model, "created": time.time(), "latency": latency}
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(entry, f)
+            os.replace(tmp_path, path)
+        except OSError:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            return
+        with self._lock:
+            self._writes += 1
+            sweep = self._writes % EVICT_EVERY == 0
+        if sweep:
+            self.evict()
+
+    def evict(self):
+        """Drop entries unused for longer than max_age, then least recently used ones until under the size cap."""
+        now = time.time()
+        entries = []
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for mtime, size, path in entries:
+            if now - mtime <= self.max_age and total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        with self._lock:
+            self.evictions += removed
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "mode": self.mode,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "saved_seconds": self.saved_seconds,
+            }
+
+
+response_cache = ResponseCache()
@@ -0,0 +1,154 @@
+"""Model routing by call site, with latency- and error-based failover.
+
+Each llm call site belongs to a tier (fast, balanced or quality) and the
+operator maps tiers to models with CORN_MODEL_*. A random topic is a
+50-token job that a small model serves well; extraction wants the best
+model available.
+
+The router watches each model's recent calls. When a model's p95 wall time
+or error rate crosses its threshold, that tier's traffic moves to the
+tier's fallback model for a cool-down period, after which the primary model
+gets another chance. Every routed call is compared against the reference
+model (OPENAI_MODEL, which every call used before routing) to track the
+cost, tokens and latency that routing saved.
+"""
+import os
+import threading
+import time
+from collections import Counter, deque
+
+from telemetry import ERROR, INTERRUPTED, OK, TIMEOUT, estimate_cost, percentiles
+
+FAST, BALANCED, QUALITY = "fast", "balanced", "quality"
+
+REFERENCE_MODEL = os.environ.get("OPENAI_MODEL", "gpt-4")
+SMALL_MODEL = "gpt-4o-mini"
+
+TIER_MODELS = {
+    FAST: os.environ.get("CORN_MODEL_FAST", SMALL_MODEL),
+    BALANCED: os.environ.get("CORN_MODEL_BALANCED", REFERENCE_MODEL),
+    QUALITY: os.environ.get("CORN_MODEL_QUALITY", REFERENCE_MODEL),
+}
+TIER_FALLBACKS = {
+    FAST: os.environ.get("CORN_MODEL_FAST_FALLBACK", REFERENCE_MODEL),
+    BALANCED: os.environ.get("CORN_MODEL_BALANCED_FALLBACK", SMALL_MODEL),
+    QUALITY: os.environ.get("CORN_MODEL_QUALITY_FALLBACK", SMALL_MODEL),
+}
+
+# Tier of each llm call site; anything unlisted is routed as balanced
+CALL_SITE_TIER = {
+    "topic": FAST,
+    "topic_pool": FAST,
+    "question": BALANCED,
+    "speculation": BALANCED,
+    "extraction": QUALITY,
+    "compaction": QUALITY,
+}
+
+FAILOVER_P95 = float(os.environ.get("CORN_ROUTER_P95_LIMIT", "20"))  # seconds
+FAILOVER_ERROR_RATE = float(os.environ.get("CORN_ROUTER_ERROR_RATE", "0.3"))
+FAILOVER_COOLDOWN = float(os.environ.get("CORN_ROUTER_COOLDOWN", "60"))  # seconds before retrying the primary
+HEALTH_WINDOW = 50  # recent calls per model considered for failover
+MIN_SAMPLES = 10  # calls needed before a model can be failed over
+
+# Outcomes that say something about the model; cache hits, open breakers and abandoned calls do not
+_JUDGED_OUTCOMES = {OK: True, TIMEOUT: False, INTERRUPTED: False, ERROR: False}
+
+
+class ModelHealth:
+    """Recent wall times and outcomes for one model."""
+
+    def __init__(self, window=HEALTH_WINDOW):
+        self.calls = deque(maxlen=window)  # (wall, ok)
+        self.tripped_at = None
+
+    def p95(self) -> float:
+        return percentiles(wall for wall, _ in self.calls)["p95"] or 0.0
+
+    def error_rate(self) -> float:
+        return sum(not ok for _, ok in self.calls) / len(self.calls) if self.calls else 0.0
+
+    def unhealthy(self) -> bool:
+        if len(self.calls) < MIN_SAMPLES:
+            return False
+        return self.p95() > FAILOVER_P95 or self.error_rate() > FAILOVER_ERROR_RATE
+
+
+class Router:
+    """Chooses a model per call and keeps routing statistics."""
+
+    def __init__(self, tier_models=None, fallbacks=None, reference=REFERENCE_MODEL, cooldown=FAILOVER_COOLDOWN):
+        self.tier_models = dict(tier_models or TIER_MODELS)
+        self.fallbacks = dict(fallbacks or TIER_FALLBACKS)
+        self.reference = reference
+        self.cooldown = cooldown
+        self._lock = threading.Lock()
+        self._health = {}  # model -> ModelHealth
+        self._latencies = {}  # (call_site, model) -> deque of successful wall times
+        self.decisions = Counter()  # (call_site, model) -> calls routed
+        self.failovers = Counter()  # model -> times it was failed over
+        self.tokens_rerouted = 0
+        self.cost_saved = 0.0
+        self.latency_saved = 0.0
+
+    def _health_of(self, model) -> ModelHealth:
+        health = self._health.get(model)
+        if health is None:
+            health = self._health[model] = ModelHealth()
+        return health
+
+    def route(self, call_site: str) -> str:
+        """The model to use for a call from ``call_site``."""
+        tier = CALL_SITE_TIER.get(call_site, BALANCED)
+        primary = self.tier_models[tier]
+        fallback = self.fallbacks.get(tier) or primary
+        with self._lock:
+            health = self._health_of(primary)
+            if health.tripped_at is not None and time.monotonic() - health.tripped_at >= self.cooldown:
+                health.tripped_at = None
+                health.calls.clear()  # give the primary a fresh window
+            model = primary
+            if health.tripped_at is not None and fallback != primary and self._health_of(fallback).tripped_at is None:
+                model = fallback
+            self.decisions[call_site, model] += 1
+        return model
+
+    def observe(self, call, wall: float, outcome: str):
+        """Feed a finished telemetry Call back into model health and savings."""
+        ok = _JUDGED_OUTCOMES.get(outcome)
+        if ok is None or not call.model:
+            return
+        with self._lock:
+            health = self._health_of(call.model)
+            health.calls.append((wall, ok))
+            if health.tripped_at is None and health.unhealthy():
+                health.tripped_at = time.monotonic()
+                self.failovers[call.model] += 1
+            if not ok:
+                return
+            latencies = self._latencies.get((call.call_site, call.model))
+            if latencies is None:
+                latencies = self._latencies[call.call_site, call.model] = deque(maxlen=HEALTH_WINDOW)
+            latencies.append(wall)
+            if call.model == self.reference:
+                return
+            self.tokens_rerouted += call.prompt_tokens + call.completion_tokens
+            self.cost_saved += (estimate_cost(self.reference, call.prompt_tokens, call.completion_tokens)
+                                - estimate_cost(call.model, call.prompt_tokens, call.completion_tokens))
+            reference_walls = self._latencies.get((call.call_site, self.reference))
+            if reference_walls:
+                self.latency_saved += percentiles(reference_walls)["p50"] - wall
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "decisions": {f"{site} → {model}": n for (site, model), n in sorted(self.decisions.items())},
+                "failed_over": sorted(m for m, h in self._health.items() if h.tripped_at is not None),
+                "failovers": dict(self.failovers),
+                "tokens_rerouted": self.tokens_rerouted,
+                "cost_saved": self.cost_saved,
+                "latency_saved": self.latency_saved,
+            }
+
+
+router = Router()
@@ -0,0 +1,176 @@
+"""Process-wide rate limiting and prioritisation of OpenAI requests.
+
+Every session in the process shares one API key's quota, so each attempt
+llm.py makes first takes a slot from that key's scheduler. The scheduler
+holds two token buckets, requests per minute and tokens per minute, and
+when they run dry it admits waiting requests strictly by priority:
+interactive questions, then extraction, then speculative background work.
+How long each request queued is reported to telemetry so quotas can be sized.
+
+Token use is not known until a response arrives, so a request reserves its
+prompt plus ``max_tokens`` up front and ``settle`` corrects the bucket once
+the real usage is known.
+"""
+import heapq
+import itertools
+import os
+import threading
+import time
+from typing import Optional
+
+from keyed import KeyedRegistry
+
+RPM_LIMIT = float(os.environ.get("CORN_RPM_LIMIT", "0"))  # requests per minute; 0 means unlimited
+TPM_LIMIT = float(os.environ.get("CORN_TPM_LIMIT", "0"))  # tokens per minute; 0 means unlimited
+DEFAULT_COMPLETION_TOKENS = 256  # reserved when a request sets no max_tokens
+
+INTERACTIVE, EXTRACTION, SPECULATIVE = 0, 1, 2
+PRIORITY_NAMES = {INTERACTIVE: "interactive", EXTRACTION: "extraction", SPECULATIVE: "speculative"}
+
+# Priority of each llm call site; anything unlisted is treated as interactive
+CALL_SITE_PRIORITY = {
+    "question": INTERACTIVE,
+    "topic": INTERACTIVE,
+    "extraction": EXTRACTION,
+    "compaction": EXTRACTION,
+    "topic_pool": SPECULATIVE,
+    "speculation": SPECULATIVE,
+}
+
+
+class QueueTimeout(Exception):
+    """Raised when a request cannot be admitted before its timeout."""
+
+
+class TokenBucket:
+    """Continuously refilling bucket holding up to one minute of quota."""
+
+    def __init__(self, per_minute: float):
+        self.per_minute = per_minute
+        self.capacity = per_minute
+        self.level = per_minute
+        self._updated = time.monotonic()
+
+    @property
+    def unlimited(self) -> bool:
+        return self.per_minute <= 0
+
+    def _refill(self, now):
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.per_minute / 60.0)
+        self._updated = now
+
+    def wait_for(self, amount, now) -> float:
+        """Seconds until ``amount`` is available (0 if it already is)."""
+        if self.unlimited:
+            return 0.0
+        self._refill(now)
+        amount = min(amount, self.capacity)  # an oversized request waits for a full bucket, not forever
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) * 60.0 / self.per_minute
+
+    def take(self, amount, now):
+        if not self.unlimited:
+            self._refill(now)
+            self.level -= min(amount, self.capacity)
+
+    def adjust(self, amount):
+        """Return (positive) or charge (negative) tokens after the fact; the level may go into debt."""
+        if not self.unlimited:
+            self.level = min(self.capacity, self.level + amount)
+
+
+class Scheduler:
+    """Priority admission in front of one API key's request and token buckets."""
+
+    def __init__(self, rpm=RPM_LIMIT, tpm=TPM_LIMIT):
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self._cond = threading.Condition()
+        self._waiting = []  # heap of (priority, seq)
+        self._seq = itertools.count()
+        self.admitted = {name: 0 for name in PRIORITY_NAMES.values()}
+        self.waited = {name: 0.0 for name in PRIORITY_NAMES.values()}
+
+    @property
+    def unlimited(self) -> bool:
+        return self.requests.unlimited and self.tokens.unlimited
+
+    def set_limits(self, rpm: float, tpm: float):
+        """Replace the request and token limits, e.g. from a CLI flag."""
+        with self._cond:
+            self.requests = TokenBucket(rpm)
+            self.tokens = TokenBucket(tpm)
+            self._cond.notify_all()
+
+    def acquire(self, priority: int, tokens: int, timeout: Optional[float] = None) -> float:
+        """Block until this request may go out; return the seconds spent queued.
+
+        Raises QueueTimeout if it is still queued after ``timeout`` seconds.
+        """
+        name = PRIORITY_NAMES.get(priority, "interactive")
+        if self.unlimited:
+            with self._cond:
+                self.admitted[name] += 1
+            return 0.0
+        started = time.monotonic()
+        give_up_at = None if timeout is None else started + timeout
+        with self._cond:
+            ticket = (priority, next(self._seq))
+            heapq.heappush(self._waiting, ticket)
+            try:
+                while True:
+                    now = time.monotonic()
+                    wait = 0.0
+                    if self._waiting[0] == ticket:
+                        wait = max(self.requests.wait_for(1, now), self.tokens.wait_for(tokens, now))
+                        if wait == 0.0:
+                            self.requests.take(1, now)
+                            self.tokens.take(tokens, now)
+                            break
+                    remaining = None if give_up_at is None else give_up_at - now
+                    if remaining is not None and remaining <= 0:
+                        raise QueueTimeout("Timed out waiting for rate limit capacity")
+                    sleep = wait or None  # not at the head: sleep until someone ahead is admitted
+                    if remaining is not None:
+                        sleep = min(sleep or remaining, remaining)
+                    self._cond.wait(sleep)
+            finally:
+                self._waiting.remove(ticket)
+                heapq.heapify(self._waiting)
+                self._cond.notify_all()
+            waited = time.monotonic() - started
+            self.admitted[name] += 1
+            self.waited[name] += waited
+        return waited
+
+    def settle(self, reserved: int, used: int):
+        """Correct the token bucket once a response's real usage is known."""
+        with self._cond:
+            self.tokens.adjust(reserved - used)
+            self._cond.notify_all()
+
+    def stats(self) -> dict:
+        with self._cond:
+            now = time.monotonic()
+            for bucket in (self.requests, self.tokens):
+                if not bucket.unlimited:
+                    bucket._refill(now)
+            return {
+                "queued": {name: sum(p == priority for p, _ in self._waiting) for priority, name in PRIORITY_NAMES.items()},
+                "admitted": dict(self.admitted),
+                "mean_wait": {
+                    name: self.waited[name] / self.admitted[name] if self.admitted[name] else 0.0
+                    for name in PRIORITY_NAMES.values()
+                },
+                "requests_available": None if self.requests.unlimited else self.requests.level,
+                "tokens_available": None if self.tokens.unlimited else self.tokens.level,
+            }
+
+
+_schedulers = KeyedRegistry(Scheduler)
+
+
+def scheduler_for(fingerprint: str) -> Scheduler:
+    """Return the process-wide scheduler for an API key fingerprint."""
+    return _schedulers.get(fingerprint)
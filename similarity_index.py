@@ -0,0 +1,318 @@
+"""Local similarity index over what earlier interviews already captured.
+
+The ``context_*.md`` files in the operator's CORN_CONTEXT_DIRS are chunked
+like chunk_export does and embedded offline as a signed, hashed bag of word
+unigrams and bigrams: DIM float32 values per chunk, no model and no network. The vectors live in one growable NumPy
+matrix stored dimension-major, so a lookup reads only the rows for the
+query's strongest QUERY_DIMS dimensions rather than the whole matrix, and
+stays within a few milliseconds even at 100k chunks.
+
+Completed sessions are indexed only with CORN_SIMILARITY_SESSIONS=on. The
+session store holds every user's interviews, so on a shared deployment their
+section headings would be named in other users' prompts; turn it on only
+where everyone using the app is the same person.
+
+The index updates incrementally: a source (file or session) is re-embedded
+only when its mtime/size or updated_at changes, a source that disappears is
+dropped, and the matrix is saved to an .npz file so a restart does not
+re-embed everything. Question generation asks which earlier sections are
+close to the current conversation and tells the interviewer to treat those
+subjects as already covered; sections from earlier interviews with the same
+focus are left out, so choosing a subject again is not steered away from it.
+"""
+import json
+import os
+import re
+import threading
+import time
+import zlib
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from chunk_export import chunk_section, split_sections
+from store import session_store
+
+DIM = 256
+SIMILARITY_INDEX = os.environ.get("CORN_SIMILARITY_INDEX", "on").lower() not in ("0", "off", "false", "no")
+CONTEXT_DIRS = [d for d in os.environ.get("CORN_CONTEXT_DIRS", "").split(os.pathsep) if d]
+INDEX_SESSIONS = os.environ.get("CORN_SIMILARITY_SESSIONS", "off").lower() in ("1", "on", "true", "yes")
+COVERED_THRESHOLD = float(os.environ.get("CORN_SIMILARITY_THRESHOLD", "0.2"))  # similarity that counts as covered
+COVERED_LIMIT = 5  # covered subjects named in the prompt
+REFRESH_INTERVAL = 30.0  # seconds between background scans for new contexts
+CHUNK_TOKENS = 200
+QUERY_DIMS = 48  # strongest query dimensions scored; a lookup's cost grows with this, not DIM
+QUERY_ANSWERS = 2  # recent answers, with the focus, that describe where the interview is
+
+_TOKEN = re.compile(r"[a-z0-9']+")
+_CONTEXT_FILE = re.compile(r"^context_(.+)_\d{8}_\d{6}(?:_\d+)?\.md$")  # see exports.generate_markdown_filename
+_STOPWORDS = frozenset("""
+a about after all also am an and any are as at be been but by can could did do does for from had has have he her
+him his how i if in into is it its just like me more my no not of on or our out she so some than that the their them
+then there they this to up us user user's was we were what when where which who will with would you your
+""".split())
+
+
+def default_index_path():
+    """Platform data directory for the saved index, next to the session database."""
+    if os.name == 'nt':  # Windows
+        base = os.path.join(os.environ.get('APPDATA', os.path.expanduser('~')), 'AgenticContext')
+    else:
+        base = os.path.join(
+            os.environ.get('XDG_DATA_HOME', os.path.join(os.path.expanduser('~'), '.local', 'share')),
+            'agentic_context'
+        )
+    return os.path.join(base, 'similarity.npz')
+
+
+def _focus_key(focus: Optional[str]) -> Optional[str]:
+    focus = (focus or "").strip().lower()
+    return None if focus in ("", "general") else focus
+
+
+def _file_focus(name: str) -> Optional[str]:
+    match = _CONTEXT_FILE.match(name)
+    return _focus_key(match.group(1)) if match else None
+
+
+def _features(text: str) -> List[str]:
+    words = [w for w in _TOKEN.findall(text.lower()) if w not in _STOPWORDS and len(w) > 1]
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+def embed(texts) -> np.ndarray:
+    """Unit-length hashed n-gram vectors, one row per text."""
+    vectors = np.zeros((len(texts), DIM), dtype=np.float32)
+    for row, text in enumerate(texts):
+        for feature in _features(text):
+            h = zlib.crc32(feature.encode("utf-8"))
+            vectors[row, h % DIM] += 1.0 if (h >> 16) & 1 else -1.0
+    return _normalise(vectors)
+
+
+def _normalise(vectors: np.ndarray) -> np.ndarray:
+    # Dampen repeated features, then scale each row to unit length
+    vectors = np.sign(vectors) * np.log1p(np.abs(vectors))
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (vectors / norms).astype(np.float32)
+
+
+class SimilarityIndex:
+    """Embedded context chunks, the source each came from, and how fresh each source is."""
+
+    def __init__(self, path=None, context_dirs=None, include_sessions=INDEX_SESSIONS):
+        self.path = path or os.environ.get("CORN_SIMILARITY_INDEX_PATH") or default_index_path()
+        self.context_dirs = CONTEXT_DIRS if context_dirs is None else context_dirs
+        self.include_sessions = include_sessions
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._columns = np.zeros((DIM, 0), dtype=np.float32)  # one row per dimension; capacity grows by doubling
+        self._size = 0
+        self._row_sources = []  # source of each row
+        self._row_sections = []  # section heading of each row
+        self._stamps = {}  # source -> stamp it was embedded at
+        self._focuses = {}  # source -> the interview focus it came from, if any
+        self._focus_rows = {}  # focus -> rows from sources with that focus; cleared whenever rows change
+        self._loaded = False
+        self._last_refresh = 0.0
+
+    def __len__(self):
+        return self._size
+
+    # Building
+
+    def add(self, source: str, stamp, chunks: List[Tuple[str, str]], focus: Optional[str] = None):
+        """Replace ``source``'s rows with ``chunks`` (``(section, text)`` pairs)."""
+        vectors = embed([text for _, text in chunks]) if chunks else None
+        with self._lock:
+            self._drop(source)
+            if vectors is not None:
+                self._append(vectors)
+                self._row_sources.extend(source for _ in chunks)
+                self._row_sections.extend(section for section, _ in chunks)
+            self._stamps[source] = stamp
+            self._focuses[source] = _focus_key(focus)
+            self._focus_rows.clear()
+
+    def remove(self, source: str):
+        with self._lock:
+            self._drop(source)
+            self._stamps.pop(source, None)
+            self._focuses.pop(source, None)
+            self._focus_rows.clear()
+
+    def _append(self, vectors):
+        needed = self._size + len(vectors)
+        if needed > self._columns.shape[1]:
+            grown = np.zeros((DIM, max(needed, 2 * self._columns.shape[1], 1024)), dtype=np.float32)
+            grown[:, :self._size] = self._columns[:, :self._size]
+            self._columns = grown
+        self._columns[:, self._size:needed] = vectors.T
+        self._size = needed
+
+    def _drop(self, source):
+        if source not in self._stamps:
+            return
+        keep = [i for i, s in enumerate(self._row_sources) if s != source]
+        if len(keep) == self._size:
+            return
+        self._columns[:, :len(keep)] = self._columns[:, keep]
+        self._row_sources = [self._row_sources[i] for i in keep]
+        self._row_sections = [self._row_sections[i] for i in keep]
+        self._size = len(keep)
+
+    def refresh(self) -> int:
+        """Embed new or changed contexts and save if anything changed; returns the sources updated."""
+        with self._refresh_lock:
+            if not self._loaded:
+                self.load()
+            updated = 0
+            seen = set()
+            for source, stamp, markdown, focus in self._changed_sources(seen):
+                chunks = [(section.rsplit(" > ", 1)[-1].rstrip(":"), text)
+                          for section, body in split_sections(markdown)
+                          for text in chunk_section(section, body, CHUNK_TOKENS)]
+                self.add(source, stamp, chunks, focus)
+                updated += 1
+            for source in [s for s in self._stamps if s not in seen]:
+                self.remove(source)  # a deleted file or session no longer steers questions
+                updated += 1
+            if updated:
+                self.save()
+            self._last_refresh = time.monotonic()
+            return updated
+
+    def refresh_async(self):
+        """Start a background refresh if the last one is older than REFRESH_INTERVAL."""
+        if time.monotonic() - self._last_refresh < REFRESH_INTERVAL or self._refresh_lock.locked():
+            return
+        self._last_refresh = time.monotonic()
+        threading.Thread(target=self._refresh_quietly, name="similarity-index", daemon=True).start()
+
+    def _refresh_quietly(self):
+        try:
+            self.refresh()
+        except Exception:
+            pass  # the index is an optimisation; questions are still generated without it
+
+    def _changed_sources(self, seen: set):
+        """``(source, stamp, markdown, focus)`` for new and changed sources; adds every source found to ``seen``."""
+        for directory in self.context_dirs:
+            if not os.path.isdir(directory):
+                continue
+            for name in sorted(os.listdir(directory)):
+                if not name.endswith(".md"):
+                    continue
+                path = os.path.join(directory, name)
+                st = os.stat(path)
+                source, stamp = f"file:{os.path.abspath(path)}", [st.st_mtime_ns, st.st_size]
+                seen.add(source)
+                if self._stamps.get(source) != stamp:
+                    with open(path, "r", encoding="utf-8") as f:
+                        yield source, stamp, f.read(), _file_focus(name)
+        if not self.include_sessions:
+            return
+        # Only sessions updated since the newest one indexed are read; the rest just have to still exist
+        seen.update(f"session:{session_id}" for session_id in session_store.completed_ids())
+        since = max((s for src, s in self._stamps.items() if src.startswith("session:")), default=0.0)
+        for session in session_store.iter_completed(updated_after=since):
+            source = f"session:{session['id']}"
+            seen.add(source)
+            if self._stamps.get(source) != session["updated_at"]:
+                yield source, session["updated_at"], session["context_data"], session["focus"]
+
+    # Persistence
+
+    def save(self):
+        with self._lock:
+            vectors = self._columns[:, :self._size].T.copy()
+            sources = np.array(self._row_sources, dtype=str)
+            sections = np.array(self._row_sections, dtype=str)
+            stamps = json.dumps(self._stamps)
+            focuses = json.dumps(self._focuses)
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(f, vectors=vectors, sources=sources, sections=sections, stamps=np.array(stamps),
+                     focuses=np.array(focuses))
+        os.replace(tmp_path, self.path)
+
+    def load(self):
+        """Load the saved index, if any; a missing or unreadable file just means rebuilding."""
+        self._loaded = True
+        try:
+            with np.load(self.path, allow_pickle=False) as data:
+                vectors = data["vectors"]
+                if vectors.shape[1:] != (DIM,) or "focuses" not in data.files:
+                    return  # saved with a different DIM, or before focuses were recorded
+                with self._lock:
+                    self._columns = np.ascontiguousarray(vectors.T, dtype=np.float32)
+                    self._size = len(vectors)
+                    self._row_sources = data["sources"].tolist()
+                    self._row_sections = data["sections"].tolist()
+                    self._stamps = json.loads(str(data["stamps"]))
+                    self._focuses = json.loads(str(data["focuses"]))
+                    self._focus_rows.clear()
+        except (OSError, ValueError, KeyError):
+            return
+        if not self.include_sessions:
+            # Saved while sessions were indexed: drop them now, not at the next refresh, and from disk too
+            sessions = [s for s in self._stamps if s.startswith("session:")]
+            for source in sessions:
+                self.remove(source)
+            if sessions:
+                self.save()
+
+    # Lookups
+
+    def _rows_with_focus(self, focus):
+        rows = self._focus_rows.get(focus)
+        if rows is None:
+            sources = {s for s, f in self._focuses.items() if f == focus}
+            rows = self._focus_rows[focus] = np.array(
+                [i for i, s in enumerate(self._row_sources) if s in sources], dtype=np.intp)
+        return rows
+
+    def search(self, text: str, k: int = 10, exclude_focus: Optional[str] = None) -> List[Tuple[float, str, str]]:
+        """The ``k`` closest chunks to ``text`` as ``(similarity, section, source)``, best first.
+
+        ``exclude_focus`` leaves out chunks from interviews with that focus.
+        """
+        query = embed([text])[0]
+        dims = np.flatnonzero(query)
+        if len(dims) > QUERY_DIMS:
+            dims = dims[np.argpartition(-np.abs(query[dims]), QUERY_DIMS - 1)[:QUERY_DIMS]]
+        with self._lock:
+            if not self._size:
+                return []
+            scores = np.zeros(self._size, dtype=np.float32)
+            term = np.empty(self._size, dtype=np.float32)
+            for d in dims:  # each dimension's row is contiguous, so this streams len(dims) rows, not DIM
+                np.multiply(self._columns[d, :self._size], query[d], out=term)
+                scores += term
+            excluded = _focus_key(exclude_focus)
+            if excluded:
+                scores[self._rows_with_focus(excluded)] = -np.inf
+            top = np.argpartition(-scores, k - 1)[:k] if self._size > k else np.arange(self._size)
+            top = top[np.argsort(-scores[top])]
+            return [(float(scores[i]), self._row_sections[i], self._row_sources[i]) for i in top if scores[i] > -np.inf]
+
+    def covered_topics(self, focus: Optional[str] = None, previous_messages=None,
+                       threshold: float = COVERED_THRESHOLD, limit: int = COVERED_LIMIT) -> List[str]:
+        """Sections of earlier contexts close to where this interview is heading, other than ``focus``'s own."""
+        if not SIMILARITY_INDEX:
+            return []
+        self.refresh_async()
+        recent = [turn.text for turn in (previous_messages or [])[-2 * QUERY_ANSWERS:]]
+        query = " ".join(filter(None, [focus] + recent))
+        if not query.strip():
+            return []
+        topics = []
+        for score, section, _ in self.search(query, k=4 * limit, exclude_focus=focus):
+            if score >= threshold and section not in topics:
+                topics.append(section)
+        return topics[:limit]
+
+
+similarity_index = SimilarityIndex()
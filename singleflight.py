@@ -0,0 +1,151 @@
+"""Single-flight sharing of identical in-flight API requests.
+
+A double-click or a rerun that races an in-progress call asks for the same
+completion again. Requests are keyed by session and request fingerprint;
+while one is in flight, identical requests join it instead of calling the
+API, and every caller gets the same result. A streamed flight is read on
+its own thread, so it survives the Streamlit run that started it being
+stopped, and a joiner replays the deltas so far before following live.
+Finished flights linger for a few seconds so a rerun that arrives just
+after the call completed still shares it; failed flights are never joined.
+"""
+import os
+import threading
+import time
+from collections import Counter
+from typing import Callable, Iterator, Optional
+
+from response_cache import request_key
+from telemetry import telemetry
+
+FLIGHT_LINGER = float(os.environ.get("CORN_SINGLEFLIGHT_LINGER", "5"))  # seconds a finished flight is shared
+
+
+class Flight:
+    """One upstream call and everything it has produced so far."""
+
+    def __init__(self):
+        self.cond = threading.Condition()
+        self.deltas = []
+        self.result = None
+        self.error = None
+        self.done = False
+        self.finished_at = None
+
+    def push(self, delta):
+        with self.cond:
+            self.deltas.append(delta)
+            self.cond.notify_all()
+
+    def finish(self, result=None, error: Optional[BaseException] = None):
+        with self.cond:
+            self.result = result
+            self.error = error
+            self.done = True
+            self.finished_at = time.monotonic()
+            self.cond.notify_all()
+
+    def follow(self) -> Iterator[str]:
+        """Yield every delta from the start, waiting for new ones until the flight ends."""
+        seen = 0
+        while True:
+            with self.cond:
+                while seen >= len(self.deltas) and not self.done:
+                    self.cond.wait()
+                fresh = self.deltas[seen:]
+                finished = self.done and seen + len(fresh) >= len(self.deltas)
+            yield from fresh
+            seen += len(fresh)
+            if finished:
+                if self.error is not None:
+                    raise self.error
+                return
+
+    def wait(self):
+        with self.cond:
+            while not self.done:
+                self.cond.wait()
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+class SingleFlight:
+    """Registry of in-flight requests keyed by (session, request fingerprint)."""
+
+    def __init__(self, linger=FLIGHT_LINGER):
+        self.linger = linger
+        self._lock = threading.Lock()
+        self._flights = {}  # key -> Flight
+        self.coalesced = Counter()  # session_id -> calls that joined an existing flight
+
+    def _join_or_lead(self, session_id, request, call_site):
+        key = (session_id, request_key(request))
+        with self._lock:
+            self._prune()
+            flight = self._flights.get(key)
+            if flight is not None and flight.error is None:  # a failed call is retried, not shared
+                self.coalesced[session_id] += 1
+                telemetry.count("coalesced", call_site)
+                return flight, False
+            flight = self._flights[key] = Flight()
+            return flight, True
+
+    def stream(self, session_id, request: dict, open_stream: Callable[[], Iterator[str]],
+               call_site: str = "other") -> Iterator[str]:
+        """Stream ``open_stream()``, or join the identical stream already in flight."""
+        flight, leader = self._join_or_lead(session_id, request, call_site)
+        if leader:
+            threading.Thread(target=self._produce, args=(flight, open_stream), name="single-flight", daemon=True).start()
+        return flight.follow()
+
+    def call(self, session_id, request: dict, fn: Callable[[], str], call_site: str = "other") -> str:
+        """Run ``fn()``, or wait for the identical call already in flight."""
+        flight, leader = self._join_or_lead(session_id, request, call_site)
+        if not leader:
+            return flight.wait()
+        try:
+            result = fn()
+        except BaseException as e:
+            flight.finish(error=e)
+            raise
+        flight.finish(result)
+        return result
+
+    @staticmethod
+    def _produce(flight, open_stream):
+        parts = []
+        error = None
+        try:
+            for delta in open_stream():
+                parts.append(delta)
+                flight.push(delta)
+        except BaseException as e:
+            error = e
+            if not isinstance(e, Exception):
+                raise
+        finally:
+            # Always end the flight, however the leader stopped, or its followers wait forever
+            flight.finish(None if error is not None else "".join(parts), error)
+
+    def forget(self, session_id):
+        """Drop a finished session's counter and any flights it left behind."""
+        with self._lock:
+            self.coalesced.pop(session_id, None)
+            for key in [k for k, f in self._flights.items() if k[0] == session_id and f.done]:
+                del self._flights[key]
+
+    def _prune(self):
+        now = time.monotonic()
+        for key in [k for k, f in self._flights.items() if f.done and now - f.finished_at > self.linger]:
+            del self._flights[key]
+
+    def stats(self, session_id=None) -> dict:
+        with self._lock:
+            return {
+                "in_flight": sum(not f.done for f in self._flights.values()),
+                "coalesced": self.coalesced[session_id] if session_id is not None else sum(self.coalesced.values()),
+            }
+
+
+single_flight = SingleFlight()
@@ -0,0 +1,137 @@
+"""Speculative opening questions for each interview focus.
+
+"Start New Interview" and "📝 Update Interview Focus" both need an opening
+question before the user sees anything. This cache keeps one ready for the
+General focus and for the subjects users actually pick, generated on a
+background worker in order of popularity. Speculation has an hourly token
+budget so warming the cache can never cost more than the operator allows.
+"""
+import os
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+import llm
+from keyed import KeyedRegistry
+from memory import count_tokens
+from prompts import question_request
+from similarity_index import similarity_index
+from subjects import subject_focuses
+
+SPECULATION_SUBJECTS = int(os.environ.get("CORN_SPECULATION_SUBJECTS", "5"))  # most popular focuses kept warm
+SPECULATION_TOKEN_BUDGET = int(os.environ.get("CORN_SPECULATION_TOKENS_PER_HOUR", "20000"))  # 0 disables it
+SPECULATION_TTL = float(os.environ.get("CORN_SPECULATION_TTL", "3600"))  # seconds
+SPECULATION_CONCURRENCY = 2
+
+_executor = ThreadPoolExecutor(max_workers=SPECULATION_CONCURRENCY, thread_name_prefix="speculation")
+_known_focuses = set(subject_focuses())
+
+# How often each focus is chosen, across every session in the process
+subject_popularity = Counter()
+_popularity_lock = threading.Lock()
+
+
+class OpeningQuestionCache:
+    """One ready-made opening question per focus, for one API key."""
+
+    def __init__(self, subjects=SPECULATION_SUBJECTS, token_budget=SPECULATION_TOKEN_BUDGET, ttl=SPECULATION_TTL):
+        self.subjects = subjects
+        self.token_budget = token_budget
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._questions = {}  # focus -> (question, created_at)
+        self._in_flight = set()
+        self._spent = deque()  # (timestamp, tokens) within the last hour
+        self.hits = 0
+        self.misses = 0
+        self.tokens_spent = 0
+
+    def take(self, focus: Optional[str], client=None, api_key=None) -> Optional[str]:
+        """Claim the speculated opening question for a focus, if one is ready."""
+        with _popularity_lock:
+            subject_popularity[focus] += 1
+        with self._lock:
+            entry = self._questions.pop(focus, None)
+            if entry is not None and time.monotonic() - entry[1] > self.ttl:
+                entry = None
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        if client is not None:
+            self.warm(client, api_key)
+        return entry[0] if entry else None
+
+    def warm(self, client, api_key):
+        """Generate opening questions for the most popular focuses that lack one."""
+        if self.token_budget <= 0:
+            return
+        with _popularity_lock:
+            ranked = [focus for focus, _ in subject_popularity.most_common() if focus in _known_focuses]
+        candidates = [None] + ranked[:self.subjects]
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            wanted = [
+                focus for focus in candidates
+                if focus not in self._questions and focus not in self._in_flight
+            ][:max(0, SPECULATION_CONCURRENCY - len(self._in_flight))]
+            started = []
+            for focus in wanted:
+                if self._spent_last_hour(now) >= self.token_budget:
+                    break
+                self._in_flight.add(focus)
+                started.append(focus)
+        for focus in started:
+            _executor.submit(self._generate, client, api_key, focus)
+
+    def _generate(self, client, api_key, focus):
+        request = question_request([], focus, similarity_index.covered_topics(focus))
+        prompt_tokens = sum(count_tokens(m["content"]) for m in request["messages"])
+        try:
+            question = llm.chat(client, api_key, timeout=30, cache=False, call_site="speculation", **request)
+        except Exception:
+            with self._lock:
+                self._in_flight.discard(focus)
+                self._record_spend(prompt_tokens)
+            return
+        with self._lock:
+            self._in_flight.discard(focus)
+            self._record_spend(prompt_tokens + count_tokens(question))
+            self._questions[focus] = (question, time.monotonic())
+        self.warm(client, api_key)
+
+    def _record_spend(self, tokens):
+        self._spent.append((time.monotonic(), tokens))
+        self.tokens_spent += tokens
+
+    def _spent_last_hour(self, now):
+        while self._spent and now - self._spent[0][0] > 3600:
+            self._spent.popleft()
+        return sum(tokens for _, tokens in self._spent)
+
+    def _expire(self, now):
+        for focus in [f for f, (_, created) in self._questions.items() if now - created > self.ttl]:
+            del self._questions[focus]
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "ready": len(self._questions),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "tokens_spent": self.tokens_spent,
+                "tokens_last_hour": self._spent_last_hour(time.monotonic()),
+            }
+
+
+_caches = KeyedRegistry(OpeningQuestionCache)
+
+
+def opening_questions_for(api_key: str) -> OpeningQuestionCache:
+    """Return the process-wide opening question cache for an API key."""
+    return _caches.get(llm.key_fingerprint(api_key))
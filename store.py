@@ -0,0 +1,194 @@
+"""Durable interview storage in SQLite.
+
+Sessions and their turns live in an append-only SQLite database in WAL mode,
+so readers never block the writer and several Streamlit sessions (or worker
+processes) can share one file. Turns are keyed by (session, sequence number),
+which keeps appends and windowed reads index lookups whose cost does not
+depend on how many sessions the database holds. Schema changes are applied
+as numbered migrations tracked in ``PRAGMA user_version``.
+"""
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Iterator, Optional
+
+from turns import Turn
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id TEXT PRIMARY KEY,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    focus TEXT,
+    complete INTEGER NOT NULL DEFAULT 0,
+    context_data TEXT NOT NULL DEFAULT ''
+);
+CREATE TABLE IF NOT EXISTS turns (
+    session_id TEXT NOT NULL REFERENCES sessions(id),
+    seq INTEGER NOT NULL,
+    role TEXT NOT NULL,
+    content TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (session_id, seq)
+) WITHOUT ROWID;
+"""
+
+# Applied in order to bring a database from user_version N to N + 1
+MIGRATIONS = [
+    # 1: per-turn token counts and generation latency
+    """
+    ALTER TABLE turns ADD COLUMN tokens INTEGER;
+    ALTER TABLE turns ADD COLUMN latency REAL;
+    """,
+]
+
+TURN_COLUMNS = "role, content, created_at, tokens, latency"
+SESSION_COLUMNS = "id, created_at, updated_at, focus, complete, context_data"
+
+
+def _session_from_row(row) -> dict:
+    session = dict(zip(("id", "created_at", "updated_at", "focus", "complete", "context_data"), row))
+    session["complete"] = bool(session["complete"])
+    return session
+
+
+def default_db_path():
+    """Platform data directory for the session database."""
+    if os.name == 'nt':  # Windows
+        base = os.path.join(os.environ.get('APPDATA', os.path.expanduser('~')), 'AgenticContext')
+    else:
+        base = os.path.join(
+            os.environ.get('XDG_DATA_HOME', os.path.join(os.path.expanduser('~'), '.local', 'share')),
+            'agentic_context'
+        )
+    return os.path.join(base, 'sessions.db')
+
+
+class SessionStore:
+    """Append-only store of interview sessions and turns."""
+
+    def __init__(self, path=None):
+        self.path = path or os.environ.get("CORN_DB_PATH") or default_db_path()
+        self._local = threading.local()
+        self._init_lock = threading.Lock()
+        self._initialised = False
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            if os.path.dirname(self.path):
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            with self._init_lock:
+                if not self._initialised:
+                    conn.executescript(SCHEMA)
+                    self._migrate(conn)
+                    self._initialised = True
+            self._local.conn = conn
+        return conn
+
+    def _migrate(self, conn):
+        """Apply any migrations the database has not seen yet."""
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            for number, migration in enumerate(MIGRATIONS[version:], start=version + 1):
+                for statement in filter(str.strip, migration.split(";")):
+                    conn.execute(statement)
+                conn.execute(f"PRAGMA user_version = {number}")
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def create_session(self, focus: Optional[str] = None) -> str:
+        session_id = uuid.uuid4().hex
+        now = time.time()
+        self._connection().execute(
+            "INSERT INTO sessions (id, created_at, updated_at, focus) VALUES (?, ?, ?, ?)",
+            (session_id, now, now, focus)
+        )
+        return session_id
+
+    def get_session(self, session_id) -> Optional[dict]:
+        row = self._connection().execute(
+            f"SELECT {SESSION_COLUMNS} FROM sessions WHERE id = ?", (session_id,)
+        ).fetchone()
+        return _session_from_row(row) if row is not None else None
+
+    def iter_completed(self, updated_after: float = 0.0) -> Iterator[dict]:
+        """Completed sessions with a context, updated at or after ``updated_after``, oldest first."""
+        cursor = self._connection().execute(
+            f"SELECT {SESSION_COLUMNS} FROM sessions WHERE complete = 1 AND context_data != '' "
+            "AND updated_at >= ? ORDER BY updated_at",
+            (updated_after,)
+        )
+        for row in cursor:
+            yield _session_from_row(row)
+
+    def completed_ids(self) -> set:
+        """IDs of every completed session with a context."""
+        rows = self._connection().execute("SELECT id FROM sessions WHERE complete = 1 AND context_data != ''")
+        return {row[0] for row in rows}
+
+    def update_session(self, session_id, **fields):
+        """Update session metadata (focus, complete, context_data)."""
+        allowed = {"focus", "complete", "context_data"}
+        assignments = [(k, v) for k, v in fields.items() if k in allowed]
+        if not assignments:
+            return
+        columns = ", ".join(f"{k} = ?" for k, _ in assignments)
+        self._connection().execute(
+            f"UPDATE sessions SET {columns}, updated_at = ? WHERE id = ?",
+            [v for _, v in assignments] + [time.time(), session_id]
+        )
+
+    def append_turn(self, session_id, turn: Turn) -> int:
+        """Append a turn and return its sequence number."""
+        now = time.time()
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            seq = conn.execute(
+                "SELECT COALESCE(MAX(seq), -1) + 1 FROM turns WHERE session_id = ?", (session_id,)
+            ).fetchone()[0]
+            conn.execute(
+                f"INSERT INTO turns (session_id, seq, {TURN_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (session_id, seq, turn.role, turn.text, turn.timestamp, turn.tokens, turn.latency)
+            )
+            conn.execute("UPDATE sessions SET updated_at = ? WHERE id = ?", (now, session_id))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return seq
+
+    def count_turns(self, session_id) -> int:
+        return self._connection().execute(
+            "SELECT COALESCE(MAX(seq), -1) + 1 FROM turns WHERE session_id = ?", (session_id,)
+        ).fetchone()[0]
+
+    def load_window(self, session_id, limit: int, before: Optional[int] = None) -> list:
+        """The last ``limit`` turns (optionally before sequence ``before``), oldest first."""
+        if before is None:
+            before = self.count_turns(session_id)
+        rows = self._connection().execute(
+            f"SELECT {TURN_COLUMNS} FROM turns WHERE session_id = ? AND seq >= ? AND seq < ? ORDER BY seq",
+            (session_id, max(0, before - limit), before)
+        ).fetchall()
+        return [Turn(*row) for row in rows]
+
+    def load_turns(self, session_id) -> list:
+        """Every turn of a session, oldest first."""
+        rows = self._connection().execute(
+            f"SELECT {TURN_COLUMNS} FROM turns WHERE session_id = ? ORDER BY seq", (session_id,)
+        ).fetchall()
+        return [Turn(*row) for row in rows]
+
+
+session_store = SessionStore()
@@ -0,0 +1,348 @@
+"""Page CSS, built once per process and injected on each full script run.
+
+The four style sheets are kept in their original cascade order.
+"""
+
+APP_CSS = """
+<style>
+/* Clean, simplified CSS */
+/* Base styles */
+* {
+    font-family: 'Inter', sans-serif;
+    margin: 0;
+    padding: 0;
+    box-sizing: border-box;
+}
+
+/* Main container spacing */
+.main {
+    padding: 2rem;
+}
+
+/* Clean header styles */
+header {
+    border-bottom: none !important;
+    background: none !important;
+    margin-bottom: 2rem;
+}
+
+.stApp header {
+    background-color: transparent !important;
+    border-bottom: none !important;
+}
+
+/* Remove default Streamlit styling */
+.block-container {
+    padding-top: 2rem !important;
+    max-width: 1200px;
+}
+
+.stMarkdown {
+    background: transparent;
+    padding: 0;
+    box-shadow: none;
+}
+
+/* Button styling */
+.stButton > button {
+    border-radius: 8px;
+    padding: 0.5rem 1rem;
+    background-color: #2196f3;
+    color: white;
+    border: none;
+    font-weight: 500;
+}
+
+.stButton > button:hover {
+    background-color: #1976d2;
+}
+
+/* Chat message styling */
+.chat-message {
+    padding: 1rem;
+    border-radius: 8px;
+    margin: 0.5rem 0;
+    background: #f8f9fa;
+}
+
+/* Tab styling */
+.stTabs [data-baseweb="tab-list"] {
+    gap: 1rem;
+    border-bottom: 2px solid #f0f0f0;
+}
+
+.stTabs [data-baseweb="tab"] {
+    height: 40px;
+    padding: 0 16px;
+    color: #666;
+}
+
+.stTabs [data-baseweb="tab-highlight"] {
+    background-color: #2196f3;
+}
+
+/* Sidebar styling */
+.css-1d391kg {
+    padding: 2rem 1rem;
+}
+
+/* Input fields */
+.stTextInput > div > div {
+    border-radius: 8px;
+    border: 1px solid #e0e0e0;
+}
+
+/* Text size */
+.stTextInput, .stTextArea, .stMarkdown, .stText {
+    font-size: 16px !important;
+}
+
+div[data-testid="stChatMessage"] {
+    font-size: 16px !important;
+}
+
+/* Custom CSS to adjust avatar size and message alignment */
+/* Increase avatar size */
+.stChatMessage img {
+    width: 120px !important;
+    height: 120px !important;
+}
+
+/* Align user messages to the right */
+[data-testid="chat-message-container"]:has([data-testid="chat-message-avatar"][src*="User"]) {
+    flex-direction: row-reverse;
+    margin-left: auto;
+    margin-right: 0;
+}
+
+/* Add some spacing between messages */
+[data-testid="chat-message-container"] {
+    margin: 1rem 0;
+    max-width: 85%;
+}
+
+/* Assistant messages to the left */
+[data-testid="chat-message-container"]:has([data-testid="chat-message-avatar"]:not([src*="User"])) {
+    margin-right: auto;
+    margin-left: 0;
+}
+
+/* Custom CSS for chat UI and avatars */
+/* Chat container styling */
+[data-testid="stChatContainer"] {
+    background-color: #f8f9fa;
+    padding: 2rem;
+    border-radius: 10px;
+    margin: 1rem 0;
+}
+
+/* Increase font size for chat messages */
+.stChatMessage p {
+    font-size: 1.1rem !important;
+    line-height: 1.5 !important;
+    margin: 0 !important;
+}
+
+/* Increase avatar size */
+.stChatMessage img {
+    width: 120px !important;
+    height: 120px !important;
+}
+
+/* Align user messages to the right */
+[data-testid="chat-message-container"]:has([data-testid="chat-message-avatar"][src*="User"]) {
+    flex-direction: row-reverse;
+    margin-left: auto;
+    margin-right: 0;
+}
+
+/* Add some spacing between messages */
+[data-testid="chat-message-container"] {
+    margin: 1.5rem 0;
+    max-width: 85%;
+    position: relative;
+}
+
+/* Assistant messages to the left with bubble styling */
+[data-testid="chat-message-container"]:has([data-testid="chat-message-avatar"]:not([src*="User"])) {
+    margin-right: auto;
+    margin-left: 0;
+}
+
+/* Chat bubble styling */
+[data-testid="chat-message-container"] > div:nth-child(2) {
+    border-radius: 15px;
+    padding: 1.2rem 1.5rem;
+    box-shadow: 0 1px 2px rgba(0,0,0,0.1);
+}
+
+/* Assistant message bubble */
+[data-testid="chat-message-container"]:has([data-testid="chat-message-avatar"]:not([src*="User"])) > div:nth-child(2) {
+    background-color: #e8f5e9;  /* Light green background */
+    border-top-left-radius: 5px;
+    position: relative;
+}
+
+/* Assistant label */
+[data-testid="chat-message-container"]:has([data-testid="chat-message-avatar"]:not([src*="User"]))::before {
+    content: "Corn";
+    position: absolute;
+    top: -1.2rem;
+    left: 120px;  /* Align with end of avatar */
+    font-size: 0.85rem;
+    color: #2e7d32;  /* Darker green */
+    font-weight: 500;
+}
+
+/* User message bubble */
+[data-testid="chat-message-container"]:has([data-testid="chat-message-avatar"][src*="User"]) > div:nth-child(2) {
+    background-color: #e3f2fd;  /* Light blue background */
+    border-top-right-radius: 5px;
+    position: relative;
+}
+
+/* User label */
+[data-testid="chat-message-container"]:has([data-testid="chat-message-avatar"][src*="User"])::before {
+    content: "You";
+    position: absolute;
+    top: -1.2rem;
+    right: 120px;  /* Align with end of avatar */
+    font-size: 0.85rem;
+    color: #1565c0;  /* Darker blue */
+    font-weight: 500;
+}
+
+/* Remove default message background */
+.stChatMessage {
+    background-color: transparent !important;
+}
+
+/* Style the chat input box */
+.stChatInputContainer {
+    padding: 1rem;
+    background-color: white;
+    border-radius: 10px;
+    margin-top: 1rem;
+    box-shadow: 0 1px 3px rgba(0,0,0,0.1);
+}
+
+/* Add some margin to the tabs for better spacing */
+.stTabs {
+    margin-top: 1rem;
+}
+
+/* Update chat display logic and styling for better message alignment and alternating shading */
+/* Chat container styling */
+[data-testid="stChatContainer"] {
+    background-color: #f8f9fa;
+    padding: 2rem;
+    border-radius: 10px;
+    margin: 1rem 0;
+}
+
+/* Increase font size for chat messages */
+.stChatMessage p {
+    font-size: 1.1rem !important;
+    line-height: 1.5 !important;
+    margin: 0 !important;
+}
+
+/* Increase avatar size and adjust positioning */
+.stChatMessage img {
+    width: 120px !important;
+    height: 120px !important;
+}
+
+/* User message container */
+[data-testid="chat-message-container"]:has([data-testid="chat-message-avatar"][src*="User"]) {
+    flex-direction: row-reverse !important;
+    margin-left: auto !important;
+    margin-right: 0 !important;
+    background-color: rgba(0, 0, 0, 0.02);
+    padding: 1rem;
+    border-radius: 10px;
+}
+
+/* Assistant message container */
+[data-testid="chat-message-container"]:has([data-testid="chat-message-avatar"]:not([src*="User"])) {
+    margin-right: auto !important;
+    margin-left: 0 !important;
+    padding: 1rem;
+    border-radius: 10px;
+}
+
+/* Alternate row shading */
+[data-testid="chat-message-container"]:nth-child(even) {
+    background-color: rgba(0, 0, 0, 0.03);
+}
+
+/* Message spacing and width */
+[data-testid="chat-message-container"] {
+    margin: 0.5rem 0;
+    max-width: 90%;
+    width: 90%;
+}
+
+/* Assistant message bubble */
+[data-testid="chat-message-container"]:has([data-testid="chat-message-avatar"]:not([src*="User"])) > div:nth-child(2) {
+    background-color: #e8f5e9;
+    border-radius: 15px;
+    border-top-left-radius: 5px;
+    padding: 1.2rem 1.5rem;
+    box-shadow: 0 1px 2px rgba(0,0,0,0.1);
+}
+
+/* User message bubble */
+[data-testid="chat-message-container"]:has([data-testid="chat-message-avatar"][src*="User"]) > div:nth-child(2) {
+    background-color: #e3f2fd;
+    border-radius: 15px;
+    border-top-right-radius: 5px;
+    padding: 1.2rem 1.5rem;
+    box-shadow: 0 1px 2px rgba(0,0,0,0.1);
+}
+
+/* Remove default message background */
+.stChatMessage {
+    background-color: transparent !important;
+}
+
+/* Style the chat input box */
+.stChatInputContainer {
+    padding: 1rem;
+    background-color: white;
+    border-radius: 10px;
+    margin-top: 1rem;
+    box-shadow: 0 1px 3px rgba(0,0,0,0.1);
+}
+
+/* Add some margin to the tabs for better spacing */
+.stTabs {
+    margin-top: 1rem;
+}
+
+/* Force user messages to the right */
+[data-testid="chat-message-container"]:has([data-testid="chat-message-avatar"][src*="User"]) > div:nth-child(2) {
+    margin-left: auto !important;
+}
+
+/* Add labels above messages */
+[data-testid="chat-message-container"]::before {
+    position: absolute;
+    top: -0.5rem;
+    font-size: 0.85rem;
+    font-weight: 500;
+}
+
+[data-testid="chat-message-container"]:has([data-testid="chat-message-avatar"]:not([src*="User"]))::before {
+    content: "Corn";
+    left: 140px;
+    color: #2e7d32;
+}
+
+[data-testid="chat-message-container"]:has([data-testid="chat-message-avatar"][src*="User"])::before {
+    content: "You";
+    right: 140px;
+    color: #1565c0;
+}
+</style>
+"""
@@ -0,0 +1,247 @@
+"""Subject taxonomy offered in "Subject Restricted" interview mode."""
+
+SUBJECT_CATEGORIES = {
+    "Biography & Background": [
+        "General Biography",
+        "Personal History",
+        "Family Background",
+        "Childhood & Upbringing",
+        "Life Milestones",
+        "Cultural Heritage",
+        "Geographic History",
+        "Family Traditions",
+        "Formative Experiences",
+        "Personal Timeline",
+        "Family Structure",
+        "Life Stories"
+    ],
+    "Health & Wellness": [
+        "General Health",
+        "Physical Health",
+        "Exercise Routine",
+        "Medical History",
+        "Diet & Nutrition",
+        "Sleep Habits",
+        "Health Goals",
+        "Wellness Practices",
+        "Preventive Care",
+        "Energy Levels",
+        "Recovery & Rest",
+        "Health Challenges"
+    ],
+    "Mental Health & Wellbeing": [
+        "General Mental Health",
+        "Emotional Awareness",
+        "Stress Management",
+        "Anxiety & Concerns",
+        "Coping Strategies",
+        "Mental Resilience",
+        "Therapy Experience",
+        "Self-Care Practices",
+        "Emotional Growth",
+        "Support Systems",
+        "Mental Health Goals",
+        "Personal Boundaries"
+    ],
+    "Children & Family Life": [
+        "General Parenting",
+        "Parenting Style",
+        "Child Development",
+        "Family Activities",
+        "Education Choices",
+        "Family Values",
+        "Work-Family Balance",
+        "Family Goals",
+        "Childcare Approach",
+        "Family Challenges",
+        "Family Traditions",
+        "Future Planning"
+    ],
+    "Inspirations & Influences": [
+        "General Influences",
+        "Role Models",
+        "Mentors & Teachers",
+        "Inspiring Books",
+        "Life-Changing Events",
+        "Creative Influences",
+        "Cultural Inspirations",
+        "Career Influences",
+        "Personal Heroes",
+        "Motivational Sources",
+        "Artistic Influences",
+        "Philosophical Influences"
+    ],
+    "Humor & Entertainment": [
+        "General Entertainment",
+        "Sense of Humor",
+        "Comedy Preferences",
+        "Entertainment Choices",
+        "Movie Tastes",
+        "TV Shows",
+        "Music Preferences",
+        "Gaming Interests",
+        "Reading Preferences",
+        "Social Media",
+        "Live Entertainment",
+        "Content Creation"
+    ],
+    "Personality & Character": [
+        "General Personality",
+        "Core Traits",
+        "Communication Style",
+        "Decision Making",
+        "Social Tendencies",
+        "Emotional Style",
+        "Leadership Style",
+        "Conflict Approach",
+        "Risk Tolerance",
+        "Adaptability",
+        "Personal Strengths",
+        "Growth Areas"
+    ],
+    "Food & Drink": [
+        "General Preferences",
+        "Favorite Cuisines",
+        "Cooking Skills",
+        "Dietary Choices",
+        "Restaurant Preferences",
+        "Beverage Choices",
+        "Food Adventures",
+        "Recipe Collection",
+        "Food Traditions",
+        "Dining Habits",
+        "Food Philosophy",
+        "Culinary Goals"
+    ],
+    "Career & Professional": [
+        "General Career",
+        "Professional Background",
+        "Technical Skills",
+        "Leadership Experience",
+        "Project Management",
+        "Industry Knowledge",
+        "Career Goals",
+        "Work Experience",
+        "Remote Work",
+        "Workplace Culture",
+        "Professional Development",
+        "Career Challenges"
+    ],
+    "Education & Skills": [
+        "General Education",
+        "Education History",
+        "Research Experience",
+        "Communication Skills",
+        "Problem-Solving",
+        "Languages",
+        "Certifications",
+        "Technical Training",
+        "Self-Learning",
+        "Academic Achievements",
+        "Study Methods",
+        "Learning Goals"
+    ],
+    "Personal Development": [
+        "General Growth",
+        "Work-Life Balance",
+        "Personal Growth",
+        "Life Goals",
+        "Values & Beliefs",
+        "Motivation & Drive",
+        "Time Management",
+        "Stress Management",
+        "Decision Making",
+        "Self-Awareness",
+        "Personal Challenges",
+        "Future Aspirations"
+    ],
+    "Interests & Lifestyle": [
+        "General Interests",
+        "Hobbies",
+        "Travel Experiences",
+        "Cultural Interests",
+        "Sports & Fitness",
+        "Creative Pursuits",
+        "Reading Habits",
+        "Entertainment",
+        "Food & Cuisine",
+        "Music & Arts",
+        "Technology Usage",
+        "Lifestyle Choices"
+    ],
+    "Social & Relationships": [
+        "General Social",
+        "Team Collaboration",
+        "Cultural Background",
+        "Community Involvement",
+        "Mentorship",
+        "Social Activities",
+        "Networking",
+        "Family Dynamics",
+        "Friendship",
+        "Social Impact",
+        "Communication Style",
+        "Cultural Exchange"
+    ],
+    "Innovation & Creativity": [
+        "General Innovation",
+        "Creative Process",
+        "Problem Innovation",
+        "Design Thinking",
+        "Ideation Methods",
+        "Creative Projects",
+        "Innovation Mindset",
+        "Creative Challenges",
+        "Artistic Expression",
+        "Technical Innovation",
+        "Creative Collaboration",
+        "Future Vision"
+    ],
+    "Beliefs & Values": [
+        "General Beliefs",
+        "Religious Views",
+        "Political Views",
+        "Moral Framework",
+        "Ethical Principles",
+        "Spiritual Practices",
+        "Cultural Values",
+        "Social Justice",
+        "Human Rights",
+        "Economic Views",
+        "Tradition & Heritage",
+        "Personal Philosophy"
+    ],
+    "Entertainment": [
+        "General Entertainment",
+        "Favorite Movies",
+        "Favorite TV Shows",
+        "Favorite Music",
+        "Favorite Books",
+        "Favorite Games",
+        "Favorite Sports",
+        "Favorite Hobbies",
+        "Favorite Travel Destinations",
+        "Favorite Food",
+        "Favorite Drink",
+        "Favorite Activities"
+    ],
+    "Worldview & Society": [
+        "General Perspective",
+        "Global Issues",
+        "Social Change",
+        "Environmental Views",
+        "Technology Impact",
+        "Future of Society",
+        "Cultural Perspectives",
+        "Education Systems",
+        "Healthcare Views",
+        "Economic Systems",
+        "Social Structures",
+        "World Challenges"
+    ]
+}
+
+
+def subject_focuses():
+    """Every focus value the subject pickers can produce, as stored in ``context_focus``."""
+    return sorted({subject.lower() for subjects in SUBJECT_CATEGORIES.values() for subject in subjects})
@@ -0,0 +1,355 @@
+"""Per-call instrumentation for every OpenAI request.
+
+llm.py opens a Call for each chat or stream request and finishes it with the
+outcome. Finishing a call updates in-memory counters and latency windows
+under one lock and hands the event to a logging queue, so the caller never
+waits on JSON encoding or disk; a listener thread writes the events to a
+rotating JSONL log.
+
+The counters are served as Prometheus text from a small HTTP thread when
+CORN_METRICS_PORT is set, and ``summary()`` feeds the optional admin panel
+with p50/p95/p99 latencies per call site.
+"""
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+import time
+from collections import Counter, deque
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+TELEMETRY_LOG = os.environ.get("CORN_TELEMETRY_LOG", "")  # "off" disables the event log
+TELEMETRY_LOG_MAX_BYTES = int(os.environ.get("CORN_TELEMETRY_LOG_MAX_BYTES", str(10 * 1024 * 1024)))
+TELEMETRY_LOG_BACKUPS = int(os.environ.get("CORN_TELEMETRY_LOG_BACKUPS", "5"))
+METRICS_PORT = int(os.environ.get("CORN_METRICS_PORT", "0"))  # 0 disables the metrics endpoint
+METRICS_HOST = os.environ.get("CORN_METRICS_HOST", "127.0.0.1")  # loopback only unless a scraper elsewhere needs it
+RECENT_CALLS = 1000  # calls per call site kept for percentiles
+
+# Histogram buckets for call duration and time to first token, in seconds
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# USD per million (prompt, completion) tokens; the longest matching prefix wins
+MODEL_PRICES = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4-turbo": (10.00, 30.00),
+    "gpt-4": (30.00, 60.00),
+    "gpt-3.5-turbo": (0.50, 1.50),
+}
+
+OK, CACHED, TIMEOUT, CIRCUIT_OPEN, INTERRUPTED, ABANDONED, ERROR = (
+    "ok", "cached", "timeout", "circuit_open", "interrupted", "abandoned", "error"
+)
+
+
+def default_log_path():
+    """Platform data directory for the telemetry log."""
+    if os.name == 'nt':  # Windows
+        base = os.path.join(os.environ.get('APPDATA', os.path.expanduser('~')), 'AgenticContext')
+    else:
+        base = os.path.join(
+            os.environ.get('XDG_DATA_HOME', os.path.join(os.path.expanduser('~'), '.local', 'share')),
+            'agentic_context'
+        )
+    return os.path.join(base, 'telemetry.jsonl')
+
+
+@lru_cache(maxsize=64)
+def model_price(model: Optional[str]) -> tuple:
+    """(prompt, completion) USD per million tokens for a model, or zeros if unknown."""
+    for prefix in sorted(MODEL_PRICES, key=len, reverse=True):
+        if model and model.startswith(prefix):
+            return MODEL_PRICES[prefix]
+    return (0.0, 0.0)
+
+
+def estimate_cost(model, prompt_tokens, completion_tokens) -> float:
+    prompt_price, completion_price = model_price(model)
+    return (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1_000_000
+
+
+class Call:
+    """Measurements for one API call, filled in by llm.py as it runs."""
+
+    __slots__ = ("call_site", "model", "started", "ttft", "attempts", "timeouts",
+                 "prompt_tokens", "completion_tokens", "cached", "queue_wait", "reserved")
+
+    def __init__(self, call_site, model):
+        self.call_site = call_site
+        self.model = model
+        self.started = time.perf_counter()
+        self.ttft = None
+        self.attempts = 0
+        self.timeouts = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.cached = False
+        self.queue_wait = 0.0  # seconds spent waiting on the rate limiter
+        self.reserved = 0  # tokens reserved with the rate limiter per attempt
+
+    def first_token(self):
+        if self.ttft is None:
+            self.ttft = time.perf_counter() - self.started
+
+    def usage(self, usage):
+        """Take token counts from an OpenAI ``usage`` object, if the response had one."""
+        if usage is not None:
+            self.prompt_tokens = usage.prompt_tokens or 0
+            self.completion_tokens = usage.completion_tokens or 0
+
+    def finish(self, outcome=OK, error: Optional[BaseException] = None) -> float:
+        """Record the call; returns its wall time."""
+        wall = time.perf_counter() - self.started
+        telemetry.record(self, wall, outcome, error)
+        return wall
+
+
+class _EventQueueHandler(logging.handlers.QueueHandler):
+    """Queue the event dict untouched; the listener thread does the encoding."""
+
+    def prepare(self, record):
+        return record
+
+
+class _JsonLineFormatter(logging.Formatter):
+    def format(self, record):
+        return json.dumps(record.msg, separators=(",", ":"))
+
+
+class Telemetry:
+    """Process-wide counters, latency windows and event log for API calls."""
+
+    def __init__(self, log_path=TELEMETRY_LOG, recent=RECENT_CALLS):
+        self.log_path = log_path or default_log_path()
+        self.recent = recent
+        self._lock = threading.Lock()
+        self._counters = Counter()  # (metric, labels) -> value
+        self._histograms = {}  # (metric, call_site) -> [bucket counts..., +Inf count, sum]
+        self._latencies = {}  # call_site -> deque of wall times
+        self._ttfts = {}  # call_site -> deque of times to first token
+        self._queue_waits = {}  # call_site -> deque of rate limiter waits
+        self._logger = None
+        self._listener = None
+
+    def start_call(self, call_site: str, model: Optional[str]) -> Call:
+        return Call(call_site, model)
+
+    def record(self, call: Call, wall: float, outcome: str, error: Optional[BaseException] = None):
+        cost = estimate_cost(call.model, call.prompt_tokens, call.completion_tokens)
+        labels = (call.call_site, call.model or "", outcome)
+        with self._lock:
+            self._counters["calls", labels] += 1
+            self._counters["retries", call.call_site] += max(0, call.attempts - 1)
+            self._counters["timeouts", call.call_site] += call.timeouts
+            self._counters["prompt_tokens", call.call_site] += call.prompt_tokens
+            self._counters["completion_tokens", call.call_site] += call.completion_tokens
+            self._counters["cost", call.call_site] += cost
+            self._observe("duration", call.call_site, wall)
+            self._observe("queue_wait", call.call_site, call.queue_wait)
+            self._window(self._latencies, call.call_site).append(wall)
+            self._window(self._queue_waits, call.call_site).append(call.queue_wait)
+            if call.ttft is not None and call.attempts:  # only calls that reached upstream
+                self._observe("ttft", call.call_site, call.ttft)
+                self._window(self._ttfts, call.call_site).append(call.ttft)
+        if self.log_path != "off":
+            self._log({
+                "ts": time.time(),
+                "call_site": call.call_site,
+                "model": call.model,
+                "outcome": outcome,
+                "wall": round(wall, 4),
+                "ttft": None if call.ttft is None else round(call.ttft, 4),
+                "queue_wait": round(call.queue_wait, 4),
+                "attempts": call.attempts,
+                "timeouts": call.timeouts,
+                "prompt_tokens": call.prompt_tokens,
+                "completion_tokens": call.completion_tokens,
+                "cost": cost,
+                "error": None if error is None else type(error).__name__,
+            })
+
+    def _window(self, windows, call_site):
+        window = windows.get(call_site)
+        if window is None:
+            window = windows[call_site] = deque(maxlen=self.recent)
+        return window
+
+    def _observe(self, metric, call_site, value):
+        buckets = self._histograms.get((metric, call_site))
+        if buckets is None:
+            buckets = self._histograms[metric, call_site] = [0] * (len(LATENCY_BUCKETS) + 1) + [0.0]
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if value <= bound:
+                buckets[i] += 1
+        buckets[-2] += 1
+        buckets[-1] += value
+
+    def _log(self, event):
+        if self._logger is None:
+            self._start_log()
+            if self._logger is None:
+                return
+        self._logger.info(event)
+
+    def _start_log(self):
+        with self._lock:
+            if self._logger is not None:
+                return
+            try:
+                if os.path.dirname(self.log_path):
+                    os.makedirs(os.path.dirname(self.log_path), exist_ok=True)
+                handler = logging.handlers.RotatingFileHandler(
+                    self.log_path, maxBytes=TELEMETRY_LOG_MAX_BYTES, backupCount=TELEMETRY_LOG_BACKUPS,
+                    encoding="utf-8"
+                )
+            except OSError:
+                self.log_path = "off"
+                return
+            handler.setFormatter(_JsonLineFormatter())
+            events = queue.SimpleQueue()
+            self._listener = logging.handlers.QueueListener(events, handler)
+            self._listener.start()
+            atexit.register(self._listener.stop)
+            logger = logging.getLogger("agentic_context.telemetry")
+            logger.setLevel(logging.INFO)
+            logger.propagate = False
+            logger.addHandler(_EventQueueHandler(events))
+            self._logger = logger
+
+    def count(self, metric: str, call_site: str, amount=1):
+        """Bump an event counter, e.g. hedges fired; exported like the built-in counters."""
+        with self._lock:
+            self._counters[metric, call_site] += amount
+
+    def ttft_percentile(self, call_site: str, q: float, min_samples=1) -> Optional[float]:
+        """Nearest-rank percentile of recent TTFTs for a call site, or None with too few samples."""
+        with self._lock:
+            ordered = sorted(self._ttfts.get(call_site, ()))
+        if len(ordered) < max(1, min_samples):
+            return None
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def summary(self) -> dict:
+        """Per call site: call count, p50/p95/p99 wall time, TTFT and queue wait, tokens and cost."""
+        with self._lock:
+            calls = Counter()
+            for (metric, labels), value in self._counters.items():
+                if metric == "calls":
+                    calls[labels[0]] += value
+            result = {}
+            for call_site, latencies in self._latencies.items():
+                result[call_site] = {
+                    "calls": calls[call_site],
+                    "wall": percentiles(latencies),
+                    "ttft": percentiles(self._ttfts.get(call_site, ())),
+                    "queue_wait": percentiles(self._queue_waits.get(call_site, ())),
+                    "retries": self._counters["retries", call_site],
+                    "timeouts": self._counters["timeouts", call_site],
+                    "tokens": self._counters["prompt_tokens", call_site] + self._counters["completion_tokens", call_site],
+                    "cost": self._counters["cost", call_site],
+                }
+            return result
+
+    def prometheus(self) -> str:
+        """Current counters and histograms in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            counters = sorted(self._counters.items(), key=lambda item: (item[0][0], str(item[0][1])))
+            histograms = sorted(self._histograms.items())
+
+        def header(name, kind, description):
+            lines.append(f"# HELP {name} {description}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        header("corn_llm_calls_total", "counter", "OpenAI calls by call site, model and outcome")
+        for (metric, labels), value in counters:
+            if metric == "calls":
+                call_site, model, outcome = labels
+                lines.append(
+                    f'corn_llm_calls_total{{call_site="{call_site}",model="{model}",outcome="{outcome}"}} {value}'
+                )
+        for metric, kind, description in (
+            ("retries", "counter", "Retried attempts"),
+            ("timeouts", "counter", "Attempts that timed out"),
+            ("prompt_tokens", "counter", "Prompt tokens used"),
+            ("completion_tokens", "counter", "Completion tokens used"),
+            ("cost", "counter", "Estimated spend in USD"),
+            ("hedges_fired", "counter", "Hedge requests sent for slow calls"),
+            ("hedge_wins", "counter", "Hedge requests that answered first"),
+            ("hedges_capped", "counter", "Hedges skipped by the spend cap"),
+            ("coalesced", "counter", "Requests that joined an identical one already in flight"),
+        ):
+            name = f"corn_llm_{metric}_total" if metric != "cost" else "corn_llm_cost_usd_total"
+            header(name, kind, description)
+            for (counter, call_site), value in counters:
+                if counter == metric:
+                    lines.append(f'{name}{{call_site="{call_site}"}} {value:g}')
+        for metric, description in (
+            ("duration", "Wall time per call"),
+            ("ttft", "Time to first streamed token"),
+            ("queue_wait", "Time spent waiting on the rate limiter"),
+        ):
+            name = f"corn_llm_{metric}_seconds"
+            header(name, "histogram", description)
+            for (histogram, call_site), buckets in histograms:
+                if histogram != metric:
+                    continue
+                for bound, count in zip(LATENCY_BUCKETS, buckets):
+                    lines.append(f'{name}_bucket{{call_site="{call_site}",le="{bound:g}"}} {count}')
+                lines.append(f'{name}_bucket{{call_site="{call_site}",le="+Inf"}} {buckets[-2]}')
+                lines.append(f'{name}_count{{call_site="{call_site}"}} {buckets[-2]}')
+                lines.append(f'{name}_sum{{call_site="{call_site}"}} {buckets[-1]:g}')
+        return "\n".join(lines) + "\n"
+
+
+def percentiles(values) -> dict:
+    """Nearest-rank p50, p95 and p99 of a sequence, or None for each if it is empty."""
+    ordered = sorted(values)
+    if not ordered:
+        return {"p50": None, "p95": None, "p99": None}
+    pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+    return {"p50": pick(0.50), "p95": pick(0.95), "p99": pick(0.99)}
+
+
+telemetry = Telemetry()
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = telemetry.prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # scrapes would otherwise flood stderr
+
+
+_metrics_server = None
+_metrics_lock = threading.Lock()
+
+
+def start_metrics_server(port: int = METRICS_PORT, host: str = METRICS_HOST):
+    """Serve /metrics on ``host``:``port`` from a daemon thread; safe to call on every rerun."""
+    global _metrics_server
+    if port <= 0:
+        return None
+    with _metrics_lock:
+        if _metrics_server is None:
+            try:
+                _metrics_server = ThreadingHTTPServer((host, port), _MetricsHandler)
+            except OSError:
+                return None  # another process already serves this port
+            _metrics_server.daemon_threads = True
+            threading.Thread(target=_metrics_server.serve_forever, name="metrics", daemon=True).start()
+        return _metrics_server
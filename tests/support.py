@@ -0,0 +1,21 @@
+"""Shared test setup: the repo on sys.path, and nothing written outside a temporary directory.
+
+Import this before any repo module. Telemetry, the response cache and the
+stores pick their paths up at import time, so HOME and the data directories
+are pointed at a throwaway directory first, and the event log is turned off.
+"""
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+_home = tempfile.TemporaryDirectory(prefix="corn-tests-")
+os.environ["HOME"] = _home.name
+os.environ["XDG_CACHE_HOME"] = os.path.join(_home.name, ".cache")
+os.environ["XDG_DATA_HOME"] = os.path.join(_home.name, ".local", "share")
+os.environ["CORN_TELEMETRY_LOG"] = "off"
+os.environ["CORN_RESPONSE_CACHE"] = "off"
+os.environ.pop("CORN_RPM_LIMIT", None)
+os.environ.pop("CORN_TPM_LIMIT", None)
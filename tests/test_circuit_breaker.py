@@ -0,0 +1,87 @@
+"""A half-open probe that ends without an upstream outcome must not wedge the breaker."""
+import itertools
+import time
+import types
+import unittest
+from unittest import mock
+
+import support  # noqa: F401  (isolates HOME and telemetry before the repo is imported)
+
+import llm  # noqa: E402
+import scheduler  # noqa: E402
+
+_keys = itertools.count()
+
+
+def reply(text="Hello?"):
+    message = types.SimpleNamespace(role="assistant", content=text)
+    return types.SimpleNamespace(choices=[types.SimpleNamespace(message=message, finish_reason="stop")], usage=None)
+
+
+def chunk(text, finish_reason=None):
+    choice = types.SimpleNamespace(delta=types.SimpleNamespace(content=text), finish_reason=finish_reason)
+    return types.SimpleNamespace(choices=[choice], usage=None)
+
+
+class FakeClient:
+    """Stands in for openai.OpenAI; ``create`` is whatever the test needs."""
+
+    def __init__(self, create):
+        self.create = create
+        self.chat = types.SimpleNamespace(completions=self)
+
+    def with_options(self, **kwargs):
+        return self
+
+
+def healthy(**request):
+    if request.get("stream"):
+        return iter([chunk("Hello?", "stop")])
+    return reply()
+
+
+class ProbeReleaseTest(unittest.TestCase):
+    def setUp(self):
+        self.api_key = f"sk-breaker-{next(_keys)}"
+        self.breaker = llm.breaker_for(self.api_key)
+        self.breaker.failure_threshold = 1
+        self.breaker.reset_after = 0.05
+        self.breaker.record_failure()
+        time.sleep(0.06)
+        self.assertEqual(self.breaker.state, "half-open")
+
+    def assertProbeReleased(self):
+        self.assertFalse(self.breaker._probing)
+        text = llm.chat(FakeClient(healthy), self.api_key, timeout=5, messages=[{"role": "user", "content": "Hi"}])
+        self.assertEqual(text, "Hello?")
+        self.assertEqual(self.breaker.state, "closed")
+
+    def test_non_retryable_error(self):
+        def bad_request(**request):
+            raise ValueError("context length exceeded")
+
+        with self.assertRaises(ValueError):
+            llm.chat(FakeClient(bad_request), self.api_key, timeout=5, messages=[{"role": "user", "content": "Hi"}])
+        self.assertProbeReleased()
+
+    def test_queue_timeout(self):
+        limited = scheduler.Scheduler(rpm=1)
+        limited.requests.level = 0  # the only request slot this minute is already taken
+        with mock.patch.object(llm, "scheduler_for", lambda fingerprint: limited):
+            with self.assertRaises(llm.RequestTimeout):
+                llm.chat(FakeClient(healthy), self.api_key, timeout=0.1, messages=[{"role": "user", "content": "Hi"}])
+        self.assertProbeReleased()
+
+    def test_abandoned_stream(self):
+        def endless(**request):
+            return itertools.repeat(chunk("and "))
+
+        stream = llm.stream_chat(FakeClient(endless), self.api_key, timeout=5,
+                                 messages=[{"role": "user", "content": "Hi"}])
+        self.assertEqual(next(stream), "and ")
+        stream.close()  # a rerun, or a losing hedge
+        self.assertProbeReleased()
+
+
+if __name__ == "__main__":
+    unittest.main()
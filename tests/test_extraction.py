@@ -0,0 +1,42 @@
+"""Parsing the extractor's markdown replies into profile sections."""
+import types
+import unittest
+
+import support  # noqa: F401  (isolates HOME and telemetry before the repo is imported)
+
+from extraction import RollingExtractor, parse_sections  # noqa: E402
+
+
+class EchoingClient:
+    """Stands in for openai.OpenAI, replying with the profile title above its sections."""
+
+    def __init__(self):
+        self.chat = types.SimpleNamespace(completions=self)
+
+    def with_options(self, **kwargs):
+        return self
+
+    def create(self, **request):
+        message = types.SimpleNamespace(role="assistant", content="## User Summary\n\n### Work\n- Builds trains.")
+        return types.SimpleNamespace(choices=[types.SimpleNamespace(message=message, finish_reason="stop")],
+                                     usage=None)
+
+
+class ParseSectionsTest(unittest.TestCase):
+    def test_headings_without_a_body_are_skipped(self):
+        sections = parse_sections("## User Summary\n\n### Work\n- Builds trains.\n\n### Hobbies:\n\n### Home\n- Oslo")
+        self.assertEqual(dict(sections), {"Work": "- Builds trains.", "Home": "- Oslo"})
+
+    def test_text_before_any_heading_becomes_highlights(self):
+        self.assertEqual(dict(parse_sections("Likes trains.\n### Work\n- Driver")),
+                         {"Highlights": "Likes trains.", "Work": "- Driver"})
+
+    def test_echoed_title_is_not_rendered_as_a_section(self):
+        extractor = RollingExtractor()
+        extractor.observe("What do you do?", "I build trains.")
+        profile = extractor.finalize(EchoingClient(), "sk-test")
+        self.assertEqual(profile, "## User Summary\n\n### Work\n- Builds trains.")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+"""The response cache on a real call path: an extraction fold replayed from disk."""
+import tempfile
+import types
+import unittest
+from unittest import mock
+
+import support  # noqa: F401  (isolates HOME and telemetry before the repo is imported)
+
+import llm  # noqa: E402
+from extraction import RollingExtractor  # noqa: E402
+from response_cache import ResponseCache  # noqa: E402
+
+
+class CountingClient:
+    """Stands in for openai.OpenAI and counts the completions it serves."""
+
+    def __init__(self):
+        self.calls = 0
+        self.chat = types.SimpleNamespace(completions=self)
+
+    def with_options(self, **kwargs):
+        return self
+
+    def create(self, **request):
+        self.calls += 1
+        message = types.SimpleNamespace(role="assistant", content="### Work\n- Builds trains.")
+        usage = types.SimpleNamespace(prompt_tokens=100, completion_tokens=10, total_tokens=110)
+        return types.SimpleNamespace(choices=[types.SimpleNamespace(message=message, finish_reason="stop")],
+                                     usage=usage)
+
+
+def extract(client):
+    extractor = RollingExtractor()
+    extractor.observe("What do you do?", "I build trains.")
+    return extractor.finalize(client, "sk-test")
+
+
+class ExtractionCacheTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.cache = ResponseCache(directory=directory.name, mode="all")
+        patcher = mock.patch.object(llm, "response_cache", self.cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_repeated_fold_is_served_from_cache(self):
+        client = CountingClient()
+        first = extract(client)
+        second = extract(client)
+        self.assertEqual(first, second)
+        self.assertIn("Builds trains", second)
+        self.assertEqual(client.calls, 1)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test_deterministic_mode_skips_sampled_calls(self):
+        self.cache.mode = "deterministic"  # a fold samples at temperature 0.5, so it is not replayable
+        client = CountingClient()
+        extract(client)
+        extract(client)
+        self.assertEqual(client.calls, 2)
+        self.assertEqual((self.cache.hits, self.cache.misses), (0, 0))
+
+    def test_off_mode_always_calls_the_api(self):
+        self.cache.mode = "off"
+        client = CountingClient()
+        extract(client)
+        extract(client)
+        self.assertEqual(client.calls, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
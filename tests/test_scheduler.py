@@ -0,0 +1,112 @@
+"""Priority admission and token settlement in the per-key scheduler."""
+import itertools
+import threading
+import time
+import types
+import unittest
+from unittest import mock
+
+import support  # noqa: F401  (isolates HOME and telemetry before the repo is imported)
+
+import llm  # noqa: E402
+from memory import count_tokens  # noqa: E402
+from scheduler import EXTRACTION, INTERACTIVE, SPECULATIVE, QueueTimeout, Scheduler  # noqa: E402
+
+MESSAGES = [{"role": "user", "content": "Tell me about your work."}]
+PROMPT_TOKENS = count_tokens(MESSAGES[0]["content"])
+MAX_TOKENS = 100
+
+
+def chunk(text, finish_reason=None, usage=None):
+    choice = types.SimpleNamespace(delta=types.SimpleNamespace(content=text), finish_reason=finish_reason)
+    return types.SimpleNamespace(choices=[choice], usage=usage)
+
+
+class FakeClient:
+    """Stands in for openai.OpenAI; ``create`` is whatever the test needs."""
+
+    def __init__(self, create):
+        self.create = create
+        self.chat = types.SimpleNamespace(completions=self)
+
+    def with_options(self, **kwargs):
+        return self
+
+
+def reply(usage=None):
+    message = types.SimpleNamespace(role="assistant", content="I build trains.")
+    return types.SimpleNamespace(choices=[types.SimpleNamespace(message=message, finish_reason="stop")], usage=usage)
+
+
+class PriorityOrderTest(unittest.TestCase):
+    def test_waiting_requests_are_admitted_by_priority_then_arrival(self):
+        scheduler = Scheduler(rpm=600)  # one request every 0.1s once the bucket is empty
+        scheduler.requests.level = 0
+        admitted = []
+        threads = []
+        for name, priority in [("speculative", SPECULATIVE), ("extraction-1", EXTRACTION),
+                               ("interactive", INTERACTIVE), ("extraction-2", EXTRACTION)]:
+            thread = threading.Thread(target=lambda n=name, p=priority: (scheduler.acquire(p, 0), admitted.append(n)))
+            thread.start()
+            threads.append(thread)
+            while sum(scheduler.stats()["queued"].values()) < len(threads):  # queued in this order
+                time.sleep(0.001)
+        for thread in threads:
+            thread.join(5)
+        self.assertEqual(admitted, ["interactive", "extraction-1", "extraction-2", "speculative"])
+        self.assertEqual(scheduler.stats()["admitted"], {"interactive": 1, "extraction": 2, "speculative": 1})
+
+    def test_queue_timeout_leaves_the_queue(self):
+        scheduler = Scheduler(rpm=1)
+        scheduler.requests.level = 0
+        with self.assertRaises(QueueTimeout):
+            scheduler.acquire(INTERACTIVE, 0, timeout=0.05)
+        self.assertEqual(sum(scheduler.stats()["queued"].values()), 0)
+
+
+_keys = itertools.count()
+
+
+class SettleTest(unittest.TestCase):
+    """Whatever the outcome, the token bucket ends up charged for what was used, not what was reserved."""
+
+    def setUp(self):
+        self.scheduler = Scheduler(tpm=1000)  # refills ~0.02 tokens/ms, so a test sees what it was charged
+        patcher = mock.patch.object(llm, "scheduler_for", lambda fingerprint: self.scheduler)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.api_key = f"sk-settle-{next(_keys)}"
+
+    def assertCharged(self, tokens):
+        self.assertAlmostEqual(self.scheduler.tokens.capacity - self.scheduler.tokens.level, tokens, delta=3)
+
+    def chat(self, create):
+        return llm.chat(FakeClient(create), self.api_key, timeout=5, messages=MESSAGES, max_tokens=MAX_TOKENS)
+
+    def test_success_charges_reported_usage(self):
+        usage = types.SimpleNamespace(prompt_tokens=40, completion_tokens=60, total_tokens=100)
+        self.chat(lambda **request: reply(usage))
+        self.assertCharged(100)
+
+    def test_success_without_usage_charges_an_estimate(self):
+        self.chat(lambda **request: reply())
+        self.assertCharged(PROMPT_TOKENS + count_tokens("I build trains."))
+
+    def test_non_retryable_error_refunds_the_reservation(self):
+        def bad_request(**request):
+            raise ValueError("context length exceeded")
+
+        with self.assertRaises(ValueError):
+            self.chat(bad_request)
+        self.assertCharged(0)
+
+    def test_abandoned_stream_charges_what_was_streamed(self):
+        stream = llm.stream_chat(FakeClient(lambda **request: itertools.repeat(chunk("trains "))), self.api_key,
+                                 timeout=5, messages=MESSAGES, max_tokens=MAX_TOKENS)
+        self.assertEqual([next(stream), next(stream)], ["trains ", "trains "])
+        stream.close()
+        self.assertCharged(PROMPT_TOKENS + count_tokens("trains trains "))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,136 @@
+"""Pre-generated random topics so the 🎲 Random! button answers instantly.
+
+Each API key gets a process-wide pool of topics. Popping a topic, or calling
+``refill``, tops the pool back up on a background worker once it falls below
+its low-water mark. Topics are deduplicated against the pool and against
+recently served ones, and expire after a while so the pool stays fresh.
+"""
+import os
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+import llm
+from keyed import KeyedRegistry
+from prompts import topic_request
+
+TOPIC_POOL_SIZE = int(os.environ.get("CORN_TOPIC_POOL_SIZE", "5"))  # 0 disables the pool
+TOPIC_POOL_LOW_WATER = int(os.environ.get("CORN_TOPIC_POOL_LOW_WATER", "2"))
+TOPIC_POOL_TTL = float(os.environ.get("CORN_TOPIC_POOL_TTL", "3600"))  # seconds
+TOPIC_POOL_CONCURRENCY = int(os.environ.get("CORN_TOPIC_POOL_CONCURRENCY", "2"))
+TOPIC_POOL_RATE = float(os.environ.get("CORN_TOPIC_POOL_RATE", "10"))  # refill requests per minute
+RECENTLY_SERVED = 50  # served topics remembered for deduplication
+
+_executor = ThreadPoolExecutor(max_workers=max(1, TOPIC_POOL_CONCURRENCY), thread_name_prefix="topic-pool")
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+
+
+def _normalize(topic: str) -> str:
+    return _NON_WORD.sub(" ", topic.lower()).strip()
+
+
+class TopicPool:
+    """A bounded, self-refilling pool of random topics for one API key."""
+
+    def __init__(self, size=TOPIC_POOL_SIZE, low_water=TOPIC_POOL_LOW_WATER, ttl=TOPIC_POOL_TTL,
+                 concurrency=TOPIC_POOL_CONCURRENCY, rate_per_minute=TOPIC_POOL_RATE):
+        self.size = size
+        self.low_water = min(low_water, size)
+        self.ttl = ttl
+        self.concurrency = concurrency
+        self.min_interval = 60.0 / rate_per_minute if rate_per_minute > 0 else 0.0
+        self._lock = threading.Lock()
+        self._topics = deque()  # (topic, created_at)
+        self._served = deque(maxlen=RECENTLY_SERVED)
+        self._in_flight = 0
+        self._filling = False  # set below the low-water mark, cleared once full
+        self._last_request = float("-inf")
+        self.hits = 0
+        self.misses = 0
+        self.duplicates = 0
+        self.failures = 0
+
+    def pop(self, client=None, api_key=None) -> Optional[str]:
+        """Take a fresh topic, or None if the pool is empty; triggers a refill when given a client."""
+        with self._lock:
+            self._expire(time.monotonic())
+            if self._topics:
+                topic = self._topics.popleft()[0]
+                self._served.append(_normalize(topic))
+                self.hits += 1
+            else:
+                topic = None
+                self.misses += 1
+        if client is not None:
+            self.refill(client, api_key)
+        return topic
+
+    def refill(self, client, api_key):
+        """Start background generation if the pool is below its low-water mark."""
+        if self.size <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            self._expire(now)
+            level = len(self._topics) + self._in_flight
+            if level < self.low_water:
+                self._filling = True
+            if not self._filling or level >= self.size:
+                return
+            wanted = min(self.size - level, self.concurrency - self._in_flight)
+            if wanted <= 0:
+                return
+            # Space requests out to stay within the refill rate limit
+            first_delay = max(0.0, self._last_request + self.min_interval - now)
+            self._in_flight += wanted
+            self._last_request = now + first_delay + (wanted - 1) * self.min_interval
+        for i in range(wanted):
+            _executor.submit(self._generate, client, api_key, first_delay + i * self.min_interval)
+
+    def _generate(self, client, api_key, delay):
+        try:
+            if delay:
+                time.sleep(delay)
+            # Never serve random topics from the response cache: they would all be the same
+            topic = llm.chat(client, api_key, timeout=30, cache=False, call_site="topic_pool", **topic_request())
+        except Exception:
+            with self._lock:
+                self._in_flight -= 1
+                self.failures += 1
+            return
+        key = _normalize(topic)
+        with self._lock:
+            self._in_flight -= 1
+            if not key or key in self._served or any(_normalize(t) == key for t, _ in self._topics):
+                self.duplicates += 1
+            elif len(self._topics) < self.size:
+                self._topics.append((topic, time.monotonic()))
+            if len(self._topics) >= self.size:
+                self._filling = False
+        self.refill(client, api_key)  # keep topping up until full
+
+    def _expire(self, now):
+        while self._topics and now - self._topics[0][1] > self.ttl:
+            self._topics.popleft()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "available": len(self._topics),
+                "in_flight": self._in_flight,
+                "hits": self.hits,
+                "misses": self.misses,
+                "duplicates": self.duplicates,
+                "failures": self.failures,
+            }
+
+
+_pools = KeyedRegistry(TopicPool)
+
+
+def topic_pool_for(api_key: str) -> TopicPool:
+    """Return the process-wide topic pool for an API key."""
+    return _pools.get(llm.key_fingerprint(api_key))
@@ -0,0 +1,55 @@
+"""Compact records for interview turns.
+
+A Turn carries its role explicitly, so an answer that happens to start with
+"Q: " is still an answer, along with the metadata the rest of the app needs:
+when it was said, how many tokens it costs and how long it took to produce.
+The token count is worked out once, when the turn is created or loaded, and
+stored with it, so prompt building never re-tokenizes old turns.
+"""
+import time
+from typing import Optional
+
+from memory import count_tokens
+
+ASSISTANT, USER = "assistant", "user"
+
+
+class Turn:
+    """One message of an interview."""
+
+    __slots__ = ("role", "text", "timestamp", "tokens", "latency")
+
+    def __init__(self, role: str, text: str, timestamp: Optional[float] = None,
+                 tokens: Optional[int] = None, latency: Optional[float] = None):
+        self.role = role
+        self.text = text
+        self.timestamp = time.time() if timestamp is None else timestamp
+        self.tokens = count_tokens(text) if tokens is None else tokens
+        self.latency = latency  # seconds to generate a question; None for answers
+
+    @classmethod
+    def question(cls, text, latency=None) -> "Turn":
+        return cls(ASSISTANT, text, latency=latency)
+
+    @classmethod
+    def answer(cls, text) -> "Turn":
+        return cls(USER, text)
+
+    @property
+    def is_question(self) -> bool:
+        return self.role == ASSISTANT
+
+    def chat_message(self) -> dict:
+        """The turn as a chat completion message."""
+        return {"role": self.role, "content": self.text}
+
+    def __eq__(self, other):
+        if not isinstance(other, Turn):
+            return NotImplemented
+        return (self.role, self.text, self.timestamp) == (other.role, other.text, other.timestamp)
+
+    def __hash__(self):
+        return hash((self.role, self.text, self.timestamp))
+
+    def __repr__(self):
+        return f"Turn({self.role!r}, {self.text[:40]!r}, tokens={self.tokens})"